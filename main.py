@@ -10,15 +10,17 @@ logging.basicConfig(
 
 import sys
 from pathlib import Path
-import customtkinter as ctk
 
 # Add src directory to Python path
 src_path = Path(__file__).parent / "src"
 sys.path.append(str(src_path))
 
-from app import DART  # Updated import
-
 if __name__ == "__main__":
+    # GUI imports live under the main guard so that spawned tracking
+    # processes (which re-import this module) only load the control path
+    import customtkinter as ctk
+    from app import DART
+
     ctk.set_default_color_theme("config/style.json")
     window = ctk.CTk()  # Create main window
-    app = DART(window)  # Initialize application
\ No newline at end of file
+    app = DART(window)  # Initialize application
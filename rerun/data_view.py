@@ -1,315 +1,258 @@
 import cv2
 import numpy as np
 import rerun as rr
-import re
+import os
+import sys
 import pandas as pd
-from pathlib import Path
+import pyarrow.parquet as pq
 import json
 from scipy.spatial.transform import Rotation
-from pick import pick
-from datetime import datetime
-
-def parse_timestamp(filename):
-    # Extract timestamp like 1612T143225 from filename
-    match = re.search(r'(\d{4}T\d{6})', filename)
-    return match.group(1) if match else None
-
-def get_file_pairs():
-    recordings_dir = Path("static/recordings")
-    video_files = list(recordings_dir.glob("*.mp4"))
-    parquet_files = list(recordings_dir.glob("*.parquet"))
-    
-    # Create dictionary of timestamp -> (video, parquet) pairs
-    pairs = {}
-    
-    # Process video files
-    for video in video_files:
-        timestamp = parse_timestamp(video.name)
-        if timestamp:
-            if timestamp not in pairs:
-                pairs[timestamp] = {'video': None, 'parquet': None}
-            pairs[timestamp]['video'] = video
-    
-    # Process parquet files
-    for parquet in parquet_files:
-        timestamp = parse_timestamp(parquet.name)
-        if timestamp:
-            if timestamp not in pairs:
-                pairs[timestamp] = {'video': None, 'parquet': None}
-            pairs[timestamp]['parquet'] = parquet
-    
-    # Filter to only complete pairs and format for display
-    complete_pairs = {
-        timestamp: files 
-        for timestamp, files in pairs.items() 
-        if files['video'] and files['parquet']
-    }
-    
-    # Convert timestamps to readable format and create selection options
-    options = []
-    for timestamp in complete_pairs.keys():
-        try:
-            dt = datetime.strptime(timestamp, '%d%mT%H%M%S')
-            readable_time = dt.strftime('%Y-%m-%d %H:%M:%S')
-            options.append((timestamp, readable_time))
-        except ValueError:
-            options.append((timestamp, timestamp))
-    
-    return options, complete_pairs
-
-def select_files():
-    options, pairs = get_file_pairs()
-    if not options:
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from data.data_handler import POSITION_COLUMNS, target_positions
+from data.session_catalog import SessionCatalog
+
+APP_ID = "DART Data Viewer"
+TRACKING_COLUMNS = ['relative_time_ms', 'sync_error_ms', 'desired_pan', 'desired_tilt',
+                    'encoder_pan', 'encoder_tilt']
+
+# Camera parameters
+IMAGE_WIDTH = 1440
+IMAGE_HEIGHT = 1000
+FOV_Y_DEGREES = 18.0
+
+
+def select_session(recordings_dir="static/recordings"):
+    from pick import pick
+
+    catalog = SessionCatalog(recordings_dir)
+    # Index recordings made before the catalogue existed (or copied in by hand)
+    catalog.rebuild()
+    sessions = catalog.list_sessions(require_data=True)
+    if not sessions:
         raise FileNotFoundError("No matching video/parquet pairs found in recordings directory")
-    
-    # Sort options by timestamp (newest first)
-    options.sort(reverse=True)
-    
-    # Create display options
-    display_options = [f"{readable_time}" for _, readable_time in options]
-    
+
+    display_options = [
+        f"{session['started_at'] or session['session']}  ({session['duration_s'] or 0:.1f} s)"
+        for session in sessions
+    ]
+
     title = 'Please choose a recording (use arrow keys, press Enter to select):'
     selected_option, index = pick(display_options, title)
-    
-    # Get the timestamp for the selected option
-    selected_timestamp = options[index][0]
-    selected_pair = pairs[selected_timestamp]
-    
-    return selected_pair['video'], selected_pair['parquet']
-
-# Get the selected files
-newest_video, newest_parquet = select_files()
-
-print(f"Loading selected files:")
-print(f"Video: {newest_video.name}")
-print(f"Data: {newest_parquet.name}")
-
-# Extract original FPS from filename
-fps_match = re.search(r'FPS(\d+\.?\d*)', newest_video.name)
-original_fps = float(fps_match.group(1)) if fps_match else 200.9
-print(f"Original recording FPS from filename: {original_fps}")
-
-# Get video information using OpenCV
-cap = cv2.VideoCapture(str(newest_video))
-frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-encoded_fps = cap.get(cv2.CAP_PROP_FPS)
-cap.release()
-
-print(f"Video encoded at: {encoded_fps} FPS")
-print(f"Total frames: {frame_count}")
-
-# Initialize Rerun
-rr.init("DART Data Viewer", spawn=True)
-
-# Set up styling for the plots
-rr.log("angles/desired/pan", rr.SeriesLine(color=[255, 0, 0], name="Desired Pan"), timeless=True)
-rr.log("angles/desired/tilt", rr.SeriesLine(color=[0, 255, 0], name="Desired Tilt"), timeless=True)
-rr.log("angles/encoder/pan", rr.SeriesLine(color=[0, 0, 255], name="Encoder Pan"), timeless=True)
-rr.log("angles/encoder/tilt", rr.SeriesLine(color=[255, 255, 0], name="Encoder Tilt"), timeless=True)
-
-# Load and process tracking data
-df = pd.read_parquet(newest_parquet)
-df = df[df['sync_error_ms'] <= 3].sort_values('relative_time_ms')
-
-# Filter out zero encoder values
-df = df[(df['encoder_pan'] != 0) & (df['encoder_tilt'] != 0)]
-
-# Process trajectory data
-trajectory_points = []
-positions = []  # For current position
-for pos in df['target_position']:
-    try:
-        pos_str = str(pos).strip('[]')
-        pos_array = np.fromstring(pos_str, sep=' ')
-        if pos_array.shape[-1] == 3:
-            trajectory_points.append(pos_array)
-            positions.append(pos_array)  # Keep track of current positions
-    except:
-        continue
-
-trajectory_points = np.array(trajectory_points)
-positions = np.array(positions)
-
-# Calculate bounds for scene setup
-min_bounds = trajectory_points.min(axis=0)
-max_bounds = trajectory_points.max(axis=0)
-center = 2*(min_bounds + max_bounds)
-size = np.max(max_bounds - min_bounds)
-
-# Set up World structure with calculated bounds
-rr.log("World", rr.ViewCoordinates.RIGHT_HAND_Z_UP, timeless=True)
-rr.log("World", rr.Transform3D(translation=center.tolist()), timeless=True)
-
-# Set up the coordinate arrows
-rr.log("World", rr.Arrows3D(
-    vectors=[[200, 0, 0], [0, 200, 0], [0, 0, 200]],
-    origins=[[0, 0, 0], [0, 0, 0], [0, 0, 0]],
-    colors=[[255, 100, 100], [100, 255, 100], [100, 100, 255]]
-), timeless=True)
-
-# Log video asset which is referred to by frame references
-video_asset = rr.AssetVideo(path=str(newest_video))
-rr.log("Tracker_Camera", video_asset, static=True)
-
-# Get the encoded timestamps
-frame_timestamps_ns = video_asset.read_frame_timestamps_ns()
-
-# Calculate timestamps as they would have been at recording time
-period_ns = int(1e9 / original_fps)  # nanoseconds between frames
-start_time_ns = frame_timestamps_ns[0]  # keep same start time
-original_timestamps_ns = start_time_ns + np.arange(frame_count, dtype=np.int64) * period_ns
-
-# Log video frames with correct timing
-rr.send_columns(
-    "Tracker_Camera",
-    times=[rr.TimeNanosColumn("video_time", original_timestamps_ns)],
-    components=[
-        rr.VideoFrameReference.indicator(),
-        rr.components.VideoTimestamp.nanoseconds(frame_timestamps_ns)
-    ],
-)
-
-# Convert tracking data timestamps to nanoseconds
-tracking_timestamps_ns = (df['relative_time_ms'] * 1_000_000).astype(np.int64)
-
-# Send all angle data as columns
-rr.send_columns(
-    "angles/desired/pan",
-    times=[rr.TimeNanosColumn("video_time", tracking_timestamps_ns)],
-    components=[rr.components.ScalarBatch(df['desired_pan'].to_numpy())]
-)
-
-rr.send_columns(
-    "angles/desired/tilt",
-    times=[rr.TimeNanosColumn("video_time", tracking_timestamps_ns)],
-    components=[rr.components.ScalarBatch(df['desired_tilt'].to_numpy())]
-)
-
-rr.send_columns(
-    "angles/encoder/pan",
-    times=[rr.TimeNanosColumn("video_time", tracking_timestamps_ns)],
-    components=[rr.components.ScalarBatch(df['encoder_pan'].to_numpy())]
-)
-
-rr.send_columns(
-    "angles/encoder/tilt",
-    times=[rr.TimeNanosColumn("video_time", tracking_timestamps_ns)],
-    components=[rr.components.ScalarBatch(df['encoder_tilt'].to_numpy())]
-)
-
-# Send trajectory data - one point at each timestamp
-rr.send_columns(
-    "World/trajectory",
-    times=[rr.TimeNanosColumn("video_time", tracking_timestamps_ns)],
-    components=[
-        rr.Points3D.indicator(),
-        rr.components.Position3DBatch(trajectory_points),
-        rr.components.ColorBatch([(200, 200, 200)] * len(trajectory_points)),
-        rr.components.RadiusBatch([2.0] * len(trajectory_points))
-    ]
-)
-
-# Send current position data and update view transform
-rr.send_columns(
-    "World/current_position",
-    times=[rr.TimeNanosColumn("video_time", tracking_timestamps_ns)],
-    components=[
-        rr.Points3D.indicator(),
-        rr.components.Position3DBatch(positions),
-        rr.components.ColorBatch([(255, 255, 255)] * len(positions)),
-        rr.components.RadiusBatch([10.0] * len(positions))
-    ]
-)
-
-# Add transform updates to follow current position
-rr.send_columns(
-    "World",
-    times=[rr.TimeNanosColumn("video_time", tracking_timestamps_ns)],
-    components=[
-        rr.Transform3D.indicator(),
-        rr.components.Translation3DBatch(positions)  # Update transform to follow position
-    ]
-)
 
-# Load camera calibration data
-with open('config/app_config.json', 'r') as f:
-    config = json.load(f)
+    return sessions[index]
 
-tilt_origin = np.array(config['calibration']['tilt_origin'])
-rotation_matrix = np.array(config['calibration']['rotation_matrix'])
 
-# Convert calibration rotation matrix to camera view matrix
-# Rearrange axes to match camera view (Z = Forward, X = Right, Y = Down)
-camera_rotation = np.column_stack([
-    -rotation_matrix[:, 1],  # Right = -Y axis from calibration
-    rotation_matrix[:, 2],   # Down = Z axis from calibration
-    rotation_matrix[:, 0]    # Forward = X axis from calibration (pan direction)
-])
+def load_tracking_data(parquet_path, batch_size=65536):
+    """
+    Read the tracking samples used by the viewer.
 
-# Convert to axis-angle
-r = Rotation.from_matrix(camera_rotation)
-axis_angle = r.as_rotvec()
-angle = np.linalg.norm(axis_angle)
-axis = axis_angle / angle if angle > 0 else np.array([0, 0, 1])
+    The file is read in record batches of the needed columns only and
+    filtered batch by batch, so long sessions never sit in memory whole.
+    """
+    parquet_file = pq.ParquetFile(parquet_path)
+    names = parquet_file.schema_arrow.names
+    position_columns = POSITION_COLUMNS if all(c in names for c in POSITION_COLUMNS) else ['target_position']
 
-# Camera parameters
-image_width = 1440
-image_height = 1000
-fov_y_degrees = 18.0
-aspect = image_width / image_height
-
-# Create the camera entity with RDF coordinates
-rr.log("World/camera_frustum", 
-    rr.Pinhole(
-        resolution=[image_width, image_height],
-        fov_y=np.radians(fov_y_degrees),
-        aspect_ratio=aspect,
-        camera_xyz=rr.ViewCoordinates.RDF,  # Right-Down-Forward to match standard camera coordinates
-        image_plane_distance=100.0
-    ),
-    timeless=True
-)
-
-# Create list to store transforms
-transforms = []
-
-# Generate transforms for each timestamp
-for pan_angle, tilt_angle in zip(df['encoder_pan'], df['encoder_tilt']):
-    # First apply the base camera orientation
+    frames = []
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=TRACKING_COLUMNS + position_columns):
+        df = batch.to_pandas()
+        df = df[df['sync_error_ms'] <= 3]
+
+        # Filter out zero encoder values
+        df = df[(df['encoder_pan'] != 0) & (df['encoder_tilt'] != 0)]
+        frames.append(df)
+
+    df = pd.concat(frames, ignore_index=True).sort_values('relative_time_ms')
+
+    # Process trajectory data (rows without a valid position are dropped)
+    positions = target_positions(df)
+    valid = np.isfinite(positions).all(axis=1)
+    return df[valid], positions[valid]
+
+
+def load_calibration(config_path='config/app_config.json'):
+    # Load camera calibration data
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+
+    tilt_origin = np.array(config['calibration']['tilt_origin'])
+    rotation_matrix = np.array(config['calibration']['rotation_matrix'])
+    return tilt_origin, rotation_matrix
+
+
+def log_video(video_path, original_fps, frame_count):
+    # Log video asset which is referred to by frame references
+    video_asset = rr.AssetVideo(path=str(video_path))
+    rr.log("Tracker_Camera", video_asset, static=True)
+
+    # Get the encoded timestamps
+    frame_timestamps_ns = video_asset.read_frame_timestamps_ns()
+
+    # Calculate timestamps as they would have been at recording time
+    period_ns = int(1e9 / original_fps)  # nanoseconds between frames
+    start_time_ns = frame_timestamps_ns[0]  # keep same start time
+    original_timestamps_ns = start_time_ns + np.arange(frame_count, dtype=np.int64) * period_ns
+
+    # Log video frames with correct timing
+    rr.send_columns(
+        "Tracker_Camera",
+        times=[rr.TimeNanosColumn("video_time", original_timestamps_ns)],
+        components=[
+            rr.VideoFrameReference.indicator(),
+            rr.components.VideoTimestamp.nanoseconds(frame_timestamps_ns)
+        ],
+    )
+
+
+def log_tracking(df, positions, tracking_timestamps_ns):
+    # Set up styling for the plots
+    rr.log("angles/desired/pan", rr.SeriesLine(color=[255, 0, 0], name="Desired Pan"), timeless=True)
+    rr.log("angles/desired/tilt", rr.SeriesLine(color=[0, 255, 0], name="Desired Tilt"), timeless=True)
+    rr.log("angles/encoder/pan", rr.SeriesLine(color=[0, 0, 255], name="Encoder Pan"), timeless=True)
+    rr.log("angles/encoder/tilt", rr.SeriesLine(color=[255, 255, 0], name="Encoder Tilt"), timeless=True)
+
+    # Calculate bounds for scene setup
+    min_bounds = positions.min(axis=0)
+    max_bounds = positions.max(axis=0)
+    center = 2*(min_bounds + max_bounds)
+
+    # Set up World structure with calculated bounds
+    rr.log("World", rr.ViewCoordinates.RIGHT_HAND_Z_UP, timeless=True)
+    rr.log("World", rr.Transform3D(translation=center.tolist()), timeless=True)
+
+    # Set up the coordinate arrows
+    rr.log("World", rr.Arrows3D(
+        vectors=[[200, 0, 0], [0, 200, 0], [0, 0, 200]],
+        origins=[[0, 0, 0], [0, 0, 0], [0, 0, 0]],
+        colors=[[255, 100, 100], [100, 255, 100], [100, 100, 255]]
+    ), timeless=True)
+
+    # Send all angle data as columns
+    for column, entity in (('desired_pan', "angles/desired/pan"), ('desired_tilt', "angles/desired/tilt"),
+                           ('encoder_pan', "angles/encoder/pan"), ('encoder_tilt', "angles/encoder/tilt")):
+        rr.send_columns(
+            entity,
+            times=[rr.TimeNanosColumn("video_time", tracking_timestamps_ns)],
+            components=[rr.components.ScalarBatch(df[column].to_numpy())]
+        )
+
+    # Send trajectory data - one point at each timestamp
+    rr.send_columns(
+        "World/trajectory",
+        times=[rr.TimeNanosColumn("video_time", tracking_timestamps_ns)],
+        components=[
+            rr.Points3D.indicator(),
+            rr.components.Position3DBatch(positions),
+            rr.components.ColorBatch([(200, 200, 200)] * len(positions)),
+            rr.components.RadiusBatch([2.0] * len(positions))
+        ]
+    )
+
+    # Send current position data and update view transform
+    rr.send_columns(
+        "World/current_position",
+        times=[rr.TimeNanosColumn("video_time", tracking_timestamps_ns)],
+        components=[
+            rr.Points3D.indicator(),
+            rr.components.Position3DBatch(positions),
+            rr.components.ColorBatch([(255, 255, 255)] * len(positions)),
+            rr.components.RadiusBatch([10.0] * len(positions))
+        ]
+    )
+
+    # Add transform updates to follow current position
+    rr.send_columns(
+        "World",
+        times=[rr.TimeNanosColumn("video_time", tracking_timestamps_ns)],
+        components=[
+            rr.Transform3D.indicator(),
+            rr.components.Translation3DBatch(positions)  # Update transform to follow position
+        ]
+    )
+
+
+def log_camera(df, tracking_timestamps_ns, tilt_origin, rotation_matrix):
+    # Convert calibration rotation matrix to camera view matrix
+    # Rearrange axes to match camera view (Z = Forward, X = Right, Y = Down)
+    camera_rotation = np.column_stack([
+        -rotation_matrix[:, 1],  # Right = -Y axis from calibration
+        rotation_matrix[:, 2],   # Down = Z axis from calibration
+        rotation_matrix[:, 0]    # Forward = X axis from calibration (pan direction)
+    ])
+
+    # Create the camera entity with RDF coordinates
+    rr.log("World/camera_frustum",
+        rr.Pinhole(
+            resolution=[IMAGE_WIDTH, IMAGE_HEIGHT],
+            fov_y=np.radians(FOV_Y_DEGREES),
+            aspect_ratio=IMAGE_WIDTH / IMAGE_HEIGHT,
+            camera_xyz=rr.ViewCoordinates.RDF,  # Right-Down-Forward to match standard camera coordinates
+            image_plane_distance=100.0
+        ),
+        timeless=True
+    )
+
+    # Convert encoder angles to optical angles for every sample at once
+    optical_pan = (df['encoder_pan'].to_numpy() - 45) * 2   # negative = left, positive = right
+    optical_tilt = (df['encoder_tilt'].to_numpy() - 45) * 2  # negative = down, positive = up
+
+    # Base camera orientation, then pan around Y (left-right), then tilt around X (up-down)
     base_rotation = Rotation.from_matrix(camera_rotation)
-    
-    # Convert encoder angles to optical angles
-    optical_pan = (pan_angle - 45) * 2   # negative = left, positive = right
-    optical_tilt = (tilt_angle - 45) * 2  # negative = down, positive = up
-    
-    # Pan is around Y axis (left-right rotation)
     pan_rot = Rotation.from_euler('y', optical_pan, degrees=True)
-    
-    # Apply pan rotation after base rotation
-    intermediate_rot = base_rotation * pan_rot
-    
-    # Tilt is around X axis (up-down rotation)
     tilt_rot = Rotation.from_euler('x', optical_tilt, degrees=True)
-    
-    # Apply tilt rotation last
-    final_rotation = intermediate_rot * tilt_rot
-    
-    # Convert to axis-angle for Rerun
-    axis_angle = final_rotation.as_rotvec()
-    angle = np.linalg.norm(axis_angle)
-    axis = axis_angle / angle if angle > 0 else np.array([0, 0, 1])
-    
-    # Create transform
-    transform = rr.Transform3D(
-        translation=tilt_origin.tolist(),
-        rotation=rr.RotationAxisAngle(
-            axis=axis.tolist(),
-            radians=float(angle)
-        )
+    final_rotation = base_rotation * pan_rot * tilt_rot
+
+    # Send all camera transforms in one batch (quaternions are xyzw in both scipy and Rerun)
+    rr.send_columns(
+        "World/camera_frustum",
+        times=[rr.TimeNanosColumn("video_time", tracking_timestamps_ns)],
+        components=[
+            rr.Transform3D.indicator(),
+            rr.components.Translation3DBatch(np.tile(tilt_origin, (len(df), 1))),
+            rr.components.RotationQuatBatch(final_rotation.as_quat())
+        ]
     )
-    transforms.append(transform)
 
-# Send camera transforms for each timestamp
-for t, transform in zip(tracking_timestamps_ns, transforms):
-    rr.set_time_nanos("video_time", t)
-    rr.log("World/camera_frustum", transform)
+
+def log_session(session, config_path='config/app_config.json'):
+    """Log one catalogued session to the active Rerun recording"""
+    video_path, parquet_path = session['video'], session['data']
+
+    # Recording FPS and frame count come from the catalogue
+    original_fps = session['fps'] or 200.9
+    frame_count = session['frame_count']
+    if frame_count is None:
+        # Get video information using OpenCV
+        cap = cv2.VideoCapture(str(video_path))
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+
+    log_video(video_path, original_fps, frame_count)
+
+    # Load and process tracking data
+    df, positions = load_tracking_data(parquet_path)
+
+    # Convert tracking data timestamps to nanoseconds
+    tracking_timestamps_ns = (df['relative_time_ms'] * 1_000_000).astype(np.int64)
+
+    log_tracking(df, positions, tracking_timestamps_ns)
+    log_camera(df, tracking_timestamps_ns, *load_calibration(config_path))
+
+
+def main():
+    session = select_session()
+
+    print(f"Loading selected files:")
+    print(f"Video: {session['video'].name}")
+    print(f"Data: {session['data'].name}")
+    print(f"Original recording FPS: {session['fps']}")
+
+    # Initialize Rerun
+    rr.init(APP_ID, spawn=True)
+    log_session(session)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Export recorded sessions to .rrd files without opening a viewer.
+
+Sessions are taken from the recordings catalogue and converted in parallel
+worker processes; open the results later with `rerun <file>.rrd`.
+
+Usage (from the repository root):
+    python rerun/export_rrd.py --all
+    python rerun/export_rrd.py 1612T143225 1612T150102 --out static/rrd --workers 4
+    python rerun/export_rrd.py --since 2024-12-16
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import rerun as rr
+
+sys.path.append(os.path.dirname(__file__))
+
+from data_view import APP_ID, log_session
+from data.session_catalog import SessionCatalog
+
+
+def export_session(session, output_path, config_path):
+    """Convert one session to an .rrd file (runs in a worker process)"""
+    start = time.perf_counter()
+    partial_path = output_path.with_suffix(".rrd.part")
+
+    rr.init(APP_ID, recording_id=session['session'], spawn=False)
+    # Stream everything logged from here on into the file
+    rr.save(str(partial_path))
+    log_session(session, config_path)
+    # Flush and close the file sink before publishing the file
+    rr.disconnect()
+
+    os.replace(partial_path, output_path)
+    return time.perf_counter() - start
+
+
+def select_sessions(catalog, names, since, export_all):
+    sessions = catalog.list_sessions(require_data=True)
+    if names:
+        wanted = set(names)
+        sessions = [s for s in sessions if s['session'] in wanted]
+        missing = wanted - {s['session'] for s in sessions}
+        if missing:
+            print(f"Not in catalogue (or missing tracking data): {', '.join(sorted(missing))}")
+    elif since:
+        sessions = [s for s in sessions if (s['started_at'] or '') >= since]
+    elif not export_all:
+        raise SystemExit("Name sessions, or use --since / --all")
+    return sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export DART sessions to Rerun .rrd files")
+    parser.add_argument("sessions", nargs="*", help="session keys (ddmmTHHMMSS)")
+    parser.add_argument("--all", action="store_true", help="export every catalogued session")
+    parser.add_argument("--since", help="only sessions started at or after this ISO date")
+    parser.add_argument("--recordings", default="static/recordings", help="recordings directory")
+    parser.add_argument("--out", help="output directory (default: <recordings>/rrd)")
+    parser.add_argument("--config", default="config/app_config.json", help="config with the calibration")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="parallel worker processes")
+    parser.add_argument("--overwrite", action="store_true", help="re-export existing .rrd files")
+    args = parser.parse_args()
+
+    catalog = SessionCatalog(args.recordings)
+    catalog.rebuild()
+    sessions = select_sessions(catalog, args.sessions, args.since, args.all)
+
+    out_dir = Path(args.out) if args.out else Path(args.recordings) / "rrd"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    jobs = {}
+    for session in sessions:
+        output_path = out_dir / f"{session['session']}.rrd"
+        if output_path.exists() and not args.overwrite:
+            continue
+        jobs[session['session']] = (session, output_path)
+
+    print(f"Exporting {len(jobs)} of {len(sessions)} sessions to {out_dir} with {args.workers} workers")
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(export_session, session, output_path, args.config): name
+            for name, (session, output_path) in jobs.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                print(f"{name}: done in {future.result():.1f} s")
+            except Exception as e:
+                failed += 1
+                print(f"{name}: failed - {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
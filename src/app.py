@@ -8,21 +8,22 @@ from hardware.camera.camera_manager import CameraManager
 from core.image_processor import ImageProcessor
 from CTkMessagebox import CTkMessagebox
 from multiprocessing import Process, Queue, Event
-from data.data_handler import DataHandler
-from tracking.dart_track import dart_track
 from tracking.calibrate import Calibrator
 import serial.tools.list_ports
 import customtkinter as ctk
 from ui.main_window import MainWindow
-from hardware.mocap.qtm_mocap import *
 from PIL import Image
-import numpy as np
 from core.state_manager import DARTState
 from ui.ui_controller import UIController
 from core.device_manager import DeviceManager
 from core.config_manager import ConfigManager
-from ui.views.theia_control_window import TheiaLensControlWindow
+from ui.display_worker import DisplayWorker
 import threading, sys
+from datetime import datetime
+
+# Heavy or feature-specific dependencies (pandas/pyarrow, qtm, matplotlib,
+# PySpin, vidgear) are imported where the feature is first used so that
+# start-up only pays for the GUI and the control path.
 
 
 class DART:
@@ -30,7 +31,7 @@ class DART:
         self.logger = logging.getLogger("DART")
         
         # Initialize configuration first
-        self.config = ConfigManager()
+        self.config = ConfigManager.shared()
         
         # Initialize state and controllers
         self.state = DARTState()
@@ -40,11 +41,19 @@ class DART:
         self.device_manager = DeviceManager(self.config)
         
         # Initialize core components
-        self.image_pro = ImageProcessor()
+        self.image_pro = ImageProcessor(self.config.config["tracking"].get("circle_detection"))
         self.calibrator = Calibrator(self.config)
+        self.calibration_capture = None
         
         # Initialize hardware components with defaults
         self.camera_manager = CameraManager()
+
+        # Live preview is prepared off the Tk thread
+        self.display_worker = DisplayWorker(self.camera_manager, self.image_pro)
+        self._photo = None  # CTkImage shown in the video label
+        self._photo_key = None
+        self._photo_label = None
+
         self.dyna = None
         self.theia = None
         
@@ -122,9 +131,14 @@ class DART:
         
         if self.state.recording.is_live:
             self.camera_manager.start_frame_thread()
+            # The camera manager is replaced when hardware is (re)connected
+            self.display_worker.camera_manager = self.camera_manager
+            self.display_worker.start()
+            self.refresh_fps_label()
             if self.state.get_current_view() == "track":
                 self.update_video_label()
         else:
+            self.display_worker.stop()
             self.camera_manager.stop_frame_thread()
 
     def toggle_record(self):
@@ -150,13 +164,30 @@ class DART:
 
             video_path = os.path.join(self.state.recording.video_path, video_name)
             data_path = os.path.join(self.state.recording.video_path, data_name)
+            self._record_session = (timestamp, datetime.now().isoformat(), data_path)
             
+            # Apply recording queue settings
+            recording_config = self.config.config.get("recording", {})
+            try:
+                self.camera_manager.set_recording_policy(
+                    recording_config.get("queue_size"),
+                    recording_config.get("overflow_policy")
+                )
+                self.camera_manager.set_recording_backend(
+                    recording_config.get("backend"),
+                    recording_config.get("preset"),
+                    recording_config.get("bayer_pattern")
+                )
+            except ValueError as e:
+                self.logger.error(f"Invalid recording config: {e}")
+
             # Start recording
             self.camera_manager.start_recording(video_path)
             self.state.recording.record_start_ms = perf_counter_ns() * 1e-6
 
             # Start the DataHandler if tracking is enabled
             if self.state.tracking['process'] is not None:
+                from data.data_handler import DataHandler
                 self.data_handler = DataHandler(
                     self.state.tracking['data_queue'], 
                     batch_size=1000, 
@@ -183,6 +214,7 @@ class DART:
             
             # Set the callback function to be executed when the writing thread finishes
             self.camera_manager.set_on_write_finished(self.on_write_finished)
+            self.update_record_stats()
 
         else:
             self.logger.info("Stopping recording sequence...")
@@ -204,16 +236,54 @@ class DART:
                 # Get complete frame timestamps
                 frame_timestamps = self.camera_manager.get_frame_timestamps()
                 self.data_handler.set_frame_timestamps(frame_timestamps)
+                self.data_handler.set_dropped_frames(self.camera_manager.get_dropped_frames())
+                self.data_handler.set_frame_ids(self.camera_manager.get_frame_ids())
                 
                 # 5. Stop the DataHandler and process data
                 self.data_handler.stop()
 
+            # 6. Add the session to the recordings catalogue
+            self.catalog_recording()
+
             # Update UI
             self.state.ui.record_button.configure(text="Saving", state="disabled")
 
+    def catalog_recording(self):
+        """Index the finished recording so viewers need not scan the directory"""
+        from data.session_catalog import SessionCatalog, describe_session
+
+        session, started_at, data_path = self._record_session
+        metadata_path = self.camera_manager.metadata_path
+        try:
+            fields = describe_session(
+                session,
+                video=self.camera_manager.output_path,
+                data=data_path if os.path.exists(data_path) else None,
+                metadata=metadata_path if metadata_path and metadata_path.exists() else None
+            )
+            fields["started_at"] = started_at
+            SessionCatalog(self.state.recording.video_path).add_session(session, **fields)
+        except Exception as e:
+            self.logger.error(f"Error adding recording to session catalogue: {e}")
+
+    def update_record_stats(self):
+        """Show writer progress and dropped frames while recording"""
+        if not self.camera_manager.recording:
+            return
+        stats = self.camera_manager.get_recording_stats()
+        self.ui_controller.update_status_text(
+            f"Recording - written {stats['written']}, queued {stats['queued']}, dropped {stats['dropped']}"
+        )
+        self.window.after(500, self.update_record_stats)
+
     def on_write_finished(self):
         # Update the record button to allow recording again
         self.state.ui.record_button.configure(text="Record", image=self.state.get_icon('record'), state="normal")
+
+        stats = self.camera_manager.get_recording_stats()
+        self.ui_controller.update_status_text(
+            f"Recording saved - {stats['written']} frames written, {stats['dropped']} dropped"
+        )
             
         # Restart the frame thread if video feed is live
         if self.state.recording.is_live:
@@ -230,11 +300,19 @@ class DART:
     def update_fps_label(self):
         if self.camera_manager.cap:
             try:
-                fps = self.camera_manager.cap.get(cv2.CAP_PROP_FPS)
+                # Prefer the rate measured from arriving frames over the configured rate
+                fps = self.camera_manager.measured_fps or self.camera_manager.cap.get(cv2.CAP_PROP_FPS)
                 self.state.ui.fps_label.configure(text=f"FPS: {round(float(fps),2)}")
             except AttributeError:
                 self.logger.error("FPS not set.")
 
+    def refresh_fps_label(self):
+        """Keep the FPS label current while the live feed runs"""
+        if not self.state.recording.is_live:
+            return
+        self.update_fps_label()
+        self.window.after(1000, self.refresh_fps_label)
+
     def adjust_exposure(self, exposure_value: float):
         if self.camera_manager.cap:
             try:
@@ -245,16 +323,10 @@ class DART:
                 self.logger.error("Exposure not set.")
 
     def update_video_label(self):
-        if self.camera_manager.latest_frame is not None:
-            frame = self.camera_manager.latest_frame
-            
-            # Process frame if image processor exists
-            if hasattr(self, 'image_pro'):
-                processed_frame = self.image_pro.process_frame(frame)
-            else:
-                processed_frame = frame
-                
-            self.display_frame(processed_frame)
+        # The display worker has already resized, processed and converted the frame
+        image = self.display_worker.get_image()
+        if image is not None:
+            self.display_frame(image)
             
         if self.state.recording.is_live:
             self.window.after(33, self.update_video_label)
@@ -278,19 +350,25 @@ class DART:
                 self.logger.error(f"Error updating marker count: {e}")
                 self.ui_controller.update_mocap_status("Error")
 
-    def display_frame(self, frame):
-        # Convert to cv2 img
-        img = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-        # Convert to pil img
-        img = Image.fromarray(img)
+    def display_frame(self, image: Image.Image):
+        label = self.state.ui.video_label
+        if not label:
+            return
 
-        # Convert to tk img
-        img = ctk.CTkImage(img, size=(2*self.camera_manager.frame_width/3, 2*self.camera_manager.frame_height/3))
+        # Reuse one CTkImage (keeps CustomTkinter's HiDPI scaling); only recreate
+        # it when the preview size changes, otherwise swap the image in place
+        photo = self._photo
+        if photo is None or self._photo_key != image.size:
+            photo = self._photo = ctk.CTkImage(light_image=image, size=image.size)
+            self._photo_key = image.size
+            self._photo_label = None
+        else:
+            photo.configure(light_image=image)
 
-        # Update label with new image through state manager
-        if self.state.ui.video_label:
-            self.state.ui.video_label.configure(image=img)
+        # Attach to the label once (views recreate the label when switching)
+        if self._photo_label is not label:
+            label.configure(image=photo)
+            self._photo_label = label
 
     def set_threshold(self, value: float):
         self.image_pro.threshold_value = int(value)
@@ -461,7 +539,8 @@ class DART:
                 
             # Close mocap connection
             if self.state.hardware.qtm_stream:
-                if isinstance(self.state.hardware.qtm_stream, QTMStream):
+                # QTM streams need their async connection closed first
+                if hasattr(self.state.hardware.qtm_stream, '_close'):
                     self.state.hardware.qtm_stream._close()
                 self.state.hardware.qtm_stream.close()
                 
@@ -556,6 +635,11 @@ class DART:
                     self.logger.error(f"Error disconnecting Theia: {e}")
                 self.theia = None
 
+            from tracking.dart_track import dart_track
+
+            # The tracking process reads the config from disk
+            self.config.flush()
+
             # Create instance of queue for retrieving data
             self.state.tracking['data_queue'] = Queue(maxsize=1)
 
@@ -576,14 +660,45 @@ class DART:
             self.logger.error("DART is not calibrated.")
 
     def calibrate(self):
-        """Calibrate the system using current positions"""
-        if self.state.hardware.qtm_stream:
-            p1 = np.array(self.state.hardware.qtm_stream.position)
-            p2 = np.array(self.state.hardware.qtm_stream.position2)
-            self.calibrator.run(p1, p2)
-            self.ui_controller.update_calibration_age(int(self.calibrator.calibration_age))
+        """
+        Step through a streaming calibration: start the pan sweep, switch to
+        the tilt sweep, then solve from all captured rays.
+        """
+        from tracking.calibration_capture import CalibrationCapture, PAN
+
+        capture = self.calibration_capture
+        if capture is None:
+            if not self.state.hardware.qtm_stream:
+                self.logger.error("QTM stream not available for calibration")
+                return
+            self.calibration_capture = CalibrationCapture(
+                self.state.hardware.qtm_stream,
+                self.calibrator,
+                self.config.config["calibration"].get("capture", {})
+            )
+            self.calibration_capture.start()
+            self.update_calibration_progress()
+        elif capture.phase == PAN:
+            capture.next_phase()
         else:
-            self.logger.error("QTM stream not available for calibration")
+            self.calibration_capture = None
+            try:
+                capture.finish()
+                self.ui_controller.update_calibration_age(int(self.calibrator.calibration_age))
+            except ValueError as e:
+                self.logger.error(f"Calibration failed: {e}")
+            self.ui_controller.update_calibration_button("Calibrate")
+
+    def update_calibration_progress(self):
+        """Show the sweep and ray count on the calibrate button while capturing"""
+        capture = self.calibration_capture
+        if capture is None:
+            return
+        text = f"{capture.phase.title()}: {capture.count()}"
+        if capture.running_rms is not None:
+            text += f" ({capture.running_rms:.1f} mm)"
+        self.ui_controller.update_calibration_button(text)
+        self.window.after(250, self.update_calibration_progress)
 
     def open_theia_control_window(self):
         """Open the Theia lens control window"""
@@ -614,6 +729,7 @@ class DART:
                 self.theia_window.focus_force()  # Force focus
             else:
                 # Create new window
+                from ui.views.theia_control_window import TheiaLensControlWindow
                 self.theia_window = TheiaLensControlWindow(self.window, self)
                 self.theia_window.grab_set()  # Make window modal
         except Exception as e:
@@ -622,6 +738,7 @@ class DART:
             if hasattr(self, 'theia_window'):
                 delattr(self, 'theia_window')
             # Create new window
+            from ui.views.theia_control_window import TheiaLensControlWindow
             self.theia_window = TheiaLensControlWindow(self.window, self)
             self.theia_window.grab_set()
 
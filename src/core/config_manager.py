@@ -1,16 +1,52 @@
+import atexit
 import json
 import logging
+import os
+import threading
 import numpy as np
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
 class ConfigManager:
-    """Manages centralized application configuration"""
-    def __init__(self, config_path: str = "config/app_config.json"):
+    """
+    Manages centralized application configuration.
+
+    The config is held in memory; updates mark it dirty and a background
+    timer writes it `flush_delay` seconds after the last change, so callers
+    (including the Tk thread) never wait on disk. Writes go to a temporary
+    file that is fsynced and renamed over app_config.json, so a crash leaves
+    either the old or the new file, never a truncated one. Call flush() before
+    handing the file to another process or exiting it.
+    """
+    # One instance per (process, config file), see shared()
+    _instances: Dict[Tuple[int, Path], "ConfigManager"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, config_path: str = "config/app_config.json", flush_delay: float = 0.5):
+        self.logger = logging.getLogger("ConfigManager")
         self.config_path = Path(config_path)
+        self.flush_delay = flush_delay
+
+        self._lock = threading.RLock()
+        # Serialises whole flushes (snapshot, write, rename); always taken before _lock
+        self._write_lock = threading.RLock()
+        self._dirty = False
+        self._flush_timer = None
+
         self.config = self.load_config()
-        self.logger = logging.getLogger("ConfigManager")
+        # Last-chance write of pending changes on normal interpreter exit
+        atexit.register(self.flush)
+
+    @classmethod
+    def shared(cls, config_path: str = "config/app_config.json") -> "ConfigManager":
+        """Return the process-wide instance for a config file, loading it on first use"""
+        key = (os.getpid(), Path(config_path).resolve())
+        with cls._instances_lock:
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = cls._instances[key] = cls(config_path)
+            return instance
         
     def get_default_config(self) -> Dict:
         """Return default configuration"""
@@ -23,6 +59,7 @@ class ConfigManager:
                 "dynamixel_port": "",
                 "theia_port": "",
                 "last_detected": None,
+                "port_roles": {},  # USB identity (VID:PID:serial:location) -> dynamixel / theia
                 "theia_state": {
                     "zoom_position": 0,
                     "focus_position": 0,
@@ -34,19 +71,69 @@ class ConfigManager:
                 "tilt_origin": None,
                 "rotation_matrix": None,
                 "timestamp": None,
-                "is_calibrated": False
+                "is_calibrated": False,
+                "camera_intrinsics": None,  # Tracking camera matrix / distortion (tracking/intrinsics.py)
+                "residuals": None,  # Fit report of the last ray calibration
+                "solver": {
+                    "ransac_threshold": 10.0,  # Max ray-to-origin distance of an inlier (mm)
+                    "ransac_iterations": 200,  # Random ray pairs tried per origin
+                    "min_rays": 3  # Rays needed per sweep (pan / tilt)
+                },
+                "capture": {
+                    "poll_hz": 500,  # Mocap sampling rate of the streaming capture
+                    "separation_tolerance": 5.0,  # Allowed change of pointer marker distance (mm)
+                    "max_speed": 500.0,  # Faster pointer samples are treated as motion-blurred (mm/s)
+                    "solve_interval": 0.5  # Seconds between running solves
+                }
             },
             "tracking": {
                 "use_kalman": True,
+                "control_hz": 0,  # Mocap control loop rate in Hz (e.g. 500), 0 = free-running
                 "mode": "mocap",  # Can be 'mocap' or 'visual'
+                "circle_detection": {
+                    "roi": [0.0, 0.0, 1.0, 1.0],  # Search region as frame fractions x0, y0, x1, y1
+                    "min_radius": 10,  # Radius band in preview pixels
+                    "max_radius": 120,
+                    "interval": 3,  # Frames between Hough runs (cached circles drawn in between)
+                    "margin": 1.5  # Search window around the last circle, in radii
+                },
                 "visual_tracking": {
                     "frame_history": 60,
                     "deviation_threshold": 4.0,
                     "min_contour_area": 100,
                     "max_object_distance": 75,
                     "learning_rate": 0.005,
-                    "min_object_lifespan": 3
+                    "min_object_lifespan": 3,
+                    "pipelined": True,  # Separate acquisition, processing and actuation threads
+                    "detector": "mog2",  # 'mog2', 'running_average' or 'bright_blob'
+                    "mog2": {"history": 20, "var_threshold": 8},
+                    "running_average": {"alpha": 0.05, "threshold": 25},
+                    "bright_blob": {"threshold": 200},
+                    "roi": {
+                        "enabled": True,
+                        "size": 160,  # Search window side in pixels (grows with target speed)
+                        "diff_threshold": 25,  # Background difference threshold inside the window
+                        "max_misses": 5  # Frames to coast before reacquiring over the full frame
+                    },
+                    "pyramid": {
+                        "enabled": False,
+                        "levels": 1,  # Each level halves the detection resolution
+                        "refine_margin": 2  # Coarse pixels around the blob refined at full resolution
+                    },
+                    "kalman": {
+                        "measurement_noise": 0.0025,  # Detection angle variance (deg^2)
+                        "latency_ms": 8.0,  # Frame to motor delay compensated by prediction
+                        "max_coast_ms": 250.0,  # Keep predicting this long without detections
+                        "actuation_rate_hz": 200.0  # Command rate between processed frames
+                    }
                 }
+            },
+            "recording": {
+                "queue_size": 48,  # Frames buffered between acquisition and the writer
+                "overflow_policy": "drop_oldest",  # 'block', 'drop_oldest' or 'drop_newest'
+                "backend": "ffmpeg",  # 'ffmpeg' (raw pipe) or 'writegear'
+                "preset": "x264_fast",  # 'x264_fast', 'x264_lossless' or 'ffv1'
+                "bayer_pattern": None  # e.g. 'rggb' if the camera streams raw Bayer
             }
         }
     
@@ -62,49 +149,109 @@ class ConfigManager:
         return self.get_default_config()
     
     def reload_config(self) -> None:
-        """Reload configuration from JSON file"""
-        self.config = self.load_config()
+        """Reload configuration from JSON file (e.g. after another process wrote it)"""
+        with self._write_lock, self._lock:
+            # Pending local changes are written first so they are not lost
+            self.flush()
+            self.config = self.load_config()
         
     def save_config(self) -> None:
-        """Save configuration to JSON file"""
+        """Mark the configuration as changed and schedule a background write"""
+        with self._lock:
+            self._dirty = True
+            # Debounce: restart the timer so a burst of updates is written once
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+            self._flush_timer = threading.Timer(self.flush_delay, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    @property
+    def dirty(self) -> bool:
+        """Whether there are changes not yet written to disk"""
+        return self._dirty
+
+    def flush(self) -> None:
+        """Write pending changes to disk now"""
+        # One flush at a time: a timer flush and an explicit flush must not share
+        # the temporary file or rename an older snapshot over a newer one
+        with self._write_lock:
+            with self._lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                if not self._dirty:
+                    return
+                # Serialise under the lock so the snapshot is consistent
+                data = json.dumps(self.config, indent=4, default=self._to_json)
+                self._dirty = False
+
+            # Updates may continue under _lock while the file is written
+            try:
+                self._write_atomic(data)
+            except OSError as e:
+                self.logger.error(f"Failed to save configuration: {e}")
+                with self._lock:
+                    self._dirty = True
+
+    def _write_atomic(self, data: str) -> None:
+        """Write to a temporary file, fsync it and rename it over the config"""
         self.config_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Convert numpy arrays to lists for JSON serialization
-        config_copy = self.config.copy()
-        
-        # Only convert to list if it's a numpy array
-        if config_copy["calibration"]["pan_origin"] is not None:
-            if hasattr(config_copy["calibration"]["pan_origin"], 'tolist'):
-                config_copy["calibration"]["pan_origin"] = config_copy["calibration"]["pan_origin"].tolist()
-                
-        if config_copy["calibration"]["tilt_origin"] is not None:
-            if hasattr(config_copy["calibration"]["tilt_origin"], 'tolist'):
-                config_copy["calibration"]["tilt_origin"] = config_copy["calibration"]["tilt_origin"].tolist()
-                
-        if config_copy["calibration"]["rotation_matrix"] is not None:
-            if hasattr(config_copy["calibration"]["rotation_matrix"], 'tolist'):
-                config_copy["calibration"]["rotation_matrix"] = config_copy["calibration"]["rotation_matrix"].tolist()
-                
-        with open(self.config_path, 'w') as f:
-            json.dump(config_copy, f, indent=4)
+        tmp_path = self.config_path.with_name(f"{self.config_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.config_path)
+
+        # Persist the rename itself (not supported on Windows)
+        if hasattr(os, 'O_DIRECTORY'):
+            dir_fd = os.open(self.config_path.parent, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    @staticmethod
+    def _to_json(value):
+        """Convert numpy values (calibration arrays) for JSON serialization"""
+        if hasattr(value, 'tolist'):
+            return value.tolist()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
     
     def update_device_config(self, devices: Dict) -> None:
         """Update device configuration"""
-        self.config["devices"].update(devices)
-        self.save_config()
+        with self._lock:
+            self.config["devices"].update(devices)
+            self.save_config()
     
     def update_calibration(self, pan_origin: np.ndarray, tilt_origin: np.ndarray, 
-                          rotation_matrix: np.ndarray) -> None:
+                          rotation_matrix: np.ndarray, residuals: Optional[Dict] = None) -> None:
         """Update calibration data"""
-        self.config["calibration"].update({
-            "pan_origin": pan_origin,
-            "tilt_origin": tilt_origin,
-            "rotation_matrix": rotation_matrix,
-            "timestamp": datetime.now().isoformat(),
-            "is_calibrated": True
-        })
-        self.save_config()
+        with self._lock:
+            self.config["calibration"].update({
+                "pan_origin": pan_origin,
+                "tilt_origin": tilt_origin,
+                "rotation_matrix": rotation_matrix,
+                "timestamp": datetime.now().isoformat(),
+                "is_calibrated": True,
+                "residuals": residuals
+            })
+            self.save_config()
     
+    def update_camera_intrinsics(self, camera_matrix: np.ndarray, dist_coeffs: np.ndarray,
+                                 image_size: Tuple[int, int], rms: float) -> None:
+        """Update tracking camera intrinsics"""
+        with self._lock:
+            self.config["calibration"]["camera_intrinsics"] = {
+                "camera_matrix": np.asarray(camera_matrix).tolist(),
+                "dist_coeffs": np.asarray(dist_coeffs).ravel().tolist(),
+                "image_size": list(image_size),
+                "rms": rms,
+                "timestamp": datetime.now().isoformat()
+            }
+            self.save_config()
+
     def get_calibration_age(self) -> Optional[float]:
         """Get calibration age in hours"""
         if not self.config["calibration"]["timestamp"]:
@@ -129,41 +276,43 @@ class ConfigManager:
     
     def update_theia_position(self, zoom: int = None, focus: int = None, iris: int = None) -> None:
         """Update stored Theia lens positions"""
-        if "theia_state" not in self.config["devices"]:
-            self.config["devices"]["theia_state"] = {
-                "zoom_position": 0,
-                "focus_position": 0,
-                "iris_position": 0,
-                "is_homed": False  # Track whether axes have been homed
-            }
+        with self._lock:
+            if "theia_state" not in self.config["devices"]:
+                self.config["devices"]["theia_state"] = {
+                    "zoom_position": 0,
+                    "focus_position": 0,
+                    "iris_position": 0,
+                    "is_homed": False  # Track whether axes have been homed
+                }
             
-        if zoom is not None:
-            self.config["devices"]["theia_state"]["zoom_position"] = zoom
-        if focus is not None:
-            self.config["devices"]["theia_state"]["focus_position"] = focus
-        if iris is not None:
-            # Ensure iris value is within valid range
-            iris = max(0, min(150, iris))
-            self.config["devices"]["theia_state"]["iris_position"] = iris
-        self.save_config()
+            if zoom is not None:
+                self.config["devices"]["theia_state"]["zoom_position"] = zoom
+            if focus is not None:
+                self.config["devices"]["theia_state"]["focus_position"] = focus
+            if iris is not None:
+                # Ensure iris value is within valid range
+                iris = max(0, min(150, iris))
+                self.config["devices"]["theia_state"]["iris_position"] = iris
+            self.save_config()
 
     def set_theia_homed(self, axis: str, status: bool = True) -> None:
         """Update homing status for Theia axes"""
-        if "theia_state" not in self.config["devices"]:
-            self.config["devices"]["theia_state"] = {
-                "zoom_position": 0,
-                "focus_position": 0,
-                "is_homed": False
-            }
+        with self._lock:
+            if "theia_state" not in self.config["devices"]:
+                self.config["devices"]["theia_state"] = {
+                    "zoom_position": 0,
+                    "focus_position": 0,
+                    "is_homed": False
+                }
             
-        if axis.upper() == "A":
-            self.config["devices"]["theia_state"]["zoom_homed"] = status
-        elif axis.upper() == "B":
-            self.config["devices"]["theia_state"]["focus_homed"] = status
+            if axis.upper() == "A":
+                self.config["devices"]["theia_state"]["zoom_homed"] = status
+            elif axis.upper() == "B":
+                self.config["devices"]["theia_state"]["focus_homed"] = status
             
-        # If both axes are homed, set overall homed status
-        if (self.config["devices"]["theia_state"].get("zoom_homed", False) and 
-            self.config["devices"]["theia_state"].get("focus_homed", False)):
-            self.config["devices"]["theia_state"]["is_homed"] = True
+            # If both axes are homed, set overall homed status
+            if (self.config["devices"]["theia_state"].get("zoom_homed", False) and 
+                self.config["devices"]["theia_state"].get("focus_homed", False)):
+                self.config["devices"]["theia_state"]["is_homed"] = True
             
-        self.save_config()
\ No newline at end of file
+            self.save_config()
\ No newline at end of file
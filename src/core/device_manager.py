@@ -1,15 +1,20 @@
 import json
 import serial.tools.list_ports
-import PySpin
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+# Roles of the serial devices, as cached in config["devices"]["port_roles"]
+DYNAMIXEL = "dynamixel"
+THEIA = "theia"
+
 class DeviceManager:
     """Manages device detection and configuration persistence"""
-    def __init__(self, config_manager):
+    def __init__(self, config_manager, probe_timeout: float = 2.0):
         self.config = config_manager
         self.logger = logging.getLogger("DeviceManager")
+        self.probe_timeout = probe_timeout  # Seconds a single port may take to answer
         
     def get_device_config(self) -> Dict:
         """Get current device configuration"""
@@ -24,11 +29,17 @@ class DeviceManager:
         try:
             self.logger.info("Starting device detection...")
             
-            # Look for new devices using stored initial state
-            new_ports = set(self.get_com_ports()) - self.initial_ports
-            new_cameras = set(self.get_camera_serials()) - self.initial_cameras
+            # Enumerate cameras while the new COM ports are being probed
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                camera_future = pool.submit(self.get_camera_serials)
+
+                # Look for new devices using stored initial state
+                new_ports = set(self.get_com_ports()) - self.initial_ports
+                self.logger.info(f"New ports detected: {new_ports}")
+                roles = self.identify_com_ports(new_ports) if len(new_ports) == 2 else (None, None)
+
+                new_cameras = set(camera_future.result()) - self.initial_cameras
             
-            self.logger.info(f"New ports detected: {new_ports}")
             self.logger.info(f"New cameras detected: {new_cameras}")
             
             # First check if we found both cameras
@@ -39,8 +50,7 @@ class DeviceManager:
             if len(new_ports) != 2:
                 return False, f"Expected 2 COM ports, found {len(new_ports)}"
             
-            # Identify which port is which
-            dyna_port, theia_port = self.identify_com_ports(new_ports)
+            dyna_port, theia_port = roles
             
             self.logger.info(f"Identified ports - Dyna: {dyna_port}, Theia: {theia_port}")
             
@@ -62,9 +72,28 @@ class DeviceManager:
     def get_com_ports(self) -> List[str]:
         """Get list of available COM ports"""
         return [port.device for port in serial.tools.list_ports.comports()]
+
+    def get_port_keys(self) -> Dict[str, str]:
+        """
+        USB identity of each COM port: VID:PID, adapter serial and bus location.
+
+        Device paths change between boots and hubs, the USB identity does not.
+        """
+        return {
+            port.device: f"{port.vid}:{port.pid}:{port.serial_number}:{port.location}"
+            for port in serial.tools.list_ports.comports()
+            if port.vid is not None
+        }
     
     def get_camera_serials(self) -> List[str]:
-        """Get list of connected FLIR camera serials using PySpin"""
+        """
+        Get list of connected FLIR camera serials using PySpin.
+
+        The serial comes from the transport layer nodemap, which is readable
+        without Init(), so no camera is opened during enumeration.
+        """
+        import PySpin
+
         cameras = []
         system = None
         cam_list = None
@@ -77,9 +106,6 @@ class DeviceManager:
             
             self.logger.info(f"Found {num_cameras} cameras")
             
-            if num_cameras == 0:
-                return []
-            
             for i in range(num_cameras):
                 try:
                     # Get camera using index
@@ -87,10 +113,6 @@ class DeviceManager:
                     
                     if not cam.IsValid():
                         continue
-                        
-                    # Initialize camera
-                    if not cam.IsInitialized():
-                        cam.Init()
                     
                     # Get TL device nodemap and serial number
                     nodemap = cam.GetTLDeviceNodeMap()
@@ -101,8 +123,6 @@ class DeviceManager:
                         cameras.append(str(serial_number))
                         self.logger.info(f"Found camera with serial: {serial_number}")
                     
-                    # Deinitialize camera
-                    cam.DeInit()
                     del cam
                     
                 except PySpin.SpinnakerException as e:
@@ -135,58 +155,55 @@ class DeviceManager:
     def identify_com_ports(self, ports: set) -> Tuple[Optional[str], Optional[str]]:
         """
         Identify which COM port is for Dynamixel and which is for Theia
+
+        Ports whose USB identity was identified before take their cached role;
+        the rest are probed concurrently, each limited to `probe_timeout`.
         Returns: (dynamixel_port, theia_port)
         """
-        dyna_port = None
-        theia_port = None
-        remaining_ports = set(ports)  # Keep track of unidentified ports
-        
-        # First try to identify Dynamixel port
+        port_keys = self.get_port_keys()
+        cached_roles = self.get_device_config().get("port_roles", {})
+        roles = {}
         for port in ports:
-            try:
-                from hardware.motion.dyna_controller import DynaController
-                dyna = DynaController(port)
-                if dyna.open_port():
-                    dyna_port = port
-                    dyna.close_port()
-                    remaining_ports.remove(port)
-                    self.logger.info(f"Identified Dynamixel port: {port}")
-                    break  # Exit loop once Dynamixel is found
-            except Exception as e:
-                self.logger.debug(f"Port {port} is not Dynamixel: {e}")
-                continue
-        
-        # If Dynamixel was found and only one port remains, assume it's Theia
-        if dyna_port and len(remaining_ports) == 1:
-            theia_port = remaining_ports.pop()
-            self.logger.info(f"Assuming remaining port is Theia: {theia_port}")
-            return dyna_port, theia_port
-        
-        # If Dynamixel wasn't found or multiple ports remain, try to identify Theia
-        for port in remaining_ports:
-            try:
-                from hardware.motion.theia_controller import TheiaController
-                theia = TheiaController(port)
-                theia.connect()
-                
-                # Try to read status - if no error, assume it's Theia
-                status = theia._ser_send("!1")
-                if status:  # Add any specific validation of status format if needed
-                    theia_port = port
-                    self.logger.info(f"Identified Theia port through status check: {port}")
-                
-                theia.disconnect()
-                
-                if theia_port:
-                    break
-                    
-            except Exception as e:
-                self.logger.debug(f"Port {port} is not Theia: {e}")
-                continue
+            role = cached_roles.get(port_keys.get(port))
+            if role:
+                roles[port] = role
+                self.logger.info(f"Port {port} is {role} (cached)")
+
+        # Probe the remaining ports in parallel; a hung port only costs its timeout
+        unknown = [port for port in ports if port not in roles]
+        if unknown:
+            pool = ThreadPoolExecutor(max_workers=len(unknown))
+            futures = {pool.submit(self.probe_port, port): port for port in unknown}
+            done, not_done = wait(futures, timeout=self.probe_timeout * 2)
+            for future in done:
+                if future.result():
+                    roles[futures[future]] = future.result()
+            for future in not_done:
+                self.logger.warning(f"Probing {futures[future]} timed out")
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        dyna_port = next((port for port, role in roles.items() if role == DYNAMIXEL), None)
+        theia_port = next((port for port, role in roles.items() if role == THEIA), None)
+
+        # If only one port is left unidentified, assume it is the other device
+        remaining = set(ports) - {dyna_port, theia_port}
+        if len(remaining) == 1:
+            if dyna_port and not theia_port:
+                theia_port = remaining.pop()
+                self.logger.info(f"Assuming remaining port is Theia: {theia_port}")
+            elif theia_port and not dyna_port:
+                dyna_port = remaining.pop()
+                self.logger.info(f"Assuming remaining port is Dynamixel: {dyna_port}")
         
         # Log the final identification results
         if dyna_port and theia_port:
             self.logger.info(f"Successfully identified both ports - Dyna: {dyna_port}, Theia: {theia_port}")
+            # Remember the roles by USB identity for the next detection
+            self.save_device_config({"port_roles": {
+                **cached_roles,
+                **{port_keys[port]: role for port, role in ((dyna_port, DYNAMIXEL), (theia_port, THEIA))
+                   if port in port_keys}
+            }})
         elif dyna_port:
             self.logger.warning("Only Dynamixel port identified")
         elif theia_port:
@@ -195,9 +212,44 @@ class DeviceManager:
             self.logger.error("Failed to identify any ports")
             
         return dyna_port, theia_port
+
+    def probe_port(self, port: str) -> Optional[str]:
+        """Return DYNAMIXEL or THEIA if the device on the port answers, otherwise None"""
+        try:
+            from hardware.motion.dyna_controller import DynaController
+            dyna = DynaController(port)
+            if dyna.open_port():
+                try:
+                    # A servo answering a ping identifies the U2D2 adapter
+                    _, comm_result, _ = dyna.packet_handler.ping(dyna.port_handler, dyna.pan_id)
+                    if comm_result == 0:  # COMM_SUCCESS
+                        self.logger.info(f"Identified Dynamixel port: {port}")
+                        return DYNAMIXEL
+                finally:
+                    # close_port() would also write torque registers
+                    dyna.port_handler.closePort()
+        except Exception as e:
+            self.logger.debug(f"Port {port} is not Dynamixel: {e}")
+
+        try:
+            from hardware.motion.theia_controller import TheiaController
+            theia = TheiaController(port, timeout=self.probe_timeout)
+            theia.connect()
+            try:
+                # Try to read status - if there is a reply, assume it's Theia
+                if theia._ser_send("!1"):
+                    self.logger.info(f"Identified Theia port through status check: {port}")
+                    return THEIA
+            finally:
+                theia.disconnect()
+        except Exception as e:
+            self.logger.debug(f"Port {port} is not Theia: {e}")
+        return None
     
     def verify_camera_access(self, serial: str) -> bool:
         """Verify that a camera with given serial number is accessible"""
+        import PySpin
+
         try:
             system = PySpin.System.GetInstance()
             cam_list = system.GetCameras()
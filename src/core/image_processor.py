@@ -2,7 +2,10 @@ import numpy as np
 import cv2
 
 class ImageProcessor:
-    def __init__(self):
+    def __init__(self, circle_config: dict = None):
+        """
+        :param circle_config: config["tracking"]["circle_detection"] (defaults if None).
+        """
         # Initialize default values for image processing
         self.threshold_value = 70
         self.strength_value = 60
@@ -10,13 +13,34 @@ class ImageProcessor:
         self.show_crosshair = False
         self.detect_circle_flag = False
 
+        circle_config = circle_config or {}
+        # Circle detection is limited to a region of interest (fractions of the
+        # frame: x0, y0, x1, y1) and a radius band in display pixels
+        self.circle_roi = tuple(circle_config.get("roi", (0.0, 0.0, 1.0, 1.0)))
+        self.min_radius = circle_config.get("min_radius", 10)
+        self.max_radius = circle_config.get("max_radius", 120)
+        # Hough is re-run every circle_interval frames; cached circles are drawn in between
+        self.circle_interval = circle_config.get("interval", 3)
+        # Search around the last circle (in radii) before falling back to the full ROI
+        self.circle_margin = circle_config.get("margin", 1.5)
+
+        self._circles = None
+        self._circle_frames = 0
+        self._circle_key = None
+
+        # Static overlay (crosshair) rendered once per frame size
+        self._overlay = None
+        self._overlay_mask = None
+        self._overlay_key = None
+
     def process_frame(self, frame):
         """
         Process the given frame based on the specified flags.
 
+        Overlays are drawn in place, so the frame should be the (downscaled)
+        display image rather than a camera buffer.
+
         :param frame: The input frame to be processed.
-        :param show_crosshair: Boolean flag to determine if a crosshair should be drawn.
-        :param detect_circle: Boolean flag to determine if circles should be detected.
         :return: The processed frame.
         """
 
@@ -31,6 +55,8 @@ class ImageProcessor:
         # Detect circles if the flag is set
         if self.detect_circle_flag:
             frame = self.detect_circle(frame)
+        else:
+            self._circles = None
 
         # Draw a crosshair if the flag is set
         if self.show_crosshair:
@@ -50,39 +76,111 @@ class ImageProcessor:
         """
         Detect and draw circles in the given frame.
 
+        Detection only runs every `circle_interval` frames (or when the
+        parameters change) inside a window around the last circle, or the
+        configured ROI; the cached circles are drawn on every frame.
+
         :param frame: The frame in which circles will be detected.
         :return: The frame with detected circles drawn.
         """
+        key = (frame.shape, self.threshold_value, self.strength_value,
+               self.circle_roi, self.min_radius, self.max_radius)
+        if key != self._circle_key or self._circle_frames >= self.circle_interval:
+            self._circles = self.find_circles(frame)
+            self._circle_key = key
+            self._circle_frames = 0
+        self._circle_frames += 1
+
+        if self._circles is not None:
+            for x, y, r in self._circles:
+                cv2.circle(frame, (x, y), r, (255, 0, 255), 2)  # Draw the circle outline
+                cv2.circle(frame, (x, y), 1, (255, 0, 255), 3)  # Draw the circle center
+
+        return frame
+
+    def find_circles(self, frame):
+        """
+        Run the Hough transform on the search region.
+
+        :param frame: Grayscale frame.
+        :return: Array of (x, y, radius) in frame coordinates, or None.
+        """
+        height, width = frame.shape[:2]
+        x0, y0, x1, y1 = self.search_region(width, height)
+        if x1 - x0 < 2 * self.min_radius or y1 - y0 < 2 * self.min_radius:
+            return None
+
         try:
-            blurred_frame = cv2.medianBlur(frame, 5)
+            blurred_frame = cv2.medianBlur(frame[y0:y1, x0:x1], 5)
+            max_radius = min(self.max_radius, (x1 - x0) // 2, (y1 - y0) // 2)
             circles = cv2.HoughCircles(blurred_frame, cv2.HOUGH_GRADIENT, dp=1.2, minDist=100,
                                        param1=self.threshold_value, param2=self.strength_value,
-                                       minRadius=0, maxRadius=0)
-
-            if circles is not None:
-                circles = np.uint16(np.around(circles))
-                for i in circles[0, :]:
-                    cv2.circle(frame, (i[0], i[1]), i[2], (255, 0, 255), 2)  # Draw the circle outline
-                    cv2.circle(frame, (i[0], i[1]), 1, (255, 0, 255), 3)  # Draw the circle center
+                                       minRadius=self.min_radius, maxRadius=max_radius)
         except Exception as e:
             print(f"Error in circle detection: {e}")
+            return None
 
-        return frame
+        if circles is None:
+            return None
+        circles = np.around(circles[0]).astype(np.int32)
+        circles[:, 0] += x0
+        circles[:, 1] += y0
+        return circles
+
+    def search_region(self, width, height):
+        """
+        Pixel bounds (x0, y0, x1, y1) to search for circles.
+
+        A window around the last detected circle when there is one, otherwise
+        the configured ROI.
+        """
+        fx0, fy0, fx1, fy1 = self.circle_roi
+        x0, y0 = int(fx0 * width), int(fy0 * height)
+        x1, y1 = int(fx1 * width), int(fy1 * height)
+
+        if self._circles is not None and len(self._circles):
+            x, y, r = self._circles[0]
+            half = int(r * (1 + self.circle_margin))
+            x0, y0 = max(x0, x - half), max(y0, y - half)
+            x1, y1 = min(x1, x + half), min(y1, y + half)
+        return x0, y0, x1, y1
 
     def draw_crosshair(self, frame):
         """
         Draw a crosshair on the given frame.
 
+        The crosshair is rendered once into an overlay layer per frame size
+        and composited in place.
+
         :param frame: The frame on which the crosshair will be drawn.
         :return: The frame with a crosshair.
         """
-        # Make a copy of the frame to make it writable
-        frame_copy = frame.copy()
-        
-        height, width = frame_copy.shape[:2]
+        key = frame.shape
+        if key != self._overlay_key:
+            self._overlay, self._overlay_mask = self.render_crosshair(frame.shape, frame.dtype)
+            self._overlay_key = key
+
+        np.copyto(frame, self._overlay, where=self._overlay_mask)
+        return frame
+
+    @staticmethod
+    def render_crosshair(shape, dtype):
+        """
+        Render the crosshair overlay and its mask for frames of the given shape.
+
+        :return: (overlay, mask) with the mask broadcastable to the frame.
+        """
+        height, width = shape[:2]
+        overlay = np.zeros(shape, dtype=dtype)
         # Draw vertical line
-        cv2.line(frame_copy, (width // 2, 0), (width // 2, height), (0, 255, 0), 2)
+        cv2.line(overlay, (width // 2, 0), (width // 2, height), (0, 255, 0), 2)
         # Draw horizontal line
-        cv2.line(frame_copy, (0, height // 2), (width, height // 2), (0, 255, 0), 2)
-        
-        return frame_copy
+        cv2.line(overlay, (0, height // 2), (width, height // 2), (0, 255, 0), 2)
+
+        mask = np.zeros((height, width), dtype=np.uint8)
+        cv2.line(mask, (width // 2, 0), (width // 2, height), 255, 2)
+        cv2.line(mask, (0, height // 2), (width, height // 2), 255, 2)
+        mask = mask.astype(bool)
+        if len(shape) == 3:
+            mask = mask[..., None]
+        return overlay, mask
@@ -1,7 +1,9 @@
 from threading import Thread, Event
 from queue import Queue, Empty
 import time
+import json
 from utils.perf_timings import perf_counter_ns
+from utils.tracer import tracer
 import random
 import pandas as pd
 import pyarrow as pa
@@ -11,6 +13,35 @@ from typing import List, Tuple
 import numpy as np
 import logging
 
+# Target position is stored as three float64 columns (not an object column of arrays)
+POSITION_COLUMNS = ['target_x', 'target_y', 'target_z']
+VALUE_COLUMNS = ['desired_pan', 'desired_tilt', 'encoder_pan', 'encoder_tilt', 'time_stamp_ms']
+
+
+def target_positions(df: pd.DataFrame) -> np.ndarray:
+    """
+    Target positions of a recording as an (N, 3) float64 array.
+
+    Reads the target_x/y/z columns; recordings made before they existed
+    stored a `target_position` object column (arrays, or their string form)
+    and are parsed row by row. Rows that cannot be parsed are NaN.
+    """
+    if all(column in df.columns for column in POSITION_COLUMNS):
+        return df[POSITION_COLUMNS].to_numpy(dtype=np.float64)
+
+    positions = np.full((len(df), 3), np.nan)
+    for i, pos in enumerate(df['target_position']):
+        try:
+            if isinstance(pos, (str, bytes)):
+                pos = np.fromstring(str(pos).strip('[]'), sep=' ')
+            pos = np.asarray(pos, dtype=np.float64).ravel()
+            if pos.shape == (3,):
+                positions[i] = pos
+        except (TypeError, ValueError):
+            continue
+    return positions
+
+
 class DataHandler:
     def __init__(self, queue: Queue, batch_size: int = 1000, output_dir: str = "output", start_time = None):
         """
@@ -27,6 +58,8 @@ class DataHandler:
         self.start_time_ms = start_time
         self.merged_file_path = None
         self.frame_timestamps = []
+        self.dropped_frames = []
+        self.frame_ids = []
         self.collecting = True
 
     def start(self, output_file: str = "merged_data.parquet"):
@@ -70,9 +103,13 @@ class DataHandler:
                 if data == 'DONE':
                     break
                 data_batch.append(data)
+                # Arrival of each tracking sample
+                tracer.instant("data_sample")
 
                 if len(data_batch) >= self.batch_size:
+                    span_start = tracer.begin()
                     self._write_to_parquet_batch(data_batch)
+                    tracer.end("parquet_write", span_start)
                     data_batch = []
             except Empty:
                 continue
@@ -85,11 +122,18 @@ class DataHandler:
         if not data_batch:
             return
 
-        # Just write the raw data
-        df = pd.DataFrame(data_batch, columns=['target_position', 'desired_pan', 'desired_tilt', 
-                                             'encoder_pan', 'encoder_tilt', 'time_stamp_ms'])
-        
-        table = pa.Table.from_pandas(df)
+        # Build the columns directly; positions become three float64 columns
+        positions = np.full((len(data_batch), 3), np.nan)
+        for i, row in enumerate(data_batch):
+            try:
+                positions[i] = np.asarray(row[0], dtype=np.float64).reshape(3)
+            except (TypeError, ValueError):
+                continue
+        values = np.array([row[1:6] for row in data_batch], dtype=np.float64)
+
+        columns = {name: positions[:, i] for i, name in enumerate(POSITION_COLUMNS)}
+        columns.update({name: values[:, i] for i, name in enumerate(VALUE_COLUMNS)})
+        table = pa.table(columns)
         filename = self.output_dir / f"data_batch_{self.batch_number}.parquet"
         pq.write_table(table, filename)
         self.batch_number += 1
@@ -129,6 +173,24 @@ class DataHandler:
                 axis=1
             )
             
+            # 4. Map capture indices to frames actually present in the video
+            if self.dropped_frames:
+                dropped = np.array(self.dropped_frames, dtype=np.int64)
+                frame_numbers = df['frame_number'].to_numpy()
+                video_frames = frame_numbers - np.searchsorted(dropped, frame_numbers, side='left')
+                is_dropped = np.isin(frame_numbers, dropped)
+                df['video_frame'] = np.where(is_dropped | (frame_numbers < 0), -1, video_frames)
+            else:
+                df['video_frame'] = df['frame_number']
+            
+            # 5. Camera frame IDs, with gaps marking frames the camera never delivered
+            missed_ids = self._missed_frame_ids()
+            if len(self.frame_ids) == len(self.frame_timestamps):
+                frame_ids = np.append(np.array(self.frame_ids, dtype=np.int64), -1)
+                df['camera_frame_id'] = frame_ids[df['frame_number'].to_numpy()]
+            if missed_ids:
+                self.logger.warning(f"Camera frame ID gaps: {len(missed_ids)} frames missed")
+            
             # Log synchronization statistics
             mean_error = df['sync_error_ms'].mean()
             max_error = df['sync_error_ms'].max()
@@ -141,6 +203,10 @@ class DataHandler:
         # Save processed data
         self.logger.info(f"Saving processed data to {self.merged_file_path}")
         table = pa.Table.from_pandas(df)
+        metadata = dict(table.schema.metadata or {})
+        metadata[b'dart_dropped_frames'] = json.dumps(self.dropped_frames).encode()
+        metadata[b'dart_missed_frame_ids'] = json.dumps(self._missed_frame_ids()).encode()
+        table = table.replace_schema_metadata(metadata)
         pq.write_table(table, self.merged_file_path)
         
         # Cleanup batch files
@@ -222,6 +288,34 @@ class DataHandler:
         self.frame_timestamps = timestamps
         self.logger.info(f"Received {len(timestamps)} frame timestamps")
 
+    def set_frame_ids(self, frame_ids: List[int]):
+        """
+        Set the camera frame IDs (chunk data) of the captured frames.
+        
+        Args:
+            frame_ids: Frame ID per captured frame, -1 where unavailable
+        """
+        self.frame_ids = list(frame_ids)
+
+    def _missed_frame_ids(self) -> List[int]:
+        """Frame IDs skipped by the camera, found from gaps in the ID sequence"""
+        ids = np.array([i for i in self.frame_ids if i >= 0], dtype=np.int64)
+        if len(ids) < 2:
+            return []
+        gaps = np.nonzero(np.diff(ids) > 1)[0]
+        return [int(i) for g in gaps for i in range(ids[g] + 1, ids[g + 1])]
+
+    def set_dropped_frames(self, dropped_frames: List[int]):
+        """
+        Set the capture indices of frames missing from the video file.
+        
+        Args:
+            dropped_frames: Sorted list of 0-based capture indices
+        """
+        self.dropped_frames = sorted(dropped_frames)
+        if self.dropped_frames:
+            self.logger.warning(f"{len(self.dropped_frames)} frames were dropped from the video")
+
 def add_test_data(queue: Queue, control_event: Event):
     """
     Function to generate and queue test data.
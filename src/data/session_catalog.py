@@ -0,0 +1,219 @@
+"""
+Index of recorded sessions (video + tracking data) in a recordings directory.
+
+DART adds a row when a recording is saved, so viewers can list sessions
+without scanning the directory and opening every video:
+    python src/data/session_catalog.py static/recordings          # list sessions
+    python src/data/session_catalog.py static/recordings --rebuild  # index existing files
+"""
+import argparse
+import json
+import logging
+import re
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+CATALOG_NAME = "sessions.sqlite"
+
+# Session key shared by a recording's files, e.g. video_1612T143225_FPS200.0_START123.mp4
+TIMESTAMP_PATTERN = re.compile(r'(\d{4}T\d{6})')
+FPS_PATTERN = re.compile(r'FPS(\d+\.?\d*)')
+
+COLUMNS = {
+    "session": "TEXT PRIMARY KEY",
+    "video": "TEXT",
+    "data": "TEXT",
+    "metadata": "TEXT",
+    "started_at": "TEXT",
+    "fps": "REAL",
+    "frame_count": "INTEGER",
+    "dropped_frames": "INTEGER",
+    "duration_s": "REAL",
+    "samples": "INTEGER",
+    "mean_sync_error_ms": "REAL",
+    "max_sync_error_ms": "REAL",
+}
+
+
+class SessionCatalog:
+    """
+    SQLite catalogue of the sessions in a recordings directory.
+
+    Paths are stored relative to the directory so it can be moved or copied.
+
+    Args:
+        recordings_dir: Directory holding the videos and parquet files
+    """
+    def __init__(self, recordings_dir: str = "static/recordings"):
+        self.logger = logging.getLogger("SessionCatalog")
+        self.recordings_dir = Path(recordings_dir)
+        self.path = self.recordings_dir / CATALOG_NAME
+
+    def _connect(self) -> sqlite3.Connection:
+        self.recordings_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        columns = ", ".join(f"{name} {kind}" for name, kind in COLUMNS.items())
+        conn.execute(f"CREATE TABLE IF NOT EXISTS sessions ({columns})")
+        return conn
+
+    def add_session(self, session: str, **fields) -> None:
+        """Insert or update a session; paths may be absolute or relative to the directory"""
+        row = {"session": session}
+        for name, value in fields.items():
+            if name not in COLUMNS:
+                raise ValueError(f"Unknown catalogue field: {name}")
+            if name in ("video", "data", "metadata") and value is not None:
+                value = self._relative(value)
+            row[name] = value
+
+        names = ", ".join(row)
+        placeholders = ", ".join("?" for _ in row)
+        updates = ", ".join(f"{name} = excluded.{name}" for name in row if name != "session")
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT INTO sessions ({names}) VALUES ({placeholders}) "
+                f"ON CONFLICT(session) DO UPDATE SET {updates}",
+                list(row.values())
+            )
+        conn.close()
+
+    def list_sessions(self, require_data: bool = False, limit: Optional[int] = None) -> List[Dict]:
+        """Sessions newest first, with paths resolved against the recordings directory"""
+        if not self.path.exists():
+            return []
+        query = "SELECT * FROM sessions"
+        if require_data:
+            query += " WHERE video IS NOT NULL AND data IS NOT NULL"
+        query += " ORDER BY started_at DESC, session DESC"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        with self._connect() as conn:
+            rows = [self._resolve(dict(row)) for row in conn.execute(query)]
+        conn.close()
+        return rows
+
+    def get_session(self, session: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM sessions WHERE session = ?", (session,)).fetchone()
+        conn.close()
+        return self._resolve(dict(row)) if row else None
+
+    def rebuild(self) -> int:
+        """
+        Index sessions already on disk that are missing from the catalogue.
+
+        Uses the recording sidecar JSON where present and only opens the
+        video to count frames for recordings that predate it.
+        """
+        known = {row["session"] for row in self.list_sessions()}
+        files: Dict[str, Dict[str, Path]] = {}
+        for path in self.recordings_dir.iterdir():
+            match = TIMESTAMP_PATTERN.search(path.name)
+            if not match or match.group(1) in known:
+                continue
+            kind = {".mp4": "video", ".mkv": "video", ".parquet": "data", ".json": "metadata"}.get(path.suffix)
+            if kind:
+                files.setdefault(match.group(1), {})[kind] = path
+
+        for session, paths in files.items():
+            self.add_session(session, **describe_session(session, **paths))
+        if files:
+            self.logger.info(f"Indexed {len(files)} sessions in {self.recordings_dir}")
+        return len(files)
+
+    def _relative(self, path) -> str:
+        path = Path(path)
+        try:
+            return str(path.resolve().relative_to(self.recordings_dir.resolve()))
+        except ValueError:
+            return str(path)
+
+    def _resolve(self, row: Dict) -> Dict:
+        for name in ("video", "data", "metadata"):
+            if row.get(name):
+                row[name] = self.recordings_dir / row[name]
+        return row
+
+
+def session_start(session: str, year: Optional[int] = None) -> Optional[str]:
+    """ISO start time from a ddmmTHHMMSS session key (the key carries no year)"""
+    try:
+        started = datetime.strptime(session, '%d%mT%H%M%S')
+    except ValueError:
+        return None
+    now = datetime.now()
+    started = started.replace(year=year or now.year)
+    if year is None and started > now:
+        # Recorded last year
+        started = started.replace(year=now.year - 1)
+    return started.isoformat()
+
+
+def summarise_data(data_path) -> Dict:
+    """Sample count and sync error statistics of a merged tracking parquet"""
+    import pyarrow.parquet as pq
+
+    summary = {"samples": pq.read_metadata(data_path).num_rows}
+    if "sync_error_ms" not in pq.read_schema(data_path).names:
+        return summary
+    # Only the one column is read
+    sync = pq.read_table(data_path, columns=["sync_error_ms"]).column(0).to_numpy()
+    sync = sync[sync == sync]  # Drop NaN
+    return {
+        **summary,
+        "mean_sync_error_ms": float(sync.mean()) if len(sync) else None,
+        "max_sync_error_ms": float(sync.max()) if len(sync) else None,
+    }
+
+
+def describe_session(session: str, video: Optional[Path] = None, data: Optional[Path] = None,
+                     metadata: Optional[Path] = None) -> Dict:
+    """Catalogue fields for a session's files on disk"""
+    fields = {"video": video, "data": data, "metadata": metadata, "started_at": session_start(session)}
+
+    if metadata is not None:
+        with open(metadata) as f:
+            info = json.load(f)
+        fields.update({
+            "fps": info.get("fps"),
+            "frame_count": info.get("frames_written"),
+            "dropped_frames": len(info.get("dropped_frames", [])),
+        })
+    elif video is not None:
+        import cv2
+
+        match = FPS_PATTERN.search(video.name)
+        cap = cv2.VideoCapture(str(video))
+        fields["frame_count"] = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fields["fps"] = float(match.group(1)) if match else cap.get(cv2.CAP_PROP_FPS)
+        cap.release()
+
+    if fields.get("fps") and fields.get("frame_count") is not None:
+        fields["duration_s"] = fields["frame_count"] / fields["fps"]
+    if data is not None:
+        fields.update(summarise_data(data))
+    return fields
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="List or rebuild the recordings session catalogue")
+    parser.add_argument("recordings_dir", nargs="?", default="static/recordings")
+    parser.add_argument("--rebuild", action="store_true", help="index sessions missing from the catalogue")
+    args = parser.parse_args()
+
+    catalog = SessionCatalog(args.recordings_dir)
+    if args.rebuild:
+        print(f"Indexed {catalog.rebuild()} sessions")
+    for row in catalog.list_sessions():
+        duration = f"{row['duration_s']:.1f} s" if row["duration_s"] else "-"
+        data = row["data"].name if row["data"] else "no tracking data"
+        print(f"{row['session']}  {row['started_at'] or '':19}  {duration:>9}  {data}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,36 +1,82 @@
-import time, cv2, logging, EasyPySpin, warnings, sys, numpy as np
-from vidgear.gears import WriteGear
+import time, cv2, logging, warnings, sys, json, numpy as np
 from threading import Thread
-from queue import Queue
+from queue import Queue, Full, Empty
 from pathlib import Path
 from time import perf_counter_ns
+from typing import Dict, List, Optional, Tuple
 from utils.perf_timings import perf_counter_ns
+from utils.tracer import tracer
+from hardware.camera.frame_ring import FrameRing
+from hardware.camera.clock_sync import CameraClockMapper
+from hardware.camera.frame_rate import FrameRateEstimator
+from hardware.camera.video_capture import VideoFileCapture, is_video_source
 
 # Settings the warnings to be ignored 
 warnings.filterwarnings('ignore') 
 
+# Recording queue overflow policies
+BLOCK = "block"              # Stall acquisition until the writer catches up
+DROP_OLDEST = "drop_oldest"  # Discard the oldest queued frame
+DROP_NEWEST = "drop_newest"  # Discard the incoming frame
+OVERFLOW_POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST)
+
 class CameraManager:
-    """Manages camera operations including live feed and recording."""
-    def __init__(self):
+    """
+    Manages camera operations including live feed and recording.
+
+    Args:
+        source: Optional video file, image directory or glob to use instead of
+            a FLIR camera (see VideoFileCapture)
+    """
+    def __init__(self, source: Optional[str] = None):
         self.logger = logging.getLogger("Camera")
         self.cap = None
-        self.initialize_camera()
+
+        # Hardware timestamps (Spinnaker chunk data) mapped onto the host clock
+        self.chunk_enabled = False
+        self.clock_mapper = CameraClockMapper()
+        self.clock_sync_interval_ns = 1_000_000_000
+        self._last_clock_sync_ns = 0
+        self.last_frame_id = None
+        self.last_frame_time_ms = None
+        self._camera_timestamp_ns = None
+        self.frame_ids = []
+        self.missed_frame_ids = []
+
+        if source is not None:
+            self.open_video_source(source)
+        else:
+            self.initialize_camera()
 
         # Initialize video recording params
-        self.frame_queue = Queue()
+        self.record_queue_size = 48  # Below ring_size so queued frames are normally still buffered
+        self.overflow_policy = DROP_OLDEST
+        self.frame_queue = Queue(maxsize=self.record_queue_size)
         self.recording = False
+        self.queue_thread = None
         self.writer = None
         self.debug_overlay = False
+        self.output_path = None
+        self.metadata_path = None
+        self.recording_backend = "ffmpeg"  # 'ffmpeg' (raw pipe) or 'writegear'
+        self.recording_preset = "x264_fast"
+        self.bayer_pattern = None  # e.g. 'rggb' to debayer mono buffers in ffmpeg
+
+        # Recording counters (dropped frames are 0-based capture indices)
+        self.frame_counter = 0
+        self.frames_written = 0
+        self.dropped_frames = []
 
         # Initialize frame streaming params
-        self.latest_frame = None
+        self.ring_size = 64  # Preallocated frames shared by display, recorder and tracker
+        self.frame_ring = None
+        self._write_buffer = None  # Writer-owned copy of the frame being encoded
         self.frame_thread = None
         self.is_reading = False
 
-        # FPS measurement
-        self.frame_times = []
+        # FPS measurement, updated by whichever thread is acquiring
         self.fps_window = 200  # Number of frames to average for FPS calculation
-        self.measured_fps = None
+        self.fps_estimator = FrameRateEstimator(window=self.fps_window)
 
         # Init cam props
         self.initialise_cam_props()
@@ -38,13 +84,23 @@ class CameraManager:
         self.writing = False
 
     def initialise_cam_props(self):
+        if self.cap is None:
+            self.frame_width, self.frame_height = 0, 0
+            self.frame_size = (0, 0)
+            self.fps = 0.0
+            return
         self.frame_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         self.frame_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         self.frame_size = (self.frame_width, self.frame_height)
         self.fps = round(self.cap.get(cv2.CAP_PROP_FPS), 2)
 
     def connect_camera(self, serial):
-        """Connect to camera by serial number"""
+        """Connect to camera by serial number, or to a video file / image sequence path"""
+        if is_video_source(serial):
+            return self.open_video_source(serial)
+
+        import EasyPySpin
+
         try:
             if self.cap:
                 self.release()
@@ -53,6 +109,9 @@ class CameraManager:
             if not self.cap.isOpened():
                 self.logger.error(f"Failed to open camera {serial}")
                 return False
+
+            # Chunk data can only be configured while the camera is not streaming
+            self.enable_chunk_data()
                 
             # Start acquisition
             self.cap.cam.BeginAcquisition()
@@ -75,15 +134,45 @@ class CameraManager:
                     self.stop_frame_thread()
                     
                 # Stop acquisition
-                if self.cap.cam.IsStreaming():
-                    self.cap.cam.EndAcquisition()
+                cam = getattr(self.cap, 'cam', None)
+                if cam is not None and cam.IsStreaming():
+                    cam.EndAcquisition()
                     
                 self.cap.release()
                 self.cap = None
         except Exception as e:
             self.logger.error(f"Error releasing camera: {e}")
 
+    def open_video_source(self, source: str, fps: Optional[float] = None, realtime: bool = True,
+                          loop: bool = True, grayscale: bool = False) -> bool:
+        """Serve frames from a video file or image sequence instead of a camera"""
+        try:
+            if self.cap:
+                self.release()
+
+            self.cap = VideoFileCapture(source, fps=fps, realtime=realtime, loop=loop, grayscale=grayscale)
+            if not self.cap.isOpened():
+                self.logger.error(f"Failed to open video source {source}")
+                self.cap = None
+                return False
+
+            self.chunk_enabled = False
+            self.initialise_cam_props()
+            self.logger.info(f"Using video source {source} at {self.fps} fps")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error opening video source {source}: {e}")
+            return False
+
     def initialize_camera(self, camera_index=0):
+        try:
+            import EasyPySpin
+        except ImportError as e:
+            # Headless machines without Spinnaker can still use a video source
+            self.logger.warning(f"Spinnaker is not available, no camera opened: {e}")
+            return
+
         try:
             self.cap = EasyPySpin.VideoCapture(camera_index)
             if not self.cap.isOpened():  # Check if the camera has been opened successfully
@@ -97,29 +186,34 @@ class CameraManager:
     def configure_camera(self):
         # self.cap.set_pyspin_value('AcquisitionFrameRateEnable', False)
         # self.cap.set_pyspin_value('AcquisitionFrameRate', 201)
-        pass
+        self.enable_chunk_data()
+
+    def enable_chunk_data(self) -> bool:
+        """Enable FrameID and Timestamp chunks so each image carries its device metadata"""
+        cam = getattr(self.cap, 'cam', None)
+        self.chunk_enabled = False
+        self.clock_mapper = CameraClockMapper()
+        self._last_clock_sync_ns = 0
+        if cam is None:
+            return False
+
+        import PySpin
+
+        try:
+            cam.ChunkModeActive.SetValue(True)
+            for name in ("FrameID", "Timestamp"):
+                cam.ChunkSelector.SetValue(getattr(PySpin, f"ChunkSelector_{name}"))
+                cam.ChunkEnable.SetValue(True)
+            self.chunk_enabled = True
+            self.logger.info("Chunk data enabled (FrameID, Timestamp)")
+        except Exception as e:
+            self.logger.warning(f"Chunk data unavailable, using host timestamps: {e}")
+        return self.chunk_enabled
 
     def start_frame_thread(self):
-        """Start frame reading thread and measure FPS"""
+        """Start frame reading thread; FPS is estimated as frames arrive"""
         self.is_reading = True
         
-        # Reset and initialize FPS measurement
-        self.frame_times = []
-        self.measured_fps = None
-        
-        # Collect initial frame times for FPS measurement
-        for _ in range(self.fps_window):
-            ret, _ = self.cap.read()
-            if ret:
-                self.frame_times.append(time.perf_counter())
-        
-        # Calculate initial FPS
-        if len(self.frame_times) >= 2:
-            time_diffs = np.diff(self.frame_times)
-            avg_time_diff = np.mean(time_diffs)
-            self.measured_fps = 1.0 / avg_time_diff if avg_time_diff > 0 else None
-            self.logger.info(f"Measured camera FPS: {self.measured_fps:.1f}")
-        
         # Start the frame reading thread
         self.frame_thread = Thread(target=self.update_frame, daemon=True)
         self.frame_thread.start()
@@ -132,67 +226,280 @@ class CameraManager:
 
     def update_frame(self):
         while self.is_reading:
+            self.grab_frame()
+
+    @property
+    def measured_fps(self) -> Optional[float]:
+        """Frame rate estimated from recent frame timestamps, None until warmed up"""
+        return self.fps_estimator.fps
+
+    @property
+    def latest_frame(self) -> Optional[np.ndarray]:
+        """Most recent frame in the ring (a view, valid until overwritten)"""
+        if self.frame_ring is None:
+            return None
+        return self.frame_ring.latest()[1]
+
+    def get_latest_frame(self) -> Tuple[int, Optional[np.ndarray]]:
+        """Return the sequence number and buffer of the most recent frame"""
+        if self.frame_ring is None:
+            return -1, None
+        return self.frame_ring.latest()
+
+    def read_frame(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Acquire one frame into the ring, mirroring cap.read()"""
+        ret, _, frame = self.grab_frame()
+        return ret, frame
+
+    def grab_frame(self) -> Tuple[bool, int, Optional[np.ndarray]]:
+        """
+        Acquire the next frame in place into the frame ring.
+
+        The frame's host time (ms, perf_counter based) is stored in the ring and
+        in `last_frame_time_ms`. With chunk data it is the exposure time mapped
+        from the camera clock, otherwise the host time just before the read.
+
+        Returns:
+            Tuple of (success, sequence number, view of the frame buffer)
+        """
+        read_start_ns = perf_counter_ns()
+        self.last_frame_id = None
+        self._camera_timestamp_ns = None
+
+        ring = self.frame_ring
+        if ring is None:
+            # First frame is read normally to learn the frame geometry
             ret, frame = self.cap.read()
-            if ret:
-                self.latest_frame = frame
-                
-    def measure_fps(self):
-        """Calculate FPS from the last fps_window frame timestamps"""
-        if len(self.frame_times) < self.fps_window:
-            # Collect frame times
-            start_time = time.perf_counter()
-            frame_count = 0
-            
-            while frame_count < self.fps_window:
-                ret, _ = self.cap.read()
-                if ret:
-                    current_time = time.perf_counter()
-                    self.frame_times.append(current_time)
-                    frame_count += 1
-            
-            # Calculate initial FPS from collection period
-            total_time = self.frame_times[-1] - self.frame_times[0]
-            if total_time > 0:
-                measured_fps = (len(self.frame_times) - 1) / total_time
-                self.logger.info(f"Initial FPS measurement: {measured_fps:.1f}")
-                return measured_fps
-            
-        # Calculate FPS using the last fps_window frames
-        recent_times = self.frame_times[-self.fps_window:]
-        time_diffs = np.diff(recent_times)
-        avg_time_diff = np.mean(time_diffs)
-        std_dev = np.std(time_diffs)
-        
-        measured_fps = 1.0 / avg_time_diff if avg_time_diff > 0 else None
-        
+            if not ret or frame is None:
+                return False, -1, None
+        else:
+            seq, slot = ring.claim()
+            ret, frame = self._read_into(slot)
+            if not ret:
+                return False, -1, None
+            if frame is None:
+                ring.commit(seq, self._frame_time_ms(read_start_ns))
+                return True, seq, slot
+
+        # Geometry changed (or first frame): reallocate the ring once
+        ring = self._allocate_ring(frame.shape, frame.dtype)
+        seq, slot = ring.claim()
+        np.copyto(slot, frame)
+        ring.commit(seq, self._frame_time_ms(read_start_ns))
+        return True, seq, slot
+
+    def _frame_time_ms(self, read_start_ns: int) -> float:
+        """Host time of the last frame, preferring the mapped hardware timestamp"""
+        host_ns = None
+        if self._camera_timestamp_ns is not None:
+            self._sync_clock(read_start_ns)
+            host_ns = self.clock_mapper.to_host_ns(self._camera_timestamp_ns)
+        self.last_frame_time_ms = (host_ns if host_ns is not None else read_start_ns) * 1e-6
+        self.fps_estimator.update(self.last_frame_time_ms)
+        return self.last_frame_time_ms
+
+    def _sync_clock(self, now_ns: int) -> None:
+        """Periodically add a camera/host clock pair to the mapping"""
+        if now_ns - self._last_clock_sync_ns < self.clock_sync_interval_ns:
+            return
+        self._last_clock_sync_ns = now_ns
+        self.clock_mapper.sample(self.cap.cam)
+
+    def _allocate_ring(self, shape, dtype) -> FrameRing:
+        """Create a new frame ring continuing the current sequence numbering"""
+        next_seq = self.frame_ring.next_seq if self.frame_ring is not None else 0
+        ring = FrameRing(self.ring_size, shape, dtype, start_seq=next_seq)
+        self.frame_ring = ring
+        self.logger.info(f"Allocated {self.ring_size} frame buffers of {shape} {np.dtype(dtype)}")
+        return ring
+
+    def _read_into(self, out: np.ndarray) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Read the next frame directly into a preallocated buffer.
+
+        Returns:
+            (False, None) on failure, (True, None) when `out` was filled in place,
+            or (True, frame) with a newly read frame whose geometry differs from `out`
+        """
+        cam = getattr(self.cap, 'cam', None)
+        if cam is None:
+            ret, frame = self.cap.read()
+            if not ret or frame is None:
+                return False, None
+            if frame.shape != out.shape or frame.dtype != out.dtype:
+                return True, frame
+            np.copyto(out, frame)
+            return True, None
+
+        # Spinnaker path: copy straight from the driver buffer, no per-frame allocation
+        try:
+            image = cam.GetNextImage(getattr(self.cap, 'grabTimeout', 1000))
+        except Exception as e:
+            self.logger.debug(f"Frame grab failed: {e}")
+            return False, None
+        try:
+            if image.IsIncomplete():
+                return False, None
+            if self.chunk_enabled:
+                self._read_chunk_data(image)
+            data = image.GetNDArray()
+            if data.shape != out.shape or data.dtype != out.dtype:
+                return True, data.copy()
+            np.copyto(out, data)
+            return True, None
+        finally:
+            image.Release()
+
+    def _read_chunk_data(self, image) -> None:
+        """Take the frame ID and device timestamp from the image's chunk data"""
+        try:
+            chunk = image.GetChunkData()
+            self.last_frame_id = int(chunk.GetFrameID())
+            self._camera_timestamp_ns = int(chunk.GetTimestamp())
+        except Exception as e:
+            self.logger.warning(f"Failed to read chunk data, falling back to host timestamps: {e}")
+            self.chunk_enabled = False
+
+    def measure_fps(self) -> Optional[float]:
+        """Return the current FPS estimate if frame timing is stable, without reading frames"""
+        measured_fps = self.fps_estimator.fps
+        if measured_fps is None:
+            self.logger.info("FPS not measured yet")
+            return None
+
+        jitter_ms = self.fps_estimator.jitter_ms
         # Only accept FPS if measurement is stable
-        if std_dev < 0.001:  # 1ms stability threshold
-            self.logger.info(f"Measured FPS: {measured_fps:.1f} (±{std_dev*1000:.2f}ms)")
+        if jitter_ms < 1.0:  # 1ms stability threshold
+            self.logger.info(f"Measured FPS: {measured_fps:.1f} (±{jitter_ms:.2f}ms)")
             return measured_fps
         else:
-            self.logger.warning(f"Unstable frame timing - std dev: {std_dev*1000:.2f}ms")
+            self.logger.warning(f"Unstable frame timing - std dev: {jitter_ms:.2f}ms")
             return None
 
     def queue_frames(self):
         self.frame_counter = 0
         self.frame_timestamps = []
+        self.frame_ids = []
+        self.missed_frame_ids = []
         
         while self.recording:
-            # Single timestamp call instead of pre/post
-            frame_time = perf_counter_ns()
-            ret, frame = self.cap.read()
+            span_start = tracer.begin()
+            ret, seq, _ = self.grab_frame()
+            tracer.end("grab_frame", span_start)
             
             if ret:
-                # Calculate timestamp relative to recording start
-                frame_timestamp = (frame_time * 1e-6) - self.start_time_ms
-                
+                # Timestamp relative to recording start (exposure time when chunk data is available)
+                frame_timestamp = self.last_frame_time_ms - self.start_time_ms
+                self._track_frame_id(self.last_frame_id)
+
                 # Store frame metadata
                 self.frame_timestamps.append(frame_timestamp)
                 self.frame_counter += 1
                 
-                self.latest_frame = frame
-                # Queue frame with its metadata
-                self.frame_queue.put((frame, frame_timestamp, self.frame_counter))
+                # Queue the ring sequence number; the writer reads the buffer by index
+                span_start = tracer.begin()
+                self._enqueue_frame((seq, frame_timestamp, self.frame_counter))
+                tracer.end("enqueue_frame", span_start)
+
+    def _track_frame_id(self, frame_id: Optional[int]) -> None:
+        """Record the camera frame ID and note any IDs the camera skipped"""
+        if frame_id is None:
+            self.frame_ids.append(-1)
+            return
+        if self.frame_ids and self.frame_ids[-1] >= 0:
+            gap = frame_id - self.frame_ids[-1]
+            if gap > 1:
+                self.missed_frame_ids.extend(range(self.frame_ids[-1] + 1, frame_id))
+                self.logger.warning(f"Camera skipped {gap - 1} frames before frame ID {frame_id}")
+        self.frame_ids.append(frame_id)
+
+    def get_frame_ids(self) -> List[int]:
+        """Camera frame IDs of captured frames (-1 where chunk data was unavailable)"""
+        return self.frame_ids.copy()
+
+    def set_recording_policy(self, queue_size: Optional[int] = None,
+                             overflow_policy: Optional[str] = None) -> None:
+        """
+        Configure the bounded recording queue.
+
+        Args:
+            queue_size: Maximum number of frames waiting for the writer
+            overflow_policy: One of 'block', 'drop_oldest' or 'drop_newest'
+        """
+        if overflow_policy is not None:
+            if overflow_policy not in OVERFLOW_POLICIES:
+                raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+            self.overflow_policy = overflow_policy
+        if queue_size is not None:
+            # Leave room for the frame being written and the frame being acquired
+            self.record_queue_size = max(1, min(int(queue_size), self.ring_size - 2))
+
+    def set_recording_backend(self, backend: Optional[str] = None, preset: Optional[str] = None,
+                              bayer_pattern: Optional[str] = None) -> None:
+        """
+        Select the video writer used for recordings.
+
+        Args:
+            backend: 'ffmpeg' to pipe raw buffers to ffmpeg, 'writegear' for vidgear
+            preset: FFmpeg encoder preset (see ffmpeg_writer.PRESETS)
+            bayer_pattern: Bayer layout of mono buffers, or None for plain mono
+        """
+        from hardware.camera.ffmpeg_writer import PRESETS
+
+        if backend is not None:
+            if backend not in ("ffmpeg", "writegear"):
+                raise ValueError(f"Unknown recording backend: {backend}")
+            self.recording_backend = backend
+        if preset is not None:
+            if preset not in PRESETS:
+                raise ValueError(f"Unknown recording preset: {preset}")
+            self.recording_preset = preset
+        self.bayer_pattern = bayer_pattern
+
+    def _enqueue_frame(self, item: Tuple[int, float, int]) -> None:
+        """Queue a frame for the writer according to the overflow policy"""
+        if self.overflow_policy == BLOCK:
+            self.frame_queue.put(item)
+            return
+
+        try:
+            self.frame_queue.put_nowait(item)
+        except Full:
+            if self.overflow_policy == DROP_NEWEST:
+                self._record_drop(item[2])
+                return
+
+            # Drop the oldest queued frame to make room for the new one
+            try:
+                oldest = self.frame_queue.get_nowait()
+                if oldest is None:
+                    # Never discard the writer's stop signal
+                    self.frame_queue.put_nowait(None)
+                    self._record_drop(item[2])
+                    return
+                self._record_drop(oldest[2])
+            except Empty:
+                pass
+            self.frame_queue.put_nowait(item)
+
+    def _record_drop(self, frame_number: int) -> None:
+        """Account for a captured frame that will not reach the video file"""
+        self.dropped_frames.append(frame_number - 1)
+        if len(self.dropped_frames) % 100 == 1:
+            self.logger.warning(f"Recorder falling behind - {len(self.dropped_frames)} frames dropped")
+
+    def get_recording_stats(self) -> Dict[str, int]:
+        """Live recording counters"""
+        return {
+            'captured': self.frame_counter,
+            'queued': self.frame_queue.qsize(),
+            'dropped': len(self.dropped_frames),
+            'written': self.frames_written,
+        }
+
+    def get_dropped_frames(self) -> List[int]:
+        """Capture indices of frames missing from the video file"""
+        return sorted(self.dropped_frames)
 
     def start_recording(self, filename):
         """Start recording using pre-measured FPS"""
@@ -202,9 +509,12 @@ class CameraManager:
         # Reset frame recording variables
         self.frame_counter = 0
         self.frame_timestamps = []
+        self.frames_written = 0
+        self.dropped_frames = []
+        self.frame_queue = Queue(maxsize=self.record_queue_size)
         
-        # Use pre-measured FPS or fallback to default
-        actual_fps = self.measured_fps if self.measured_fps is not None else 200.0
+        # Use the running FPS estimate, then the camera's nominal rate, then a default
+        actual_fps = self.measured_fps or self.fps or 200.0
         
         # Store metadata in filename
         base_name = Path(filename).stem
@@ -212,32 +522,23 @@ class CameraManager:
         directory = Path(filename).parent
         filename_with_metadata = directory / f"{base_name}_FPS{actual_fps:.1f}_START{self.start_time_ms:.0f}{extension}"
 
-        # Configure output parameters
-        output_params = {
-            "-c:v": "libx264",
-            "-input_framerate": 30,
-            "-r": "30",
-            "-preset": "ultrafast",
-            "-crf": 20,
-            "-ffmpeg_download_path": "_local/ffmpeg"
-        }
-
         self.logger.info(f"Recording started:")
         self.logger.info(f"- FPS: {actual_fps:.1f}")
         self.logger.info(f"- Start time: {self.start_time_ms:.0f}ms")
         self.logger.info(f"- Output file: {filename_with_metadata.name}")
+        self.logger.info(f"- Queue: {self.record_queue_size} frames, {self.overflow_policy}")
+        self.logger.info(f"- Writer: {self.recording_backend} ({self.recording_preset})")
+
+        self.output_path = filename_with_metadata
+        self.metadata_path = filename_with_metadata.with_suffix(".json")
+        self.recording_fps = actual_fps
 
-        # Start recording
+        # The writer is opened on the first frame, once the buffer layout is known
+        self.writer = None
         self.recording = True
-        self.writer = WriteGear(
-            output=str(filename_with_metadata), 
-            compression_mode=True,
-            logging=False, 
-            **output_params
-        )
 
         # Start frame queue and writing threads
-        queue_thread = Thread(target=self.queue_frames, daemon=True)
+        queue_thread = self.queue_thread = Thread(target=self.queue_frames, daemon=True)
         writing_thread = Thread(target=self.write_frames, daemon=True)
         queue_thread.start()
         writing_thread.start()
@@ -245,7 +546,6 @@ class CameraManager:
     def write_frames(self):
         """Write frames to video file with proper cleanup"""
         self.writing = True
-        frames_written = 0
         
         try:
             while True:
@@ -253,21 +553,44 @@ class CameraManager:
                 
                 # Check for stop signal
                 if frame_data is None:
-                    self.logger.info(f"Received stop signal. Total frames written: {frames_written}")
+                    self.logger.info(f"Received stop signal. Total frames written: {self.frames_written}")
                     break
                 
                 # Unpack the tuple
-                frame, timestamp, frame_number = frame_data
+                seq, timestamp, frame_number = frame_data
+                
+                frame = self.frame_ring.get(seq)
+                if frame is not None:
+                    # Copy the slot out, then re-check it: acquisition never waits for
+                    # the writer, so a stalled encoder can let the slot be recycled mid-read
+                    if self._write_buffer is None or self._write_buffer.shape != frame.shape:
+                        self._write_buffer = np.empty_like(frame)
+                    np.copyto(self._write_buffer, frame)
+                    frame = self._write_buffer if self.frame_ring.is_valid(seq) else None
+                if frame is None:
+                    self.logger.warning(f"Frame {frame_number} overwritten in ring before it was written")
+                    self._record_drop(frame_number)
+                    continue
                 
                 if frame.size != 0:
                     # Only log every 100 frames to reduce console spam
                     if frame_number % 100 == 0:
-                        self.logger.info(f"Writing frame {frame_number} at {timestamp:.2f}ms")
+                        stats = self.get_recording_stats()
+                        self.logger.info(f"Writing frame {frame_number} at {timestamp:.2f}ms "
+                                         f"(queued {stats['queued']}, dropped {stats['dropped']})")
                     
-                    # Convert ndarray to cv2.imshow compatible format
-                    frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                    self.writer.write(frame)
-                    frames_written += 1
+                    if self.writer is None:
+                        self.writer = self._open_writer(frame)
+
+                    if self.recording_backend == "ffmpeg":
+                        # Raw buffer of the validated copy, no conversion
+                        self.writer.write(frame.data)
+                    else:
+                        # WriteGear expects BGR input
+                        if frame.ndim == 3:
+                            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+                        self.writer.write(frame)
+                    self.frames_written += 1
                         
         except Exception as e:
             self.logger.error(f"Error in write_frames: {e}")
@@ -281,6 +604,7 @@ class CameraManager:
             except Exception as e:
                 self.logger.error(f"Error closing writer: {e}")
                 
+            self.save_recording_metadata()
             self.writing = False
             
             # Execute the callback function if provided
@@ -288,7 +612,60 @@ class CameraManager:
                 self.logger.info("Executing write finished callback")
                 self.on_write_finished()
                 
-            self.logger.info(f"Write process completed. Total frames written: {frames_written}")
+            self.logger.info(f"Write process completed. Total frames written: {self.frames_written}")
+
+    def _open_writer(self, frame: np.ndarray):
+        """Create the video writer for the configured backend using the first frame"""
+        if self.recording_backend == "ffmpeg":
+            from hardware.camera.ffmpeg_writer import FFmpegWriter
+
+            writer = FFmpegWriter.for_frame(
+                str(self.output_path), frame, self.recording_fps,
+                bayer_pattern=self.bayer_pattern, preset=self.recording_preset
+            )
+            # Lossless presets may switch container
+            self.output_path = writer.output
+            return writer
+
+        from vidgear.gears import WriteGear
+
+        # Encode at the real capture rate so playback timing matches acquisition
+        output_params = {
+            "-c:v": "libx264",
+            "-input_framerate": self.recording_fps,
+            "-preset": "ultrafast",
+            "-crf": 20,
+            "-ffmpeg_download_path": "_local/ffmpeg"
+        }
+        return WriteGear(
+            output=str(self.output_path), 
+            compression_mode=True,
+            logging=False, 
+            **output_params
+        )
+
+    def save_recording_metadata(self) -> None:
+        """Write frame accounting for the recording next to the video file"""
+        if self.metadata_path is None:
+            return
+        metadata = {
+            "video": self.output_path.name,
+            "fps": self.recording_fps,
+            "start_time_ms": self.start_time_ms,
+            "overflow_policy": self.overflow_policy,
+            "frames_captured": self.frame_counter,
+            "frames_written": self.frames_written,
+            "dropped_frames": self.get_dropped_frames(),
+            "hardware_timestamps": self.chunk_enabled and self.clock_mapper.is_ready,
+            "missed_camera_frame_ids": self.missed_frame_ids,
+            # Per-frame capture times (ms since recording start) for variable frame rate analysis
+            "frame_timestamps_ms": self.frame_timestamps,
+        }
+        try:
+            with open(self.metadata_path, 'w') as f:
+                json.dump(metadata, f, indent=4)
+        except OSError as e:
+            self.logger.error(f"Error saving recording metadata: {e}")
 
     def set_on_write_finished(self, callback):
         self.on_write_finished = callback
@@ -298,8 +675,13 @@ class CameraManager:
         self.logger.info("Stopping recording...")
         self.recording = False
         
-        # Wait a short time for queue_frames to finish
-        time.sleep(0.1)
+        # Wait for queue_frames to finish, so the drop-oldest path cannot
+        # discard the stop signal
+        if self.queue_thread is not None:
+            self.queue_thread.join(timeout=2.0)
+            if self.queue_thread.is_alive():
+                self.logger.warning("Frame queue thread did not stop in time")
+            self.queue_thread = None
         
         # Signal the end of the frame queue
         self.frame_queue.put(None)
@@ -309,6 +691,8 @@ class CameraManager:
         self.logger.info("Waiting for all frames to be written...")
 
     def get_available_cameras(self):
+        import EasyPySpin
+
         cameras = []
         i = 0
         while True:
@@ -337,7 +721,8 @@ class CameraManager:
 if __name__ == "__main__":
     logging.basicConfig(level=logging.ERROR)
 
-    camera_manager = CameraManager()
+    # Optionally replay a video file / image sequence instead of a camera
+    camera_manager = CameraManager(sys.argv[1] if len(sys.argv) > 1 else None)
     
     video_path = "D:/Charlie/recorded_video.mkv"
 
@@ -0,0 +1,91 @@
+import logging
+from collections import deque
+from typing import Optional
+import numpy as np
+from utils.perf_timings import perf_counter_ns
+
+
+class CameraClockMapper:
+    """
+    Online mapping from the camera's device clock to host perf_counter_ns.
+
+    Pairs of (camera ns, host ns) are collected by latching the camera
+    timestamp between two host clock reads. A linear fit over a sliding window
+    of pairs absorbs both the offset and the drift between the two oscillators.
+    Until a second pair arrives the clocks are assumed to run at the same rate.
+    """
+    def __init__(self, window: int = 30, min_pairs: int = 1):
+        self.logger = logging.getLogger("CameraClockMapper")
+        self.pairs = deque(maxlen=window)
+        self.min_pairs = min_pairs
+
+        # Fit: host = host_ref + offset + slope * (camera - camera_ref)
+        self.camera_ref = None
+        self.host_ref = None
+        self.slope = 1.0
+        self.offset = 0.0
+        self.residual_ns = None
+
+    @property
+    def is_ready(self) -> bool:
+        return len(self.pairs) >= self.min_pairs
+
+    def sample(self, cam) -> bool:
+        """
+        Latch the camera clock and record a pair against the host clock.
+
+        Args:
+            cam: PySpin camera (initialised)
+
+        Returns:
+            True if a pair was recorded
+        """
+        try:
+            before = perf_counter_ns()
+            camera_ns = latch_camera_timestamp(cam)
+            after = perf_counter_ns()
+        except Exception as e:
+            self.logger.debug(f"Timestamp latch failed: {e}")
+            return False
+
+        # The latch happens somewhere inside the round trip; use its midpoint
+        self.add_pair(camera_ns, (before + after) // 2)
+        return True
+
+    def add_pair(self, camera_ns: int, host_ns: int) -> None:
+        """Add a (camera, host) pair and refit the mapping."""
+        self.pairs.append((camera_ns, host_ns))
+        if self.camera_ref is None:
+            self.camera_ref, self.host_ref = camera_ns, host_ns
+        self._fit()
+
+    def _fit(self) -> None:
+        if len(self.pairs) < 2:
+            return
+        # Work relative to the first pair so float64 keeps ns precision
+        data = np.array(self.pairs, dtype=np.int64)
+        x = (data[:, 0] - self.camera_ref).astype(np.float64)
+        y = (data[:, 1] - self.host_ref).astype(np.float64)
+        if np.ptp(x) == 0:
+            return
+        self.slope, self.offset = np.polyfit(x, y, 1)
+        self.residual_ns = float(np.std(y - (self.slope * x + self.offset)))
+
+    def to_host_ns(self, camera_ns: int) -> Optional[int]:
+        """Convert a camera timestamp to host perf_counter_ns, if calibrated."""
+        if not self.is_ready:
+            return None
+        return self.host_ref + int(self.offset + self.slope * (camera_ns - self.camera_ref))
+
+
+def latch_camera_timestamp(cam) -> int:
+    """Latch and read the camera's current device timestamp in ns."""
+    import PySpin
+
+    # Newer Spinnaker firmware uses TimestampLatch, older GigE cameras the Gev* nodes.
+    # QuickSpin attributes exist on every camera object, so ask the node itself
+    if PySpin.IsAvailable(cam.TimestampLatch) and PySpin.IsWritable(cam.TimestampLatch):
+        cam.TimestampLatch.Execute()
+        return int(cam.TimestampLatchValue.GetValue())
+    cam.GevTimestampControlLatch.Execute()
+    return int(cam.GevTimestampValue.GetValue())
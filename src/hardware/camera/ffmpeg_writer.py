@@ -0,0 +1,188 @@
+import glob
+import logging
+import shutil
+import subprocess
+import sys
+import time
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Encoder presets: output arguments and the container they need
+PRESETS: Dict[str, Dict] = {
+    # Fast lossy H.264, all cores
+    "x264_fast": {
+        "args": ["-c:v", "libx264", "-preset", "ultrafast", "-crf", "18", "-threads", "0"],
+        "extension": ".mp4",
+    },
+    # Lossless H.264 (qp 0), still reasonably quick; colour uses libx264rgb so
+    # no RGB -> YUV conversion rounds the pixels
+    "x264_lossless": {
+        "args": ["-c:v", "libx264", "-preset", "ultrafast", "-qp", "0", "-threads", "0"],
+        "colour_codec": "libx264rgb",
+        "extension": ".mp4",
+    },
+    # Lossless intra-only FFV1 with sliced multi-threading
+    "ffv1": {
+        "args": ["-c:v", "ffv1", "-level", "3", "-g", "1", "-slices", "16", "-slicecrc", "0", "-threads", "0"],
+        "extension": ".mkv",
+    },
+}
+
+# Camera buffers are either mono/raw Bayer (2D) or RGB (3 channels)
+MONO_PIX_FMT = "gray"
+COLOUR_PIX_FMT = "rgb24"
+
+# Encoded pixel format per input format and preset (Bayer is encoded as colour).
+# Lossless presets keep the full-range input format; x264 encodes gray directly
+OUTPUT_PIX_FMT = {
+    "gray": {"x264_fast": "yuv420p", "x264_lossless": "gray", "ffv1": "gray"},
+    "rgb24": {"x264_fast": "yuv420p", "x264_lossless": "rgb24", "ffv1": "bgr0"},
+}
+
+
+def find_ffmpeg(ffmpeg_path: Optional[str] = None) -> str:
+    """
+    Locate an ffmpeg executable.
+
+    Checks an explicit path, then PATH, then the copy vidgear downloads into
+    ``_local/ffmpeg``.
+    """
+    if ffmpeg_path:
+        return ffmpeg_path
+    found = shutil.which("ffmpeg")
+    if found:
+        return found
+    local = glob.glob("_local/ffmpeg/**/ffmpeg*", recursive=True)
+    if local:
+        return local[0]
+    raise FileNotFoundError("ffmpeg executable not found")
+
+
+class FFmpegWriter:
+    """
+    Pipe raw camera buffers straight into an ffmpeg process.
+
+    Frames are written to ffmpeg's stdin as rawvideo with the measured capture
+    rate as the input frame rate, so no colour conversion or re-timing happens
+    in Python. Mono frames can be tagged as Bayer (e.g. ``bayer_rggb8``) so the
+    debayer runs inside ffmpeg.
+    """
+    def __init__(self, output: str, width: int, height: int, fps: float,
+                 pix_fmt: str = MONO_PIX_FMT, preset: str = "x264_fast",
+                 ffmpeg_path: Optional[str] = None):
+        if preset not in PRESETS:
+            raise ValueError(f"Unknown recording preset: {preset}")
+
+        self.logger = logging.getLogger("FFmpegWriter")
+        self.output = Path(output).with_suffix(PRESETS[preset]["extension"])
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.pix_fmt = pix_fmt
+        self.preset = preset
+        self.frames_written = 0
+
+        self.process = subprocess.Popen(
+            self._build_command(find_ffmpeg(ffmpeg_path)),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+
+    @classmethod
+    def for_frame(cls, output: str, frame: np.ndarray, fps: float,
+                  bayer_pattern: Optional[str] = None, **kwargs) -> "FFmpegWriter":
+        """Create a writer matching the geometry and layout of a sample frame."""
+        height, width = frame.shape[:2]
+        if frame.ndim == 2:
+            pix_fmt = f"bayer_{bayer_pattern}8" if bayer_pattern else MONO_PIX_FMT
+        else:
+            pix_fmt = COLOUR_PIX_FMT
+        return cls(output, width, height, fps, pix_fmt=pix_fmt, **kwargs)
+
+    def _build_command(self, ffmpeg: str) -> List[str]:
+        source_fmt = MONO_PIX_FMT if self.pix_fmt.startswith("bayer") else self.pix_fmt
+        # Bayer input is debayered by ffmpeg, so encode it like colour
+        colour = self.pix_fmt.startswith("bayer") or source_fmt == COLOUR_PIX_FMT
+        output_fmt = OUTPUT_PIX_FMT[COLOUR_PIX_FMT if colour else source_fmt][self.preset]
+        args = list(PRESETS[self.preset]["args"])
+        if colour and "colour_codec" in PRESETS[self.preset]:
+            args[args.index("-c:v") + 1] = PRESETS[self.preset]["colour_codec"]
+        return [
+            ffmpeg, "-y", "-loglevel", "error",
+            "-f", "rawvideo",
+            "-pix_fmt", self.pix_fmt,
+            "-s", f"{self.width}x{self.height}",
+            "-framerate", f"{self.fps:.3f}",
+            "-i", "pipe:0",
+            *args,
+            "-pix_fmt", output_fmt,
+            str(self.output),
+        ]
+
+    def write(self, frame) -> None:
+        """
+        Write one frame.
+
+        Args:
+            frame: Contiguous array or memoryview with the configured geometry
+        """
+        try:
+            self.process.stdin.write(frame if isinstance(frame, memoryview) else memoryview(frame))
+            self.frames_written += 1
+        except BrokenPipeError:
+            raise RuntimeError(f"ffmpeg exited: {self._stderr()}")
+
+    def close(self) -> None:
+        """Flush remaining frames and wait for ffmpeg to finish the file."""
+        if self.process.stdin and not self.process.stdin.closed:
+            try:
+                self.process.stdin.close()
+            except BrokenPipeError:
+                pass
+        returncode = self.process.wait()
+        if returncode != 0:
+            self.logger.error(f"ffmpeg exited with code {returncode}: {self._stderr()}")
+
+    def _stderr(self) -> str:
+        try:
+            return self.process.stderr.read().decode(errors="replace").strip()
+        except (OSError, ValueError):
+            return ""
+
+
+def benchmark(width: int = 1440, height: int = 1080, frames: int = 400,
+              fps: float = 200.0, colour: bool = False, output_dir: str = "_local/bench") -> Dict[str, float]:
+    """
+    Measure sustained write throughput for each preset.
+
+    Returns:
+        Mapping of preset name -> frames per second
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    shape = (height, width, 3) if colour else (height, width)
+
+    # A moving gradient with noise compresses roughly like real footage
+    rng = np.random.default_rng(0)
+    base = np.tile(np.arange(width, dtype=np.uint8), (height, 1))
+    samples = []
+    for i in range(16):
+        frame = np.roll(base, i * 8, axis=1) + rng.integers(0, 8, (height, width), dtype=np.uint8)
+        samples.append(np.ascontiguousarray(np.repeat(frame[..., None], 3, axis=2) if colour else frame))
+
+    results = {}
+    for preset in PRESETS:
+        writer = FFmpegWriter.for_frame(f"{output_dir}/bench_{preset}", samples[0], fps, preset=preset)
+        start = time.perf_counter()
+        for i in range(frames):
+            writer.write(samples[i % len(samples)])
+        writer.close()
+        elapsed = time.perf_counter() - start
+        results[preset] = frames / elapsed
+        print(f"{preset:>14}: {results[preset]:7.1f} frames/s  ({shape}, {writer.output.stat().st_size / 1e6:.1f} MB)")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark(colour="--colour" in sys.argv)
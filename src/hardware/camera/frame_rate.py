@@ -0,0 +1,62 @@
+import math
+from typing import Optional
+
+
+class FrameRateEstimator:
+    """
+    Incremental frame rate estimate from frame timestamps.
+
+    Keeps an exponentially weighted mean and variance of the inter-frame
+    interval, updated in O(1) by the acquisition thread. Until `window` frames
+    have been seen the plain running mean is used so early estimates are not
+    biased towards the first interval.
+
+    Args:
+        window: Effective number of intervals averaged (alpha = 2 / (window + 1))
+        max_gap_ms: Intervals longer than this (stream paused) restart the estimate
+    """
+    def __init__(self, window: int = 200, max_gap_ms: float = 1000.0, min_samples: int = 10):
+        self.alpha = 2.0 / (window + 1)
+        self.max_gap_ms = max_gap_ms
+        self.min_samples = min_samples
+        self.reset()
+
+    def reset(self) -> None:
+        self.last_time_ms = None
+        self.samples = 0
+        self.mean_interval_ms = 0.0
+        self.var_interval_ms = 0.0
+
+    def update(self, time_ms: float) -> None:
+        """Add the timestamp of a newly acquired frame."""
+        last = self.last_time_ms
+        self.last_time_ms = time_ms
+        if last is None:
+            return
+
+        interval = time_ms - last
+        if interval <= 0 or interval > self.max_gap_ms:
+            # Out-of-order timestamp or acquisition was paused
+            return
+
+        self.samples += 1
+        alpha = max(self.alpha, 1.0 / self.samples)
+        diff = interval - self.mean_interval_ms
+        self.mean_interval_ms += alpha * diff
+        self.var_interval_ms = (1.0 - alpha) * (self.var_interval_ms + alpha * diff * diff)
+
+    @property
+    def is_ready(self) -> bool:
+        return self.samples >= self.min_samples
+
+    @property
+    def fps(self) -> Optional[float]:
+        """Estimated frame rate, or None until enough frames have been seen."""
+        if not self.is_ready or self.mean_interval_ms <= 0:
+            return None
+        return 1000.0 / self.mean_interval_ms
+
+    @property
+    def jitter_ms(self) -> float:
+        """Standard deviation of the inter-frame interval."""
+        return math.sqrt(self.var_interval_ms)
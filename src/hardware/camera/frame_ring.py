@@ -0,0 +1,79 @@
+import numpy as np
+from typing import Optional, Tuple
+
+
+class FrameRing:
+    """
+    Fixed-size ring of preallocated frame buffers addressed by sequence number.
+
+    A single acquisition thread claims the next slot, fills it in place and
+    commits it. Consumers look frames up by sequence number; a slot is reused
+    once `capacity` newer frames have been committed, after which `get` returns
+    None for the old sequence number. Consumers holding a view for a long time
+    can call `is_valid` afterwards to check the slot was not overwritten.
+    """
+    def __init__(self, capacity: int, shape: Tuple[int, ...], dtype=np.uint8, start_seq: int = 0):
+        self.capacity = capacity
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+
+        # All frame memory is allocated once up front
+        self.frames = np.empty((capacity, *self.shape), dtype=self.dtype)
+        self.seqs = np.full(capacity, -1, dtype=np.int64)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+
+        self._next_seq = start_seq
+        self._latest_seq = -1
+
+    def claim(self) -> Tuple[int, np.ndarray]:
+        """
+        Reserve the next slot for writing.
+
+        Returns:
+            Sequence number of the new frame and a writable view of its buffer
+        """
+        seq = self._next_seq
+        idx = seq % self.capacity
+        # Invalidate the slot so readers never see a half-written frame
+        self.seqs[idx] = -1
+        return seq, self.frames[idx]
+
+    def commit(self, seq: int, timestamp: float = 0.0) -> None:
+        """Publish a claimed slot once its buffer has been filled."""
+        idx = seq % self.capacity
+        self.timestamps[idx] = timestamp
+        self.seqs[idx] = seq
+        self._latest_seq = seq
+        self._next_seq = seq + 1
+
+    def get(self, seq: int) -> Optional[np.ndarray]:
+        """Return the frame with the given sequence number if still buffered."""
+        if seq < 0:
+            return None
+        idx = seq % self.capacity
+        if self.seqs[idx] != seq:
+            return None
+        return self.frames[idx]
+
+    def is_valid(self, seq: int) -> bool:
+        """Check that a frame has not been overwritten since it was read."""
+        return seq >= 0 and self.seqs[seq % self.capacity] == seq
+
+    def timestamp(self, seq: int) -> Optional[float]:
+        """Return the timestamp committed with a frame, if still buffered."""
+        if not self.is_valid(seq):
+            return None
+        return float(self.timestamps[seq % self.capacity])
+
+    def latest(self) -> Tuple[int, Optional[np.ndarray]]:
+        """Return the sequence number and buffer of the newest committed frame."""
+        seq = self._latest_seq
+        return seq, self.get(seq)
+
+    @property
+    def latest_seq(self) -> int:
+        return self._latest_seq
+
+    @property
+    def next_seq(self) -> int:
+        return self._next_seq
@@ -0,0 +1,158 @@
+import glob
+import logging
+import os
+import time
+import cv2
+import numpy as np
+from typing import Optional, Tuple
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp")
+
+
+def is_video_source(source) -> bool:
+    """Check whether a camera identifier refers to a file, directory or glob."""
+    if not isinstance(source, str):
+        return False
+    return os.path.exists(source) or any(c in source for c in "*?[")
+
+
+class VideoFileCapture:
+    """
+    Camera stand-in that serves frames from a video file or image sequence.
+
+    Mirrors the parts of the EasyPySpin.VideoCapture interface used by DART
+    (read/get/set/isOpened/release and the set_pyspin_value helpers), so the
+    tracker, recorder and display can run without a FLIR camera attached.
+    Frames are returned RGB (like the colour cameras) or mono with `grayscale`.
+
+    Args:
+        source: Video file, directory of images or glob pattern
+        fps: Playback rate; defaults to the file's rate (or 200 for images)
+        realtime: Pace reads to `fps`; False serves frames as fast as possible
+        loop: Restart from the first frame at the end of the source
+        grayscale: Return single-channel frames like a mono camera
+    """
+    def __init__(self, source: str, fps: Optional[float] = None, realtime: bool = True,
+                 loop: bool = True, grayscale: bool = False):
+        self.logger = logging.getLogger("VideoFileCapture")
+        self.source = source
+        self.realtime = realtime
+        self.loop = loop
+        self.grayscale = grayscale
+
+        self._video = None
+        self._images = []
+        self._index = 0
+        self._props = {}
+        self._pyspin_values = {}
+
+        if os.path.isdir(source):
+            self._images = sorted(
+                f for f in glob.glob(os.path.join(source, "*")) if f.lower().endswith(IMAGE_EXTENSIONS)
+            )
+        elif any(c in source for c in "*?["):
+            self._images = sorted(glob.glob(source))
+        else:
+            self._video = cv2.VideoCapture(source)
+
+        source_fps = self._video.get(cv2.CAP_PROP_FPS) if self._video is not None else 0
+        self.fps = fps or source_fps or 200.0
+
+        # Frame geometry comes from the first frame
+        first = self._read_raw()
+        self.width, self.height = (first.shape[1], first.shape[0]) if first is not None else (0, 0)
+        self._rewind()
+
+        self._next_due = None
+
+    def isOpened(self) -> bool:
+        if self._video is not None:
+            return self._video.isOpened() and self.width > 0
+        return len(self._images) > 0
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Return the next frame, pacing reads to the playback rate if realtime."""
+        if self.realtime:
+            self._wait_for_next_frame()
+
+        frame = self._read_raw()
+        if frame is None and self.loop:
+            self._rewind()
+            frame = self._read_raw()
+        if frame is None:
+            return False, None
+        return True, self._convert(frame)
+
+    def _wait_for_next_frame(self) -> None:
+        now = time.perf_counter()
+        if self._next_due is None or now - self._next_due > 1.0:
+            # First read, or the consumer stalled: restart the schedule
+            self._next_due = now
+        elif self._next_due > now:
+            time.sleep(self._next_due - now)
+        self._next_due += 1.0 / self.fps
+
+    def _read_raw(self) -> Optional[np.ndarray]:
+        if self._video is not None:
+            ret, frame = self._video.read()
+            return frame if ret else None
+        if self._index >= len(self._images):
+            return None
+        frame = cv2.imread(self._images[self._index], cv2.IMREAD_UNCHANGED)
+        self._index += 1
+        return frame
+
+    def _rewind(self) -> None:
+        if self._video is not None:
+            self._video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self._index = 0
+
+    def _convert(self, frame: np.ndarray) -> np.ndarray:
+        if frame.ndim == 2:
+            return frame if self.grayscale else cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
+        if self.grayscale:
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def get(self, prop_id: int) -> float:
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop_id == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            if self._video is not None:
+                return self._video.get(cv2.CAP_PROP_FRAME_COUNT)
+            return float(len(self._images))
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            if self._video is not None:
+                return self._video.get(cv2.CAP_PROP_POS_FRAMES)
+            return float(self._index)
+        # Camera-only settings (gain, exposure, ...) are remembered but have no effect
+        return float(self._props.get(prop_id, 0.0))
+
+    def set(self, prop_id: int, value: float) -> bool:
+        if prop_id == cv2.CAP_PROP_FPS:
+            self.fps = float(value)
+        elif prop_id == cv2.CAP_PROP_POS_FRAMES:
+            if self._video is not None:
+                self._video.set(cv2.CAP_PROP_POS_FRAMES, value)
+            else:
+                self._index = int(value)
+        else:
+            self._props[prop_id] = value
+        return True
+
+    def set_pyspin_value(self, node_name: str, value) -> bool:
+        self._pyspin_values[node_name] = value
+        return True
+
+    def get_pyspin_value(self, node_name: str):
+        return self._pyspin_values.get(node_name)
+
+    def release(self) -> None:
+        if self._video is not None:
+            self._video.release()
+            self._video = None
+        self._images = []
@@ -7,6 +7,8 @@ class MocapBase(ABC):
         self._lost = False
         self._calibration_target = False
         self._num_markers = 0
+        # (position, position2, num_markers) of one frame, replaced as a whole
+        self._marker_pair = ([0, 0, 0], None, 0)
 
     @abstractmethod
     def start(self):
@@ -23,6 +25,11 @@ class MocapBase(ABC):
     def position2(self):
         pass
 
+    @property
+    def marker_pair(self):
+        """First two markers and the marker count, all from the same mocap frame"""
+        return self._marker_pair
+
     @property
     def lost(self):
         return self._lost
@@ -1,9 +1,8 @@
 import logging, asyncio, qtm
 from threading import Thread
-import tkinter as tk
-from tkinter import ttk
 import threading
 from .mocap_base import MocapBase
+from utils.tracer import tracer
 
 
 class QTMStream(MocapBase, Thread):
@@ -62,6 +61,7 @@ class QTMStream(MocapBase, Thread):
         # Assign 6D streaming callback
         await self._connection.stream_frames(components=["3dnolabels"], on_packet=self._on_packet)
 
+    @tracer.traced("qtm_packet")
     def _on_packet(self, packet) -> None:
         """
         Process a packet stream 6D or 3D data.
@@ -74,6 +74,7 @@ class QTMStream(MocapBase, Thread):
 
         # If no new component: mark as lost and return from function
         if not new_component:
+            self._marker_pair = (self.position, None, 0)
             if not self.lost:
                 self.logger.warning(' 3D Unlabelled marker not found.')
                 self.lost = True
@@ -83,6 +84,9 @@ class QTMStream(MocapBase, Thread):
         pos = new_component[0]
         self.position = [pos.x, pos.y, pos.z]
         self.num_markers = len(new_component)
+        # Single assignment so readers never pair markers from different packets
+        second = [new_component[1].x, new_component[1].y, new_component[1].z] if len(new_component) > 1 else None
+        self._marker_pair = (self.position, second, self.num_markers)
 
         # Ensure there is more than one component before accessing it
         if self.calibration_target:
@@ -255,6 +259,9 @@ def close_app():
 
 
 if __name__ == '__main__':
+    import tkinter as tk
+    from tkinter import ttk
+
     root = tk.Tk()
     root.title("QTM Control")
 
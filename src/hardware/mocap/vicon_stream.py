@@ -200,6 +200,14 @@ class ViconStream(MocapBase):
             return markers[1]
         return [0, 0, 0]
         
+    @property
+    def marker_pair(self):
+        """Match QTMStream interface: both markers from one snapshot"""
+        markers, _ = self.get_current_markers()
+        return (markers[0] if markers else [0, 0, 0],
+                markers[1] if len(markers) > 1 else None,
+                len(markers))
+
     @property
     def num_markers(self):
         """Match QTMStream interface with minimal locking"""
@@ -1,15 +1,127 @@
 import logging, math
-import matplotlib.pyplot as plt
 from datetime import datetime
-from typing import Tuple
+from typing import Dict, Optional, Tuple
 import numpy as np
 
+
+def ray_directions(p1: np.ndarray, p2: np.ndarray) -> np.ndarray:
+    """Unit direction of each ray through marker pairs p1 -> p2, shape (N, 3)"""
+    d = np.asarray(p2, dtype=np.float64) - np.asarray(p1, dtype=np.float64)
+    norms = np.linalg.norm(d, axis=1, keepdims=True)
+    if np.any(norms == 0):
+        raise ValueError("Ray with coincident markers")
+    return d / norms
+
+
+def ray_distances(point: np.ndarray, origins: np.ndarray, directions: np.ndarray) -> np.ndarray:
+    """Perpendicular distance from a point to each ray"""
+    w = point - origins
+    along = np.einsum('ij,ij->i', w, directions)
+    return np.linalg.norm(w - along[:, None] * directions, axis=1)
+
+
+def intersect_rays(origins: np.ndarray, directions: np.ndarray) -> np.ndarray:
+    """
+    Least-squares intersection of N >= 2 rays.
+
+    Minimises the summed squared perpendicular distance, i.e. solves
+    sum(I - d d^T) x = sum((I - d d^T) p).
+    """
+    projections = np.eye(3)[None] - directions[:, :, None] * directions[:, None, :]
+    A = projections.sum(axis=0)
+    b = np.einsum('nij,nj->i', projections, origins)
+    if np.linalg.cond(A) > 1e12:
+        raise ValueError("Rays are (nearly) parallel")
+    return np.linalg.solve(A, b)
+
+
+def pairwise_midpoints(o1: np.ndarray, d1: np.ndarray, o2: np.ndarray, d2: np.ndarray) -> np.ndarray:
+    """Midpoints of the closest points between ray pairs (vectorised), NaN for parallel pairs"""
+    b = np.einsum('ij,ij->i', d1, d2)
+    w = o1 - o2
+    d = np.einsum('ij,ij->i', d1, w)
+    e = np.einsum('ij,ij->i', d2, w)
+    denom = 1.0 - b * b  # Unit directions: a = c = 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (b * e - d) / denom
+        s = (e - b * d) / denom
+    return (o1 + t[:, None] * d1 + o2 + s[:, None] * d2) / 2
+
+
+def ransac_intersection(origins: np.ndarray, directions: np.ndarray, threshold: float,
+                        iterations: int = 200, rng: Optional[np.random.Generator] = None
+                        ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Robust ray intersection.
+
+    Hypotheses from random ray pairs are scored together; the one with the
+    most rays within `threshold` is refined by least squares on its inliers.
+
+    Returns:
+        (point, inlier mask)
+
+    Raises:
+        ValueError: If no hypothesis has at least two inlier rays
+    """
+    n = len(origins)
+    if n < 2:
+        raise ValueError("At least two rays are needed")
+    if n == 2:
+        return intersect_rays(origins, directions), np.ones(2, dtype=bool)
+
+    rng = np.random.default_rng() if rng is None else rng
+    i = rng.integers(0, n, iterations)
+    j = (i + rng.integers(1, n, iterations)) % n  # Never pairs a ray with itself
+    candidates = pairwise_midpoints(origins[i], directions[i], origins[j], directions[j])
+    candidates = candidates[np.isfinite(candidates).all(axis=1)]
+    if not len(candidates):
+        raise ValueError("Rays are (nearly) parallel")
+
+    # Distances of every ray to every hypothesis: (iterations, N)
+    w = candidates[:, None, :] - origins[None]
+    along = np.einsum('knj,nj->kn', w, directions)
+    distances = np.linalg.norm(w - along[..., None] * directions[None], axis=2)
+    inliers = distances < threshold
+    best = np.argmax(inliers.sum(axis=1))
+    mask = inliers[best]
+    if mask.sum() < 2:
+        raise ValueError("No two rays intersect within the RANSAC threshold")
+
+    point = intersect_rays(origins[mask], directions[mask])
+    # One refit pass with the refined point; keep the previous inliers if it loses them
+    refit = ray_distances(point, origins, directions) < threshold
+    if refit.sum() >= 2:
+        mask = refit
+        point = intersect_rays(origins[mask], directions[mask])
+    return point, mask
+
+
+def sweep_normal(directions: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Normal of the plane swept by ray directions (the rotation axis).
+
+    Returns:
+        (unit normal, RMS out-of-plane component of the directions)
+    """
+    centred = directions - directions.mean(axis=0)
+    _, singular_values, vt = np.linalg.svd(centred, full_matrices=False)
+    normal = vt[-1]
+    return normal, float(singular_values[-1] / np.sqrt(len(directions)))
+
+
 class Calibrator:
     def __init__(self, config_manager):
         self.logger = logging.getLogger("Calibrator")
         self.config = config_manager
         self.positions = []
         self.calibration_step = 0
+
+        # Least-squares solver settings (marker units, mm)
+        solver_config = self.config.config["calibration"].get("solver", {})
+        self.ransac_threshold = solver_config.get("ransac_threshold", 10.0)
+        self.ransac_iterations = solver_config.get("ransac_iterations", 200)
+        self.min_rays = solver_config.get("min_rays", 3)
+        self.residuals = None
         
         # Load existing calibration
         pan_origin, tilt_origin, rotation_matrix = self.config.get_calibration_data()
@@ -71,6 +183,91 @@ class Calibrator:
             self.rotation_matrix
         )
 
+    def calibrate_rays(self, pan_p1: np.ndarray, pan_p2: np.ndarray,
+                       tilt_p1: np.ndarray, tilt_p2: np.ndarray) -> Dict:
+        """
+        Calibrate from any number of pointing rays.
+
+        Each ray is given by the two pointer markers (p1 -> p2). Pan rays are
+        recorded while only the pan axis moves, tilt rays while only the tilt
+        axis moves; the first inlier pan ray is the reference (home) direction.
+
+        Origins are RANSAC + least-squares ray intersections, the pan axis
+        (local z) is the normal of the plane swept by the pan rays.
+
+        Args:
+            pan_p1, pan_p2: (N, 3) marker positions of the pan sweep
+            tilt_p1, tilt_p2: (M, 3) marker positions of the tilt sweep
+
+        Returns:
+            Residual report (mm for distances)
+        """
+        pan_p1, pan_p2 = np.asarray(pan_p1, dtype=np.float64), np.asarray(pan_p2, dtype=np.float64)
+        tilt_p1, tilt_p2 = np.asarray(tilt_p1, dtype=np.float64), np.asarray(tilt_p2, dtype=np.float64)
+        if len(pan_p1) < self.min_rays or len(tilt_p1) < self.min_rays:
+            raise ValueError(f"Need at least {self.min_rays} pan and tilt rays, "
+                             f"got {len(pan_p1)} and {len(tilt_p1)}")
+
+        pan_dirs = ray_directions(pan_p1, pan_p2)
+        tilt_dirs = ray_directions(tilt_p1, tilt_p2)
+
+        pan_origin, pan_inliers = ransac_intersection(
+            pan_p1, pan_dirs, self.ransac_threshold, self.ransac_iterations)
+        tilt_origin, tilt_inliers = ransac_intersection(
+            tilt_p1, tilt_dirs, self.ransac_threshold, self.ransac_iterations)
+        if pan_inliers.sum() < self.min_rays or tilt_inliers.sum() < self.min_rays:
+            raise ValueError(f"Need at least {self.min_rays} pan and tilt inlier rays, "
+                             f"got {pan_inliers.sum()} and {tilt_inliers.sum()}")
+
+        # Marker order (and so the sign of p1 -> p2) is arbitrary: use vectors pointing
+        # away from the fitted origin, like the midpoint vectors of the six-point method
+        outward = ((pan_p1 + pan_p2) / 2 - pan_origin)[pan_inliers]
+        outward_dirs = pan_dirs[pan_inliers]
+        outward_dirs = outward_dirs * np.sign(np.einsum('ij,ij->i', outward_dirs, outward))[:, None]
+
+        # Pan axis from the inlier sweep, oriented like cross(reference, later rays)
+        z_axis, plane_rms = sweep_normal(outward_dirs)
+        reference = outward[0]
+        if np.sum(np.cross(reference, outward) @ z_axis) < 0:
+            z_axis = -z_axis
+
+        # Reference direction projected into the pan plane
+        x_axis = reference - (reference @ z_axis) * z_axis
+        x_axis = x_axis / np.linalg.norm(x_axis)
+        y_axis = np.cross(x_axis, z_axis)
+
+        self.pan_origin = pan_origin
+        self.tilt_origin = tilt_origin
+        self.rotation_matrix = np.column_stack((x_axis, y_axis, z_axis))
+
+        pan_residuals = ray_distances(pan_origin, pan_p1, pan_dirs)[pan_inliers]
+        tilt_residuals = ray_distances(tilt_origin, tilt_p1, tilt_dirs)[tilt_inliers]
+        self.residuals = {
+            "pan_rms": float(np.sqrt(np.mean(pan_residuals ** 2))),
+            "tilt_rms": float(np.sqrt(np.mean(tilt_residuals ** 2))),
+            "pan_inliers": int(pan_inliers.sum()),
+            "pan_rays": len(pan_p1),
+            "tilt_inliers": int(tilt_inliers.sum()),
+            "tilt_rays": len(tilt_p1),
+            "plane_rms": plane_rms,
+            "axis_offset": float(np.linalg.norm(tilt_origin - pan_origin)),
+        }
+        self.logger.info(
+            f"Calibrated from {len(pan_p1)} pan / {len(tilt_p1)} tilt rays: "
+            f"pan RMS {self.residuals['pan_rms']:.2f} mm ({self.residuals['pan_inliers']} inliers), "
+            f"tilt RMS {self.residuals['tilt_rms']:.2f} mm ({self.residuals['tilt_inliers']} inliers)"
+        )
+
+        self.config.update_calibration(
+            self.pan_origin,
+            self.tilt_origin,
+            self.rotation_matrix,
+            residuals=self.residuals
+        )
+        self.calibrated = True
+        self.calibration_age = 0
+        return self.residuals
+
     def find_closest_points(self, p1: np.ndarray, p2: np.ndarray, p3: np.ndarray, p4: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         d1 = p2 - p1
         d2 = p4 - p3
@@ -118,6 +315,8 @@ class Calibrator:
             self.logger.error("Calibration data not available.")
             return
 
+        import matplotlib.pyplot as plt
+
         fig = plt.figure()
         ax = fig.add_subplot(111, projection='3d')
 
@@ -0,0 +1,161 @@
+import logging
+import threading
+import time
+import numpy as np
+from collections import deque
+from typing import Dict, List, Optional
+from tracking.calibrate import intersect_rays, ray_directions, ray_distances
+
+PAN = "pan"
+TILT = "tilt"
+
+
+class CalibrationCapture:
+    """
+    Records calibration pointer rays from the mocap stream while the operator sweeps the head.
+
+    A background thread samples the two pointer markers at the mocap rate.
+    Samples are rejected when a marker is missing or stale, the marker
+    separation does not match the pointer (occlusion / marker swap), or the
+    pointer moves too fast (motion blur). The operator sweeps the pan axis,
+    switches to the tilt sweep with next_phase(), and finish() solves with
+    Calibrator.calibrate_rays. A running least-squares origin of the current
+    sweep is kept up to date for feedback.
+
+    Args:
+        mocap: Mocap stream exposing marker_pair (see MocapBase)
+        calibrator: Calibrator used for the final solve
+        capture_config: config["calibration"]["capture"]
+    """
+    def __init__(self, mocap, calibrator, capture_config: Optional[dict] = None):
+        self.logger = logging.getLogger("CalibrationCapture")
+        self.mocap = mocap
+        self.calibrator = calibrator
+
+        capture_config = capture_config or {}
+        self.poll_hz = capture_config.get("poll_hz", 500)
+        self.separation_tolerance = capture_config.get("separation_tolerance", 5.0)  # mm
+        self.max_speed = capture_config.get("max_speed", 500.0)  # mm/s of the pointer tip
+        self.solve_interval = capture_config.get("solve_interval", 0.5)  # s between running solves
+
+        self.phase = PAN
+        self.rays: Dict[str, List[np.ndarray]] = {PAN: [], TILT: []}
+        self.rejected = {"missing": 0, "separation": 0, "motion": 0}
+        self.running_origin: Optional[np.ndarray] = None
+        self.running_rms: Optional[float] = None
+
+        self._separations = deque(maxlen=101)  # Recent pointer marker distances
+        self._last_sample = None  # Last raw sample, to skip repeats
+        self._accepted = None  # (sample, time) of the last recorded ray
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+        self.logger.info("Calibration capture started: sweep the pan axis")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def next_phase(self) -> None:
+        """Switch from the pan sweep to the tilt sweep"""
+        with self._lock:
+            self.phase = TILT
+            self.running_origin = None
+            self.running_rms = None
+        self.logger.info(f"Recorded {len(self.rays[PAN])} pan rays: sweep the tilt axis")
+
+    def finish(self) -> Dict:
+        """Stop capturing and solve the calibration from all recorded rays"""
+        self.stop()
+        pan = np.array(self.rays[PAN])
+        tilt = np.array(self.rays[TILT])
+        self.logger.info(f"Captured {len(pan)} pan / {len(tilt)} tilt rays, rejected {self.rejected}")
+        if not len(pan) or not len(tilt):
+            raise ValueError("Both a pan and a tilt sweep are needed")
+        return self.calibrator.calibrate_rays(pan[:, 0], pan[:, 1], tilt[:, 0], tilt[:, 1])
+
+    def count(self, phase: Optional[str] = None) -> int:
+        return len(self.rays[phase or self.phase])
+
+    def _capture_loop(self) -> None:
+        period = 1.0 / self.poll_hz
+        last_solve = time.perf_counter()
+        while not self._stop_event.is_set():
+            now = time.perf_counter()
+            # One read: both markers and the count come from the same mocap frame
+            p1, p2, num_markers = self.mocap.marker_pair
+            self.add_sample(p1, p2, now, num_markers)
+
+            if now - last_solve >= self.solve_interval:
+                self.update_running_solution()
+                last_solve = now
+            time.sleep(period)
+
+    def add_sample(self, p1, p2, timestamp: float, num_markers: int = 2) -> bool:
+        """Filter one marker pair and record it as a ray of the current sweep"""
+        if num_markers < 2 or p2 is None:
+            self.rejected["missing"] += 1
+            return False
+        sample = np.array([p1, p2], dtype=np.float64)
+        if not np.all(np.isfinite(sample)):
+            self.rejected["missing"] += 1
+            return False
+        # The stream repeats the last positions until a new frame arrives
+        if self._last_sample is not None and np.array_equal(sample, self._last_sample):
+            return False
+
+        self._last_sample = sample
+
+        # Compare with the median pointer length so a bad sample cannot become the reference
+        separation = np.linalg.norm(sample[1] - sample[0])
+        self._separations.append(separation)
+        if len(self._separations) < 5:
+            return False
+        if abs(separation - np.median(self._separations)) > self.separation_tolerance:
+            self.rejected["separation"] += 1
+            return False
+
+        if self._accepted is not None and timestamp > self._accepted[1]:
+            previous, previous_time = self._accepted
+            # Either marker order may match the previous sample
+            moved = min(np.linalg.norm(sample - previous, axis=1).max(),
+                        np.linalg.norm(sample[::-1] - previous, axis=1).max())
+            speed = moved / (timestamp - previous_time)
+            if speed > self.max_speed:
+                self.rejected["motion"] += 1
+                return False
+
+        # Unlabelled markers may swap order: keep each ray pointing the same way as
+        # the previous one, which follows the sweep past 90 degrees from the first ray
+        if self._accepted is not None:
+            previous = self._accepted[0]
+            if (sample[1] - sample[0]) @ (previous[1] - previous[0]) < 0:
+                sample = sample[::-1]
+
+        self._accepted = (sample, timestamp)
+        with self._lock:
+            self.rays[self.phase].append(sample)
+        return True
+
+    def update_running_solution(self) -> None:
+        """Least-squares origin of the current sweep so far"""
+        with self._lock:
+            rays = np.array(self.rays[self.phase])
+        if len(rays) < 2:
+            return
+        try:
+            directions = ray_directions(rays[:, 0], rays[:, 1])
+            origin = intersect_rays(rays[:, 0], directions)
+        except ValueError:
+            # Sweep has not opened up an angle yet
+            return
+        residuals = ray_distances(origin, rays[:, 0], directions)
+        self.running_origin = origin
+        self.running_rms = float(np.sqrt(np.mean(residuals ** 2)))
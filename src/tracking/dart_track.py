@@ -1,20 +1,23 @@
 from utils.misc_funcs import set_realtime_priority, num_to_range
 import logging, time, asyncio
-from utils.perf_timings import perf_counter_ns
-from hardware.motion.dyna_controller import *
-from importlib import reload
+from utils.perf_timings import perf_counter_ns, PerfSleeper
+from utils.tracer import tracer
+from hardware.motion.dyna_controller import DynaController
 from hardware.motion.theia_controller import TheiaController
-from hardware.mocap.qtm_mocap import *
 import numpy as np
 import queue
 import threading
 import math
+from typing import Tuple
 from core.config_manager import ConfigManager
 from tracking.kalman_filter import AdaptiveKalmanFilter
-from tracking.visual_tracker import VisualTracker
 import os
 import sys
 
+# This module is the entry point of the tracking process, so it only imports
+# the control path. Mocap clients and the visual tracker (OpenCV, camera
+# drivers) are imported by dart_track() once the tracking mode is known.
+
 
 class DynaTracker:
     '''
@@ -34,7 +37,7 @@ class DynaTracker:
         )
 
         # Load configuration
-        self.config = ConfigManager()
+        self.config = ConfigManager.shared()
         
         # Get calibration data from config
         pan_origin, tilt_origin, rotation_matrix = self.config.get_calibration_data()
@@ -120,6 +123,28 @@ class DynaTracker:
         self.kalman = AdaptiveKalmanFilter(mode='position') if self.use_kalman else None
         self.last_time = time.perf_counter()
 
+        # Fixed control rate (0 runs the loop as fast as the servo bus allows)
+        self.control_hz = self.config.config["tracking"].get("control_hz", 0)
+        self.sleeper = None  # Deadline sleeper of the fixed-rate loop
+
+    def run(self, terminate_event) -> None:
+        """Run track() at the configured control rate until terminate_event is set"""
+        period_ns = int(1e9 / self.control_hz) if self.control_hz else 0
+        if period_ns:
+            # Created on this thread: the sleeper sets the calling thread's timer slack
+            self.sleeper = PerfSleeper()
+        deadline = perf_counter_ns()
+        while not terminate_event.is_set():
+            self.track()
+            if not period_ns:
+                continue
+            deadline += period_ns
+            now = perf_counter_ns()
+            if deadline < now:
+                # Overran: skip the missed periods instead of bursting to catch up
+                deadline += (now - deadline) // period_ns * period_ns
+            self.sleeper.sleep_until_ns(deadline)
+
     def tilt_global_to_local(self, point_global: np.ndarray) -> np.ndarray:
         if self.rotation_matrix is None:
             raise ValueError("Calibration must be completed before transforming points.")
@@ -143,8 +168,10 @@ class DynaTracker:
         steps = max(0, min(steps, 65535))
         return steps
 
+    @tracer.traced("track")
     def track(self):
         if self.use_kalman:
+            span_start = tracer.begin()
             current_time = time.perf_counter()
             delta_t = current_time - self.last_time
             self.last_time = current_time
@@ -176,6 +203,7 @@ class DynaTracker:
                 prediction_time = 0.016  # Look ahead 16ms for fast movements
                 position_prediction = estimated_position + estimated_velocity * prediction_time
                 estimated_position = position_prediction
+            tracer.end("kalman", span_start)
 
         else:
             # Use raw target position when Kalman is disabled
@@ -191,7 +219,9 @@ class DynaTracker:
             steps = self.distance_to_steps(distance)
             self.logger.info(f"Distance: {distance} Steps: {steps}")
             steps = max(0, steps)
+            span_start = tracer.begin()
             self.theia.move_axis("B", steps)
+            tracer.end("theia_move", span_start)
             self.dist = distance
 
         # Get the local target position
@@ -207,12 +237,16 @@ class DynaTracker:
         tilt_angle = round(num_to_range(tilt_angle, 45, -45, 22.5, 67.5), 2) - 0.1
 
         # Set the dynamixel to the calculated angles
+        span_start = tracer.begin()
         self.dyna.set_sync_pos(pan_angle, tilt_angle)
+        tracer.end("servo_write", span_start)
 
         time.sleep(1/1000)
         
         # Get the current angles of the dynamixels
+        span_start = tracer.begin()
         encoder_pan_angle, encoder_tilt_angle = self.dyna.get_sync_pos()
+        tracer.end("servo_read", span_start)
 
         # Put the data into the queue in a non-blocking way
         data = (
@@ -235,6 +269,8 @@ class DynaTracker:
         # Print control frequency
         end_time = time.perf_counter()
         self.logger.info(f"Control frequency: {self.counter / (end_time - self.start_time)} Hz")
+        if self.sleeper is not None:
+            self.logger.info(f"Sleep overshoot: {self.sleeper.stats()}")
 
         # Retrieve current lens positions
         try:
@@ -242,7 +278,8 @@ class DynaTracker:
             if zoom_position is not None and focus_position is not None:
                 self.logger.info(f"Current Theia positions - Zoom: {zoom_position}, Focus: {focus_position}")
                 self.config.update_theia_position(zoom=zoom_position, focus=focus_position)
-                self.config.save_config()
+                # Write now: the process may exit without running atexit handlers
+                self.config.flush()
                 self.logger.info("Lens positions saved to configuration.")
             else:
                 self.logger.warning("Could not retrieve current lens positions.")
@@ -287,12 +324,15 @@ def dart_track(data_queue, terminate_event):
         logging.warning(f"Could not set real-time priority: {e}")
     
     # Load config
-    config = ConfigManager()
+    config = ConfigManager.shared()
     
     # Initialize appropriate tracker based on mode
     try:
         if config.config["tracking"]["mode"] == "visual":
+            from tracking.visual_tracker import VisualTracker
             tracker = VisualTracker(data_queue, config.config)
+            # Runs its own acquisition/processing/actuation loop
+            tracker.run(terminate_event)
         else:
             # Initialize mocap based on config
             mocap_config = config.config["devices"]["mocap"]
@@ -315,8 +355,7 @@ def dart_track(data_queue, terminate_event):
             
             tracker = DynaTracker(data_queue, mocap)
             
-        while not terminate_event.is_set():
-            tracker.track()
+            tracker.run(terminate_event)
             
     except Exception as e:
         logging.error(f"Error in tracking: {e}")
@@ -324,6 +363,8 @@ def dart_track(data_queue, terminate_event):
     finally:
         if tracker:
             tracker.shutdown()
+        # Forked processes exit without running atexit handlers
+        tracer.export()
         # Clear the queue
         while not data_queue.empty():
             try:
@@ -0,0 +1,121 @@
+"""
+Benchmark VisualTracker detection settings on recorded footage.
+
+Every detector / variant combination runs over the same frames; centroids
+are compared with the full-resolution, full-frame MOG2 reference to show
+what each speed-up costs in accuracy.
+
+Usage (from the repository root):
+    python src/tracking/detection_bench.py clip.mp4 [--frames 2000] [--grayscale]
+        [--detectors mog2 running_average bright_blob] [--variants full roi]
+"""
+import argparse
+import copy
+import os
+import sys
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from core.config_manager import ConfigManager
+from hardware.camera.video_capture import VideoFileCapture
+from tracking.detectors import DETECTORS
+from tracking.target_detector import TargetDetector
+from utils.perf_timings import perf_counter_ns
+
+# Variant name -> overrides of config["tracking"]["visual_tracking"]
+VARIANTS: Dict[str, dict] = {
+    "full": {"roi": {"enabled": False}, "pyramid": {"enabled": False}},
+    "pyramid_1": {"roi": {"enabled": False}, "pyramid": {"enabled": True, "levels": 1}},
+    "pyramid_2": {"roi": {"enabled": False}, "pyramid": {"enabled": True, "levels": 2}},
+    "roi": {"roi": {"enabled": True}, "pyramid": {"enabled": False}},
+    "roi_pyramid_1": {"roi": {"enabled": True}, "pyramid": {"enabled": True, "levels": 1}},
+}
+REFERENCE = ("mog2", "full")
+
+
+def load_frames(source: str, max_frames: int, grayscale: bool) -> List[np.ndarray]:
+    """Decode the clip once so decoding cost is excluded from the timings."""
+    cap = VideoFileCapture(source, realtime=False, loop=False, grayscale=grayscale)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open {source}")
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def merge_config(base: dict, overrides: dict) -> dict:
+    config = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict):
+            config[key] = {**config.get(key, {}), **value}
+        else:
+            config[key] = value
+    return config
+
+
+def run_variant(frames: List[np.ndarray], visual_config: dict) -> Tuple[np.ndarray, List[Optional[Tuple[float, float]]]]:
+    """Return per-frame processing times (ms) and centroids."""
+    detector = TargetDetector(visual_config)
+    times = np.empty(len(frames))
+    centroids = []
+    for i, frame in enumerate(frames):
+        t0 = perf_counter_ns()
+        result = detector.detect(frame)
+        times[i] = (perf_counter_ns() - t0) * 1e-6
+        centroids.append(None if result is None else (float(result[0]), float(result[1])))
+    return times, centroids
+
+
+def centroid_errors(centroids, reference) -> np.ndarray:
+    """Pixel distance to the reference on frames where both detected the target."""
+    errors = [
+        np.hypot(c[0] - r[0], c[1] - r[1])
+        for c, r in zip(centroids, reference)
+        if c is not None and r is not None
+    ]
+    return np.array(errors)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark visual detection settings")
+    parser.add_argument("source", help="video file, image directory or glob")
+    parser.add_argument("--frames", type=int, default=2000, help="maximum frames to process")
+    parser.add_argument("--grayscale", action="store_true", help="feed mono frames like the tracking camera")
+    parser.add_argument("--variants", nargs="*", default=list(VARIANTS), help="variants to run")
+    parser.add_argument("--detectors", nargs="*", default=list(DETECTORS), help="detectors to run")
+    args = parser.parse_args()
+
+    base_config = ConfigManager.shared().config["tracking"]["visual_tracking"]
+    frames = load_frames(args.source, args.frames, args.grayscale)
+    print(f"{len(frames)} frames of {frames[0].shape} from {args.source}\n")
+
+    # Warm-up frames (background model convergence) are excluded from the stats
+    warmup = min(50, len(frames) // 4)
+    runs = [REFERENCE] + [(detector, variant) for detector in args.detectors for variant in args.variants]
+    results = {}
+    for detector, variant in dict.fromkeys(runs):
+        overrides = {**VARIANTS[variant], "detector": detector}
+        results[f"{detector}/{variant}"] = run_variant(frames, merge_config(base_config, overrides))
+
+    reference = results["/".join(REFERENCE)][1][warmup:]
+    print(f"{'detector/variant':>30} {'mean ms':>8} {'p95 ms':>8} {'detect %':>9} {'err px':>7} {'p95 px':>7}")
+    for name, (times, centroids) in results.items():
+        times, centroids = times[warmup:], centroids[warmup:]
+        detected = sum(c is not None for c in centroids) / max(1, len(centroids)) * 100
+        errors = centroid_errors(centroids, reference)
+        mean_err = errors.mean() if errors.size else float("nan")
+        p95_err = np.percentile(errors, 95) if errors.size else float("nan")
+        print(f"{name:>30} {times.mean():8.2f} {np.percentile(times, 95):8.2f} "
+              f"{detected:9.1f} {mean_err:7.2f} {p95_err:7.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import cv2
+import numpy as np
+from typing import Dict, Optional, Type
+
+
+class ForegroundDetector:
+    """
+    Per-pixel foreground model used by TargetDetector.
+
+    `apply` takes a grayscale image and returns a binary uint8 mask (0/255).
+    Detectors that keep a background model expose it through
+    `background_image` so the search-window mode can take it over; stateless
+    detectors (uses_background = False) are applied to the window directly.
+    """
+    name = "base"
+    uses_background = True
+
+    def apply(self, gray: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def background_image(self) -> Optional[np.ndarray]:
+        return None
+
+
+class MOG2Detector(ForegroundDetector):
+    """Gaussian mixture background subtraction (robust, most expensive)"""
+    name = "mog2"
+
+    def __init__(self, history: int = 20, var_threshold: float = 8, **_):
+        self.bg_subtractor = cv2.createBackgroundSubtractorMOG2(
+            history=history,              # Shorter history for faster adaptation (was 50)
+            varThreshold=var_threshold,   # Lower threshold for higher sensitivity (was 16)
+            detectShadows=False           # Keep disabled for speed
+        )
+
+    def apply(self, gray: np.ndarray) -> np.ndarray:
+        return self.bg_subtractor.apply(gray)
+
+    def background_image(self) -> Optional[np.ndarray]:
+        return self.bg_subtractor.getBackgroundImage()
+
+
+class RunningAverageDetector(ForegroundDetector):
+    """
+    Difference against an exponentially averaged background.
+
+    The background only learns pixels that are not foreground, so a target
+    that stops is not absorbed. With alpha = 1 the whole frame is copied
+    instead, which is plain differencing against the previous frame.
+    """
+    name = "running_average"
+
+    def __init__(self, alpha: float = 0.05, threshold: int = 25, **_):
+        self.alpha = alpha
+        self.threshold = threshold
+        self.background = None
+        self._mask = None
+
+    def apply(self, gray: np.ndarray) -> np.ndarray:
+        if self.background is None or self.background.shape != gray.shape:
+            self.background = gray.astype(np.float32)
+            return np.zeros_like(gray)
+
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self.background))
+        _, fg_mask = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)
+
+        if self.alpha >= 1:
+            # Frame differencing: the next frame is compared with this one
+            self.background[:] = gray
+            return fg_mask
+
+        # Only learn the background where nothing is moving
+        self._mask = cv2.bitwise_not(fg_mask, dst=self._mask)
+        cv2.accumulateWeighted(gray, self.background, self.alpha, mask=self._mask)
+        return fg_mask
+
+    def background_image(self) -> Optional[np.ndarray]:
+        if self.background is None:
+            return None
+        return cv2.convertScaleAbs(self.background)
+
+
+class BrightBlobDetector(ForegroundDetector):
+    """Fixed intensity threshold for retro-reflective / IR marker targets"""
+    name = "bright_blob"
+    uses_background = False
+
+    def __init__(self, threshold: int = 200, **_):
+        self.threshold = threshold
+
+    def apply(self, gray: np.ndarray) -> np.ndarray:
+        _, fg_mask = cv2.threshold(gray, self.threshold, 255, cv2.THRESH_BINARY)
+        return fg_mask
+
+
+DETECTORS: Dict[str, Type[ForegroundDetector]] = {
+    detector.name: detector for detector in (MOG2Detector, RunningAverageDetector, BrightBlobDetector)
+}
+
+
+def create_detector(visual_config: dict) -> ForegroundDetector:
+    """
+    Build the foreground detector selected in config["tracking"]["visual_tracking"].
+
+    The detector's parameters are read from the sub-dict with its name.
+    """
+    name = visual_config.get("detector", MOG2Detector.name)
+    if name not in DETECTORS:
+        raise ValueError(f"Unknown detector: {name} (available: {', '.join(DETECTORS)})")
+    return DETECTORS[name](**visual_config.get(name, {}))
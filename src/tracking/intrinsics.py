@@ -0,0 +1,229 @@
+"""
+Camera intrinsics calibration and pixel-to-angle lookup for visual tracking.
+
+Calibrate from checkerboard images (or live frames from a camera) and store
+the result in app_config.json:
+    python src/tracking/intrinsics.py --images "calib/*.png" --pattern 9 6 --square 25
+    python src/tracking/intrinsics.py --camera 24211773 --frames 25
+"""
+import argparse
+import glob
+import logging
+import os
+import sys
+import time
+import cv2
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Placeholder focal length used before the camera has been calibrated
+DEFAULT_FOCAL_PX = 800.0
+
+
+def find_checkerboard(gray: np.ndarray, pattern_size: Tuple[int, int]) -> Optional[np.ndarray]:
+    """Find inner checkerboard corners with sub-pixel refinement."""
+    found, corners = cv2.findChessboardCorners(
+        gray, pattern_size, cv2.CALIB_CB_ADAPTIVE_THRESH | cv2.CALIB_CB_NORMALIZE_IMAGE
+    )
+    if not found:
+        return None
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+    return cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
+
+
+def calibrate_intrinsics(images: Iterable[np.ndarray], pattern_size: Tuple[int, int] = (9, 6),
+                         square_size: float = 25.0) -> Dict:
+    """
+    Estimate camera matrix and distortion from checkerboard views.
+
+    Args:
+        images: Grayscale or colour frames showing the checkerboard
+        pattern_size: Inner corners per row and column
+        square_size: Square edge length (mm); only scales the extrinsics
+
+    Returns:
+        Dict with camera_matrix (3x3), dist_coeffs, image_size (w, h),
+        rms reprojection error (px) and the number of views used
+    """
+    # Checkerboard corner positions in the board's own plane
+    board = np.zeros((pattern_size[0] * pattern_size[1], 3), np.float32)
+    board[:, :2] = np.mgrid[0:pattern_size[0], 0:pattern_size[1]].T.reshape(-1, 2) * square_size
+
+    object_points, image_points = [], []
+    image_size = None
+    for image in images:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        image_size = (gray.shape[1], gray.shape[0])
+        corners = find_checkerboard(gray, pattern_size)
+        if corners is not None:
+            object_points.append(board)
+            image_points.append(corners)
+
+    if len(image_points) < 3:
+        raise ValueError(f"Checkerboard found in only {len(image_points)} images, need at least 3")
+
+    rms, camera_matrix, dist_coeffs, _, _ = cv2.calibrateCamera(
+        object_points, image_points, image_size, None, None
+    )
+    return {
+        "camera_matrix": camera_matrix,
+        "dist_coeffs": dist_coeffs.ravel(),
+        "image_size": image_size,
+        "rms": float(rms),
+        "views": len(image_points),
+    }
+
+
+def default_camera_matrix(width: int, height: int) -> np.ndarray:
+    """Pinhole model with the placeholder focal length and the image centre."""
+    return np.array([
+        [DEFAULT_FOCAL_PX, 0, width // 2],
+        [0, DEFAULT_FOCAL_PX, height // 2],
+        [0, 0, 1],
+    ], dtype=np.float64)
+
+
+def build_angle_lut(camera_matrix: np.ndarray, dist_coeffs: Optional[np.ndarray],
+                    width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Precompute pan/tilt angles (degrees) for every pixel.
+
+    Pixels are undistorted to normalised camera coordinates once, so the
+    tracking loop only needs an array lookup.
+
+    Returns:
+        (pan_lut, tilt_lut) float32 arrays of shape (height, width)
+    """
+    xs, ys = np.meshgrid(np.arange(width, dtype=np.float32), np.arange(height, dtype=np.float32))
+    pixels = np.stack([xs.ravel(), ys.ravel()], axis=1).reshape(-1, 1, 2)
+    if dist_coeffs is None:
+        dist_coeffs = np.zeros(5)
+    normalised = cv2.undistortPoints(pixels, camera_matrix, dist_coeffs).reshape(height, width, 2)
+
+    pan_lut = np.degrees(np.arctan(normalised[..., 0])).astype(np.float32)
+    tilt_lut = -np.degrees(np.arctan(normalised[..., 1])).astype(np.float32)
+    return pan_lut, tilt_lut
+
+
+class PixelAngleMapper:
+    """Pixel centroid to camera-relative pan/tilt angles via a lookup table."""
+    def __init__(self, camera_matrix: np.ndarray, dist_coeffs: Optional[np.ndarray], width: int, height: int):
+        self.width = width
+        self.height = height
+        self.camera_matrix = camera_matrix
+        self.dist_coeffs = np.zeros(5) if dist_coeffs is None else dist_coeffs
+        self.pan_lut, self.tilt_lut = build_angle_lut(camera_matrix, dist_coeffs, width, height)
+
+    @classmethod
+    def from_config(cls, config: dict, width: int, height: int) -> "PixelAngleMapper":
+        """
+        Build the mapper from calibration.camera_intrinsics, or the default
+        pinhole model if the camera has not been calibrated.
+        """
+        logger = logging.getLogger("PixelAngleMapper")
+        intrinsics = config.get("calibration", {}).get("camera_intrinsics")
+        if not intrinsics:
+            logger.warning(f"No camera intrinsics in config, using fx = fy = {DEFAULT_FOCAL_PX:.0f}")
+            return cls(default_camera_matrix(width, height), None, width, height)
+
+        camera_matrix = np.array(intrinsics["camera_matrix"], dtype=np.float64)
+        dist_coeffs = np.array(intrinsics["dist_coeffs"], dtype=np.float64)
+        calib_width, calib_height = intrinsics["image_size"]
+        if (calib_width, calib_height) != (width, height):
+            # Binning / decimation scales the focal length and principal point
+            logger.warning(f"Intrinsics calibrated at {calib_width}x{calib_height}, scaling to {width}x{height}")
+            camera_matrix[0] *= width / calib_width
+            camera_matrix[1] *= height / calib_height
+        return cls(camera_matrix, dist_coeffs, width, height)
+
+    def angles(self, cx: float, cy: float) -> Tuple[float, float]:
+        """
+        Pan/tilt angles (degrees) at the sub-pixel centroid (cx, cy).
+
+        Bilinear interpolation between the four surrounding table entries keeps
+        the sub-pixel precision of the centroid; points outside the image are
+        clamped to the edge.
+        """
+        x = min(max(cx, 0.0), self.width - 1.0)
+        y = min(max(cy, 0.0), self.height - 1.0)
+        x0 = min(int(x), self.width - 2) if self.width > 1 else 0
+        y0 = min(int(y), self.height - 2) if self.height > 1 else 0
+        x1 = min(x0 + 1, self.width - 1)
+        y1 = min(y0 + 1, self.height - 1)
+        fx, fy = x - x0, y - y0
+
+        def interpolate(lut):
+            top = lut[y0, x0] + (lut[y0, x1] - lut[y0, x0]) * fx
+            bottom = lut[y1, x0] + (lut[y1, x1] - lut[y1, x0]) * fx
+            return float(top + (bottom - top) * fy)
+
+        return interpolate(self.pan_lut), interpolate(self.tilt_lut)
+
+    def pixel(self, pan: float, tilt: float) -> Tuple[float, float]:
+        """Inverse of angles(): project camera-relative angles back to a pixel."""
+        ray = np.array([[np.tan(np.radians(pan)), -np.tan(np.radians(tilt)), 1.0]])
+        points, _ = cv2.projectPoints(ray, np.zeros(3), np.zeros(3), self.camera_matrix, self.dist_coeffs)
+        return float(points[0, 0, 0]), float(points[0, 0, 1])
+
+
+def capture_calibration_frames(serial: str, frames: int, pattern_size: Tuple[int, int],
+                               interval: float = 1.0) -> List[np.ndarray]:
+    """Grab frames from a camera, keeping one checkerboard view per interval."""
+    from hardware.camera.camera_manager import CameraManager
+
+    camera = CameraManager()
+    if not camera.connect_camera(serial):
+        raise RuntimeError(f"Failed to connect to camera {serial}")
+
+    views = []
+    last_view = 0.0
+    try:
+        while len(views) < frames:
+            ret, frame = camera.cap.read()
+            if not ret or time.perf_counter() - last_view < interval:
+                continue
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+            if find_checkerboard(gray, pattern_size) is not None:
+                views.append(gray.copy())
+                last_view = time.perf_counter()
+                print(f"Captured view {len(views)}/{frames} - move the board")
+    finally:
+        camera.release()
+    return views
+
+
+def main() -> int:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from core.config_manager import ConfigManager
+
+    parser = argparse.ArgumentParser(description="Checkerboard camera intrinsics calibration")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--images", help="glob of checkerboard images")
+    source.add_argument("--camera", help="serial of the camera to capture from")
+    parser.add_argument("--frames", type=int, default=25, help="views to capture from the camera")
+    parser.add_argument("--pattern", type=int, nargs=2, default=(9, 6), help="inner corners (cols rows)")
+    parser.add_argument("--square", type=float, default=25.0, help="square size in mm")
+    args = parser.parse_args()
+
+    pattern_size = tuple(args.pattern)
+    if args.images:
+        images = [cv2.imread(path, cv2.IMREAD_GRAYSCALE) for path in sorted(glob.glob(args.images))]
+    else:
+        images = capture_calibration_frames(args.camera, args.frames, pattern_size)
+
+    result = calibrate_intrinsics(images, pattern_size, args.square)
+    print(f"RMS reprojection error: {result['rms']:.3f} px over {result['views']} views")
+    print(f"Camera matrix:\n{result['camera_matrix']}")
+    print(f"Distortion: {result['dist_coeffs']}")
+
+    config = ConfigManager.shared()
+    config.update_camera_intrinsics(
+        result["camera_matrix"], result["dist_coeffs"], result["image_size"], result["rms"]
+    )
+    config.flush()
+    print("Saved to config")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -133,6 +133,21 @@ class AdaptiveKalmanFilter:
             F_latency @ self.estimate_covariance @ F_latency.T + self.Q
         )
 
+    def predict_ahead(self, delta_t: float, state: np.ndarray = None) -> np.ndarray:
+        """
+        Extrapolate a state forward without modifying the filter.
+        
+        Args:
+            delta_t: Time to predict forward in seconds
+            state: State to extrapolate (defaults to the current estimate)
+            
+        Returns:
+            Predicted state vector
+        """
+        if state is None:
+            state = self.state_estimate
+        return self.create_F(delta_t) @ state
+
     def get_position(self) -> np.ndarray:
         """
         Get current estimated position.
@@ -0,0 +1,234 @@
+import cv2
+import numpy as np
+import logging
+from typing import Optional, Tuple
+from tracking.detectors import create_detector
+
+# (cx, cy, foreground mask) in full-resolution pixel coordinates
+Detection = Tuple[float, float, np.ndarray]
+
+
+class TargetDetector:
+    """
+    Finds the moving target in camera frames for VisualTracker.
+
+    Full-frame foreground detection (MOG2 by default, see detectors.py)
+    acquires the target, optionally on a downscaled pyramid level with the
+    centroid refined on a full-resolution patch. Once locked, only a search
+    window around the predicted position is processed until the target is
+    missed for `roi_max_misses` frames.
+
+    Args:
+        visual_config: config["tracking"]["visual_tracking"]
+    """
+    def __init__(self, visual_config: dict):
+        self.logger = logging.getLogger("TargetDetector")
+        self.min_contour_area = visual_config.get("min_contour_area", 100)
+        self.learning_rate = visual_config.get("learning_rate", 0.005)
+
+        # Search window around the predicted target; full frame only to reacquire
+        roi_config = visual_config.get("roi", {})
+        self.roi_enabled = roi_config.get("enabled", True)
+        self.roi_size = roi_config.get("size", 160)
+        self.roi_diff_threshold = roi_config.get("diff_threshold", 25)
+        self.roi_max_misses = roi_config.get("max_misses", 5)  # Frames to coast before full-frame search
+
+        # Detect on a downscaled image, refine on the full-resolution patch
+        pyramid_config = visual_config.get("pyramid", {})
+        self.pyramid_enabled = pyramid_config.get("enabled", False)
+        self.pyramid_levels = max(0, pyramid_config.get("levels", 1)) if self.pyramid_enabled else 0
+        self.pyramid_scale = 2 ** self.pyramid_levels
+        self.refine_margin = pyramid_config.get("refine_margin", 2)  # Coarse pixels around the blob
+
+        # Foreground model selected in config
+        self.foreground = create_detector(visual_config)
+
+        # ROI tracking state (pixel centroid, velocity in px/frame)
+        self.background = None
+        self.last_centroid = None
+        self.velocity = np.zeros(2)
+        self.roi_misses = 0
+        self.roi = None
+        # Pixel position predicted by the tracker's filter for the next frame, if any
+        self.predicted_centroid = None
+
+    def detect(self, frame: np.ndarray) -> Optional[Detection]:
+        """
+        Detect the target, searching a window around its predicted position.
+
+        Falls back to full-frame foreground detection when no target is
+        locked or it has been missed for more than roi_max_misses frames.
+        """
+        # Convert to grayscale if needed
+        if len(frame.shape) == 3:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = frame
+
+        window_ready = self.background is not None or not self.foreground.uses_background
+        if self.roi_enabled and self.last_centroid is not None and window_ready:
+            result = self.detect_roi(gray)
+            if result is not None:
+                self._update_target(result[0], result[1])
+                return result
+
+            self.roi_misses += 1
+            if self.roi_misses <= self.roi_max_misses:
+                # Coast on the prediction for a few frames before giving up the lock
+                self.last_centroid = self.predict_target()
+                return None
+            self.logger.debug("Target lost, reacquiring over full frame")
+            self.last_centroid = None
+            self.roi = None
+            # Reseed the window background from the full-frame model on the next lock
+            self.background = None
+
+        if self.pyramid_levels:
+            result = self.detect_pyramid(gray)
+        else:
+            result = self.detect_full_frame(gray)
+        if result is not None:
+            self._update_target(result[0], result[1])
+            if self.roi_enabled and self.background is None and self.foreground.uses_background:
+                self._seed_background(gray.shape)
+        return result
+
+    def detect_full_frame(self, gray: np.ndarray) -> Optional[Detection]:
+        """Process the whole frame with the foreground detector"""
+        # Apply background subtraction
+        fg_mask = self.foreground.apply(gray)
+
+        # Reduced blur for finer detail
+        fg_mask = cv2.medianBlur(fg_mask, 3)  # Was 5
+
+        # Find contours of moving objects
+        contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        if contours:
+            # Find largest contour
+            largest_contour = max(contours, key=cv2.contourArea)
+            area = cv2.contourArea(largest_contour)
+
+            # Lower area threshold for smaller movements
+            if area > self.min_contour_area:
+                # Sub-pixel centroid from the contour moments
+                M = cv2.moments(largest_contour)
+                if M["m00"] > 0:
+                    cx = M["m10"] / M["m00"]
+                    cy = M["m01"] / M["m00"]
+                    return cx, cy, fg_mask
+
+        return None
+
+    def detect_pyramid(self, gray: np.ndarray) -> Optional[Detection]:
+        """Coarse detection on a downscaled image, refined at full resolution"""
+        scale = self.pyramid_scale
+        small = gray
+        for _ in range(self.pyramid_levels):
+            small = cv2.pyrDown(small)
+
+        fg_mask = self.foreground.apply(small)
+        fg_mask = cv2.medianBlur(fg_mask, 3)
+        contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return None
+
+        largest_contour = max(contours, key=cv2.contourArea)
+        # Area shrinks with the square of the scale
+        if cv2.contourArea(largest_contour) <= self.min_contour_area / (scale * scale):
+            return None
+
+        # Coarse bounding box plus margin, mapped to full resolution
+        x, y, w, h = cv2.boundingRect(largest_contour)
+        m = self.refine_margin
+        sx0, sy0 = max(0, x - m), max(0, y - m)
+        sx1, sy1 = min(small.shape[1], x + w + m), min(small.shape[0], y + h + m)
+        x0, y0 = sx0 * scale, sy0 * scale
+        x1, y1 = min(gray.shape[1], sx1 * scale), min(gray.shape[0], sy1 * scale)
+
+        patch = gray[y0:y1, x0:x1]
+        mask = cv2.resize(fg_mask[sy0:sy1, sx0:sx1], (x1 - x0, y1 - y0), interpolation=cv2.INTER_NEAREST)
+        centroid = self.refine_centroid(patch, mask)
+        if centroid is None:
+            return None
+        return x0 + centroid[0], y0 + centroid[1], fg_mask
+
+    def refine_centroid(self, patch: np.ndarray, mask: np.ndarray) -> Optional[Tuple[float, float]]:
+        """Sub-pixel centroid of a full-resolution patch, weighted by intensity inside the mask"""
+        weights = cv2.bitwise_and(patch, patch, mask=mask)
+        M = cv2.moments(weights)
+        if M["m00"] <= 0:
+            # Dark target: fall back to the plain mask
+            M = cv2.moments(mask, binaryImage=True)
+            if M["m00"] <= 0:
+                return None
+        return M["m10"] / M["m00"], M["m01"] / M["m00"]
+
+    def detect_roi(self, gray: np.ndarray) -> Optional[Detection]:
+        """Difference against the background model inside the search window only"""
+        height, width = gray.shape[:2]
+        cx, cy = self.predict_target()
+
+        # Grow the window with the target's speed so fast motion stays inside it
+        half = self.roi_size // 2 + int(np.abs(self.velocity).max())
+        x0, x1 = max(0, int(cx) - half), min(width, int(cx) + half)
+        y0, y1 = max(0, int(cy) - half), min(height, int(cy) + half)
+        if x1 - x0 < 3 or y1 - y0 < 3:
+            return None
+        self.roi = (x0, y0, x1, y1)
+
+        patch = gray[y0:y1, x0:x1]
+        if self.foreground.uses_background:
+            background = self.background[y0:y1, x0:x1]
+            diff = cv2.absdiff(patch, cv2.convertScaleAbs(background))
+            _, fg_mask = cv2.threshold(diff, self.roi_diff_threshold, 255, cv2.THRESH_BINARY)
+            fg_mask = cv2.medianBlur(fg_mask, 3)
+
+            # Update the background where nothing is moving (in place on the full-frame model)
+            still = fg_mask == 0
+            background[still] += self.learning_rate * (patch[still] - background[still])
+        else:
+            # Stateless detectors work on the window as they would on the full frame
+            fg_mask = cv2.medianBlur(self.foreground.apply(patch), 3)
+
+        contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return None
+
+        largest_contour = max(contours, key=cv2.contourArea)
+        if cv2.contourArea(largest_contour) <= self.min_contour_area:
+            return None
+
+        M = cv2.moments(largest_contour)
+        if M["m00"] <= 0:
+            return None
+        return x0 + M["m10"] / M["m00"], y0 + M["m01"] / M["m00"], fg_mask
+
+    def predict_target(self) -> np.ndarray:
+        """Predicted pixel position of the target in the next frame"""
+        if self.predicted_centroid is not None:
+            return np.asarray(self.predicted_centroid, dtype=np.float64)
+        return self.last_centroid + self.velocity
+
+    def _update_target(self, cx: float, cy: float) -> None:
+        """Update centroid and velocity after a detection"""
+        centroid = np.array([cx, cy], dtype=np.float64)
+        if self.last_centroid is not None and self.roi_misses == 0:
+            # Light smoothing keeps one noisy centroid from throwing the window off
+            self.velocity = 0.5 * self.velocity + 0.5 * (centroid - self.last_centroid)
+        else:
+            self.velocity = np.zeros(2)
+        self.last_centroid = centroid
+        self.roi_misses = 0
+
+    def _seed_background(self, shape: Tuple[int, ...]) -> None:
+        """Take the ROI background model from the full-frame detector's background"""
+        background = self.foreground.background_image()
+        if background is None:
+            return
+        if background.ndim == 3:
+            background = cv2.cvtColor(background, cv2.COLOR_BGR2GRAY)
+        if background.shape[:2] != shape[:2]:
+            # Pyramid mode models the downscaled image
+            background = cv2.resize(background, (shape[1], shape[0]), interpolation=cv2.INTER_LINEAR)
+        self.background = background.astype(np.float32)
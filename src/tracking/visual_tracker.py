@@ -4,10 +4,17 @@ import logging
 from utils.misc_funcs import num_to_range
 from hardware.motion.dyna_controller import DynaController
 from hardware.camera.camera_manager import CameraManager
+from hardware.camera.video_capture import is_video_source
 from multiprocessing import Queue
 import time
 import queue
+import threading
+from collections import deque
 from utils.perf_timings import perf_counter_ns
+from utils.latest_value import LatestValue
+from tracking.target_detector import TargetDetector
+from tracking.intrinsics import PixelAngleMapper
+from tracking.kalman_filter import AdaptiveKalmanFilter
 
 class VisualTracker:
     def __init__(self, data_queue: Queue, config: dict):
@@ -17,12 +24,19 @@ class VisualTracker:
         # Get tracking parameters from config
         visual_config = config["tracking"]["visual_tracking"]
         self.min_contour_area = visual_config["min_contour_area"]
+        self.pipelined = visual_config.get("pipelined", True)
         
         self.logger.info("Initializing visual tracking...")
         
-        # Initialize camera
-        self.camera = CameraManager()
-        if not self.camera.connect_camera(config["devices"]["cameras"]["tracking"]):
+        # Initialize camera (a video file / image sequence stands in on machines without one)
+        source = config["devices"]["cameras"]["tracking"]
+        if is_video_source(source):
+            self.camera = CameraManager(source)
+            connected = self.camera.cap is not None
+        else:
+            self.camera = CameraManager()
+            connected = self.camera.connect_camera(source)
+        if not connected:
             raise RuntimeError("Failed to connect to tracking camera")
         self.logger.info("Connected to tracking camera")
         
@@ -38,24 +52,44 @@ class VisualTracker:
         
         self.setup_motors()
         
-        # Initialize background subtractor
-        self.bg_subtractor = cv2.createBackgroundSubtractorMOG2(
-            history=20,          # Shorter history for faster adaptation (was 50)
-            varThreshold=8,     # Lower threshold for higher sensitivity (was 16)
-            detectShadows=False  # Keep disabled for speed
-        )
+        # Initialize target detection (background subtraction, search window, pyramid)
+        self.detector = TargetDetector(visual_config)
+
+        # Pixel -> angle lookup from the camera intrinsics, built for the first frame size
+        self.config = config
+        self.angle_mapper = None
+
+        # Angular Kalman filter: smooths detections, predicts through misses and latency
+        kalman_config = visual_config.get("kalman", {})
+        self.use_kalman = config["tracking"].get("use_kalman", True)
+        self.kalman = AdaptiveKalmanFilter(mode='angular') if self.use_kalman else None
+        if self.kalman is not None:
+            self.kalman.R = np.eye(2) * kalman_config.get("measurement_noise", 2.5e-3)  # deg^2
+        self.latency = kalman_config.get("latency_ms", 8.0) / 1000  # Frame to motor delay (s)
+        self.max_coast = kalman_config.get("max_coast_ms", 250.0) / 1000  # Prediction without detections (s)
+        self.actuation_period = 1.0 / kalman_config.get("actuation_rate_hz", 200.0)
+        self.kalman_time = None  # Frame time (s) of the current filter state
+        self.last_detection_time = None
         
         self.start_time = time.perf_counter()
         self.counter = 0
         
         # Add performance tracking
+        # Stage timings (ms) of the most recent frames; bounded for long sessions
         self.perf_stats = {
-            'frame_read': [],
-            'processing': [],
-            'motor_control': [],
-            'total_loop': []
+            'frame_read': deque(maxlen=10000),
+            'processing': deque(maxlen=10000),
+            'motor_control': deque(maxlen=10000),
+            'total_loop': deque(maxlen=10000)
         }
 
+        # Pipeline stages are connected by latest-value slots: processing always
+        # takes the newest frame and actuation the newest command
+        self.frame_slot = LatestValue()
+        self.command_slot = LatestValue()
+        self.last_centroid = (0, 0)
+        self.stage_counts = {'acquire': 0, 'process': 0, 'actuate': 0, 'stale': 0}
+
     def setup_motors(self):
         """Initialize motor settings"""
         self.dyna.set_gains(1, 2432, 720, 3200, 0)
@@ -79,46 +113,132 @@ class VisualTracker:
             self.logger.warning(f"Could not set some camera parameters: {e}")
 
     def process_frame(self, frame):
-        """Process frame using MOG2 background subtraction"""
-        # Convert to grayscale if needed
-        if len(frame.shape) == 3:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = frame
-        
-        # Apply background subtraction
-        fg_mask = self.bg_subtractor.apply(gray)
-        
-        # Reduced blur for finer detail
-        fg_mask = cv2.medianBlur(fg_mask, 3)  # Was 5
-        
-        # Find contours of moving objects
-        contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        """Detect the target; returns (cx, cy, mask) or None"""
+        return self.detector.detect(frame)
+
+    def compute_angles(self, cx: float, cy: float, width: int, height: int):
+        """
+        Convert a pixel centroid to safe Dynamixel pan/tilt angles.
+
+        Returns:
+            (pan_angle, tilt_angle), or None if the offset is too small to act on
+        """
+        # Calculate raw angles (undistorted, from the lookup table)
+        pan_angle, tilt_angle = self.camera_angles(cx, cy, width, height)
+        return self.to_motor_angles(pan_angle, tilt_angle)
+
+    def camera_angles(self, cx: float, cy: float, width: int, height: int):
+        """Camera-relative pan/tilt angles (degrees) of a pixel centroid"""
+        mapper = self.angle_mapper
+        if mapper is None or (mapper.width, mapper.height) != (width, height):
+            mapper = self.angle_mapper = PixelAngleMapper.from_config(self.config, width, height)
+        return mapper.angles(cx, cy)
+
+    def to_motor_angles(self, pan_angle: float, tilt_angle: float):
+        """
+        Map camera-relative angles to safe Dynamixel angles.
+
+        Returns:
+            (pan_angle, tilt_angle), or None if the offset is too small to act on
+        """
+        # Only move if change is significant and limit both angles to safe range
+        if abs(pan_angle) <= 0.1 and abs(tilt_angle) <= 0.1:
+            return None
+
+        # Map both angles to the same safe range (20.5 to 65.5)
+        pan_angle = round(num_to_range(pan_angle, -45, 45, 20.5, 65.5), 2)
+        tilt_angle = round(num_to_range(tilt_angle, -45, 45, 20.5, 65.5), 2) + 3
         
-        if contours:
-            # Find largest contour
-            largest_contour = max(contours, key=cv2.contourArea)
-            area = cv2.contourArea(largest_contour)
-            
-            # Lower area threshold for smaller movements
-            if area > 100:  # Was 500
-                # Get centroid
-                M = cv2.moments(largest_contour)
-                if M["m00"] > 0:
-                    cx = int(M["m10"] / M["m00"])
-                    cy = int(M["m01"] / M["m00"])
-                    return cx, cy, fg_mask
+        # Additional safety clamp
+        pan_angle = max(20.5, min(65.5, pan_angle))
+        tilt_angle = max(20.5, min(65.5, tilt_angle))
+        return pan_angle, tilt_angle
+
+    def update_filter(self, detection, width: int, height: int, frame_time: float):
+        """
+        Advance the angular filter to a frame and fold in its detection, if any.
+
+        Args:
+            detection: (cx, cy, mask) or None if the target was not found
+            frame_time: Frame timestamp in seconds (perf_counter clock)
+
+        Returns:
+            (state snapshot, frame time) while the target is tracked, else None
+        """
+        kalman = self.kalman
+        measurement = None
+        if detection is not None:
+            measurement = np.array(self.camera_angles(detection[0], detection[1], width, height)).reshape(2, 1)
+
+        if self.kalman_time is None:
+            if measurement is None:
+                return None
+            # (Re)initialise on the first detection, at rest
+            kalman.state_estimate = np.zeros((kalman.dim_x, 1))
+            kalman.state_estimate[:2] = measurement
+            kalman.estimate_covariance = np.eye(kalman.dim_x) * 1e-3
+            kalman.Q = kalman.Q0.copy()
+            self.kalman_time = self.last_detection_time = frame_time
+            return kalman.state_estimate.copy(), frame_time
+
+        delta_t = frame_time - self.kalman_time
+        if delta_t > 0:
+            kalman.update_F(delta_t)
+            kalman.predict()
+            self.kalman_time = frame_time
+
+        if measurement is not None:
+            kalman.update(measurement)
+            kalman.adapt_Q(measurement)
+            self.last_detection_time = frame_time
+        elif frame_time - self.last_detection_time > self.max_coast:
+            self.logger.debug("Target lost, stopping prediction")
+            self.kalman_time = None
+            self.detector.predicted_centroid = None
+            return None
+
+        # Point the detector's search window at where the target will be next frame
+        if delta_t > 0:
+            pan, tilt = kalman.predict_ahead(delta_t)[:2].flatten()
+            self.detector.predicted_centroid = self.angle_mapper.pixel(pan, tilt)
+
+        return kalman.state_estimate.copy(), frame_time
+
+    def command_angles(self, state: np.ndarray, age: float):
+        """Motor angles for a filter state extrapolated by its age plus the system latency"""
+        pan, tilt = self.kalman.predict_ahead(age + self.latency, state)[:2].flatten()
+        return self.to_motor_angles(pan, tilt)
+
+    def actuate(self, cx: int, cy: int, pan_angle: float, tilt_angle: float) -> None:
+        """Command the motors, read back the encoders and queue the data point"""
+        t0 = perf_counter_ns()
+        self.dyna.set_sync_pos(pan_angle, tilt_angle)
+        encoder_pan, encoder_tilt = self.dyna.get_sync_pos()
+        t1 = perf_counter_ns()
+        self.perf_stats['motor_control'].append((t1 - t0) * 1e-6)
         
-        return None
+        # Put data in queue
+        try:
+            data = (
+                np.array([cx, cy, 0]),
+                pan_angle,
+                tilt_angle,
+                round(encoder_pan, 2),
+                round(encoder_tilt, 2),
+                time.perf_counter_ns() * 1e-6
+            )
+            self.data_queue.put_nowait(data)
+        except queue.Full:
+            self.logger.debug("Data queue is full")
 
     def track(self):
-        """Main tracking loop"""
+        """Main tracking loop (serial: read, process and actuate in turn)"""
         loop_start = perf_counter_ns()
         self.counter += 1
         
         # Time frame capture
         t0 = perf_counter_ns()
-        ret, frame = self.camera.cap.read()
+        ret, frame = self.camera.read_frame()
         t1 = perf_counter_ns()
         frame_time = (t1 - t0) * 1e-6
         self.perf_stats['frame_read'].append(frame_time)
@@ -134,65 +254,163 @@ class VisualTracker:
         process_time = (t1 - t0) * 1e-6
         self.perf_stats['processing'].append(process_time)
         
-        if result:
+        height, width = frame.shape[:2]
+        if self.use_kalman:
+            # Filter runs on every frame so the head keeps moving through missed detections
+            frame_time = self.camera.last_frame_time_ms / 1000
+            snapshot = self.update_filter(result, width, height, frame_time)
+            if snapshot is not None:
+                if result:
+                    self.last_centroid = result[:2]
+                angles = self.command_angles(snapshot[0], perf_counter_ns() * 1e-9 - frame_time)
+                if angles is not None:
+                    self.actuate(*self.last_centroid, *angles)
+        elif result:
             cx, cy, mask = result
             # Calculate angles and update motors
-            height, width = frame.shape[:2]
-            fx, fy = 800, 800
-            center_x, center_y = width // 2, height // 2
-            
-            # Calculate raw angles
-            pan_angle = np.degrees(np.arctan((cx - center_x) / fx))
-            tilt_angle = -np.degrees(np.arctan((cy - center_y) / fy))
-            
-            # Only move if change is significant and limit both angles to safe range
-            if abs(pan_angle) > 0.1 or abs(tilt_angle) > 0.1:
-                # Map both angles to the same safe range (20.5 to 65.5)
-                pan_angle = round(num_to_range(pan_angle, -45, 45, 20.5, 65.5), 2)
-                tilt_angle = round(num_to_range(tilt_angle, -45, 45, 20.5, 65.5), 2) + 3
-                
-                # Additional safety clamp
-                pan_angle = max(20.5, min(65.5, pan_angle))
-                tilt_angle = max(20.5, min(65.5, tilt_angle))
-                
-                # Time motor control
-                t0 = perf_counter_ns()
-                self.dyna.set_sync_pos(pan_angle, tilt_angle)
-                encoder_pan, encoder_tilt = self.dyna.get_sync_pos()
-                t1 = perf_counter_ns()
-                motor_time = (t1 - t0) * 1e-6
-                self.perf_stats['motor_control'].append(motor_time)
-                
-                # Put data in queue
-                try:
-                    data = (
-                        np.array([cx, cy, 0]),
-                        pan_angle,
-                        tilt_angle,
-                        round(encoder_pan, 2),
-                        round(encoder_tilt, 2),
-                        time.perf_counter_ns() * 1e-6
-                    )
-                    self.data_queue.put_nowait(data)
-                except queue.Full:
-                    self.logger.debug("Data queue is full")
+            angles = self.compute_angles(cx, cy, width, height)
+            if angles is not None:
+                self.actuate(cx, cy, *angles)
         
         # Calculate total loop time
         loop_end = perf_counter_ns()
         total_time = (loop_end - loop_start) * 1e-6
         self.perf_stats['total_loop'].append(total_time)
 
+    def run(self, terminate_event: threading.Event) -> None:
+        """
+        Track until terminate_event is set.
+
+        In pipelined mode acquisition, processing and actuation run in their own
+        threads, so the servo round trip no longer limits the frame rate.
+        """
+        if not self.pipelined:
+            while not terminate_event.is_set():
+                self.track()
+            return
+
+        stages = [
+            threading.Thread(target=self._acquire_loop, args=(terminate_event,), name="acquire", daemon=True),
+            threading.Thread(target=self._process_loop, args=(terminate_event,), name="process", daemon=True),
+            threading.Thread(target=self._actuate_loop, args=(terminate_event,), name="actuate", daemon=True),
+        ]
+        for stage in stages:
+            stage.start()
+
+        terminate_event.wait()
+        self.frame_slot.close()
+        self.command_slot.close()
+        for stage in stages:
+            stage.join(timeout=1.0)
+
+    def _acquire_loop(self, terminate_event: threading.Event) -> None:
+        """Acquisition stage: read frames into the camera ring as fast as they arrive"""
+        while not terminate_event.is_set():
+            t0 = perf_counter_ns()
+            ret, seq, _ = self.camera.grab_frame()
+            t1 = perf_counter_ns()
+            if not ret:
+                self.logger.error("Failed to grab frame")
+                continue
+            self.perf_stats['frame_read'].append((t1 - t0) * 1e-6)
+            self.stage_counts['acquire'] += 1
+            # Only the sequence number is passed on; the frame stays in the ring
+            self.frame_slot.put((seq, t0, self.camera.last_frame_time_ms / 1000))
+
+    def _process_loop(self, terminate_event: threading.Event) -> None:
+        """Processing stage: detect the target in the newest frame"""
+        while not terminate_event.is_set():
+            item = self.frame_slot.get(timeout=0.1)
+            if item is None:
+                continue
+            seq, read_start, frame_time = item[1]
+            frame = self.camera.frame_ring.get(seq)
+            if frame is None:
+                self.stage_counts['stale'] += 1
+                continue
+
+            t0 = perf_counter_ns()
+            result = self.process_frame(frame)
+            height, width = frame.shape[:2]
+            t1 = perf_counter_ns()
+            self.perf_stats['processing'].append((t1 - t0) * 1e-6)
+            self.stage_counts['process'] += 1
+            self.counter += 1
+
+            # The ring slot may have been reused while it was being processed
+            if not self.camera.frame_ring.is_valid(seq):
+                self.stage_counts['stale'] += 1
+                continue
+
+            if self.use_kalman:
+                # Publish the filter state; the actuation stage extrapolates it
+                snapshot = self.update_filter(result, width, height, frame_time)
+                if result:
+                    self.last_centroid = result[:2]
+                if snapshot is not None:
+                    self.command_slot.put((*self.last_centroid, *snapshot, read_start))
+            elif result:
+                cx, cy, _ = result
+                angles = self.compute_angles(cx, cy, width, height)
+                if angles is not None:
+                    self.command_slot.put((cx, cy, *angles, read_start))
+
+    def _actuate_loop(self, terminate_event: threading.Event) -> None:
+        """
+        Actuation stage: send the newest command to the motors.
+
+        With the Kalman filter the latest state is re-extrapolated every
+        actuation period, so the head moves smoothly between processed frames
+        and keeps going through missed detections for up to max_coast.
+        """
+        snapshot = None
+        while not terminate_event.is_set():
+            item = self.command_slot.get(timeout=self.actuation_period if snapshot else 0.1)
+            fresh = item is not None
+            if fresh:
+                snapshot = item[1]
+            if snapshot is None:
+                continue
+
+            if self.use_kalman:
+                cx, cy, state, frame_time, read_start = snapshot
+                age = perf_counter_ns() * 1e-9 - frame_time
+                if age > self.max_coast:
+                    snapshot = None
+                    continue
+                angles = self.command_angles(state, age)
+            else:
+                cx, cy, pan_angle, tilt_angle, read_start = snapshot
+                angles = (pan_angle, tilt_angle)
+                # Raw detections are acted on once
+                snapshot = None
+
+            if angles is None:
+                continue
+            self.actuate(cx, cy, *angles)
+            self.stage_counts['actuate'] += 1
+            if fresh:
+                # Frame-to-command latency through the whole pipeline
+                self.perf_stats['total_loop'].append((perf_counter_ns() - read_start) * 1e-6)
+
     def shutdown(self):
         """Clean up resources"""
         end_time = time.perf_counter()
         freq = self.counter / (end_time - self.start_time)
         self.logger.info(f"Visual tracking frequency: {freq:.2f} Hz")
+        if self.pipelined:
+            self.logger.info(
+                f"Pipeline counts - acquired: {self.stage_counts['acquire']}, "
+                f"processed: {self.stage_counts['process']}, actuated: {self.stage_counts['actuate']}, "
+                f"stale: {self.stage_counts['stale']}, frames skipped: {self.frame_slot.overwritten}, "
+                f"commands superseded: {self.command_slot.overwritten}"
+            )
         
         # Log performance statistics
         for key, times in self.perf_stats.items():
             if times:
                 avg_time = sum(times) / len(times)
-                self.logger.info(f"Average {key} time: {avg_time:.2f} ms")
+                self.logger.info(f"Average {key} time (last {len(times)}): {avg_time:.2f} ms")
         
         if self.dyna:
             self.dyna.close_port()
@@ -0,0 +1,88 @@
+import logging
+import time
+import cv2
+import numpy as np
+from threading import Thread
+from typing import Optional, Tuple
+from PIL import Image
+from utils.latest_value import LatestValue
+
+
+class DisplayWorker:
+    """
+    Prepares live preview images off the Tk thread.
+
+    The newest camera frame is downscaled first, then processed (overlays,
+    circle detection) and colour-converted at display size, and published as
+    a PIL image. The Tk thread only swaps it into the preview CTkImage.
+
+    Args:
+        camera_manager: Source of frames (ring buffer)
+        image_processor: Optional ImageProcessor applied at display size
+        scale: Display size relative to the camera frame
+        max_fps: Upper bound on preview rate
+    """
+    def __init__(self, camera_manager, image_processor=None, scale: float = 2 / 3, max_fps: float = 30.0):
+        self.logger = logging.getLogger("DisplayWorker")
+        self.camera_manager = camera_manager
+        self.image_processor = image_processor
+        self.scale = scale
+        self.period = 1.0 / max_fps
+        self.output = LatestValue()
+        self._running = False
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+    def get_image(self) -> Optional[Image.Image]:
+        """Newest prepared image not yet taken, without waiting"""
+        item = self.output.get(timeout=0)
+        return None if item is None else item[1]
+
+    def _run(self) -> None:
+        last_seq = None
+        while self._running:
+            start = time.perf_counter()
+            seq, frame = self.camera_manager.get_latest_frame()
+            if frame is not None and seq != last_seq:
+                image = self.prepare(frame)
+                # Drop the image if the ring slot was reused while it was being read
+                if image is not None and self.camera_manager.frame_ring.is_valid(seq):
+                    last_seq = seq
+                    self.output.put(image)
+
+            # Never prepare more images than the preview can show
+            remaining = self.period - (time.perf_counter() - start)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def display_size(self, frame: np.ndarray) -> Tuple[int, int]:
+        height, width = frame.shape[:2]
+        return max(1, int(width * self.scale)), max(1, int(height * self.scale))
+
+    def prepare(self, frame: np.ndarray) -> Optional[Image.Image]:
+        """Downscale, process and convert one frame for display"""
+        try:
+            # Resize first so every later step works on the small image (and never on the ring buffer)
+            small = cv2.resize(frame, self.display_size(frame), interpolation=cv2.INTER_LINEAR)
+
+            if self.image_processor is not None:
+                small = self.image_processor.process_frame(small)
+
+            if small.ndim == 3:
+                small = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+            return Image.fromarray(small)
+        except Exception as e:
+            self.logger.error(f"Error preparing preview frame: {e}")
+            return None
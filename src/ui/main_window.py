@@ -1,10 +1,8 @@
 from ui.views.track_view import TrackView
-from ui.views.dashboard_view import DashboardView
 from ui.components.navbar import Navbar
 from ui.components.status_bar import StatusBar
 from ui.components.menu_bar import MenuBar
 from hardware.motion.theia_controller import TheiaController
-from ui.views.theia_control_window import TheiaLensControlWindow
 import logging
 from CTkMessagebox import CTkMessagebox
 
@@ -57,6 +55,8 @@ class MainWindow:
             if view_name == "track":
                 self.views[view_name] = TrackView(self.window, self.dart)
             elif view_name == "data":
+                # Dashboard pulls in matplotlib, so only import it on first use
+                from ui.views.dashboard_view import DashboardView
                 self.views[view_name] = DashboardView(self.window, self.dart)
 
     def switch_view(self, view_name: str):
@@ -118,6 +118,7 @@ class MainWindow:
 
         # Create new window
         try:
+            from ui.views.theia_control_window import TheiaLensControlWindow
             self.theia_window = TheiaLensControlWindow(self.window, self.dart)
             self.theia_window.protocol("WM_DELETE_WINDOW", self.on_theia_window_close)
             self.theia_window.grab_set()
@@ -46,6 +46,11 @@ class UIController:
         if self.dart.state.ui.age_label:
             self.dart.state.ui.age_label.configure(text=f"Calibration age: {age} h")
             
+    def update_calibration_button(self, text: str) -> None:
+        """Update the calibrate button text"""
+        if self.dart.state.ui.calibration_button:
+            self.dart.state.ui.calibration_button.configure(text=text)
+
     def update_track_button(self, text: str, icon: Any) -> None:
         """Update the track button text and icon"""
         if self.dart.state.ui.track_button:
@@ -3,6 +3,7 @@ import customtkinter as ctk
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
+from data.session_catalog import SessionCatalog
 
 GLOBAL_FONT = ("default_theme", 14)
 BG_COLOR = "#151518"        # Darker background for main view
@@ -22,6 +23,7 @@ class DashboardView(BaseView):
         
         self.setup_video_preview()
         self.setup_plots()
+        self.setup_session_selector()
     
     def setup_video_preview(self):
         """Set up video preview"""
@@ -90,6 +92,7 @@ class DashboardView(BaseView):
         canvas = FigureCanvasTkAgg(fig, parent)
         canvas.get_tk_widget().configure(bg="#09090b")
         canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.trajectory_ax, self.trajectory_canvas = ax, canvas
 
     def setup_angle_plot(self, parent, data):
         """Set up angle plot"""
@@ -101,6 +104,75 @@ class DashboardView(BaseView):
         canvas = FigureCanvasTkAgg(fig, parent)
         canvas.get_tk_widget().configure(bg="#09090b")
         canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.angle_ax, self.angle_canvas = ax, canvas
+
+    def setup_session_selector(self):
+        """Recording picker filled from the session catalogue"""
+        self.session_frame = ctk.CTkFrame(self)
+        self.session_frame.configure(fg_color=FRAME_COLOR)
+        self.session_frame.grid(row=1, column=2, sticky="nsew", padx=5, pady=5)
+
+        # Only the catalogue is read here; no directory scan or video probing
+        catalog = SessionCatalog(self.dart.state.recording.video_path)
+        self.sessions = {
+            self.session_label(session): session
+            for session in catalog.list_sessions(require_data=True)
+        }
+        labels = list(self.sessions) or ["No recordings"]
+
+        self.session_menu = ctk.CTkOptionMenu(
+            self.session_frame,
+            values=labels,
+            command=self.load_session,
+            font=GLOBAL_FONT
+        )
+        self.session_menu.pack(side="left", padx=10, pady=10)
+        self.session_info = ctk.CTkLabel(self.session_frame, text="", font=GLOBAL_FONT)
+        self.session_info.pack(side="left", padx=10, pady=10)
+
+        if self.sessions:
+            self.load_session(labels[0])
+
+    @staticmethod
+    def session_label(session):
+        return f"{(session['started_at'] or session['session'])[:19].replace('T', ' ')}"
+
+    def load_session(self, label):
+        """Plot the trajectory and angles of a catalogued recording"""
+        session = self.sessions.get(label)
+        if session is None:
+            return
+        import pandas as pd
+        from data.data_handler import target_positions
+
+        try:
+            df = pd.read_parquet(session['data'])
+        except Exception as e:
+            self.session_info.configure(text=f"Could not read {session['data'].name}")
+            self.dart.logger.error(f"Error loading session {session['session']}: {e}")
+            return
+
+        positions = target_positions(df)
+        time_s = df['time_stamp_ms'].to_numpy() / 1000
+        time_s = time_s - time_s[0] if len(time_s) else time_s
+
+        self.trajectory_ax.clear()
+        self.trajectory_ax.plot(positions[:, 0], positions[:, 1])
+        self.trajectory_ax.set_facecolor("#09090b")
+        self.trajectory_canvas.draw_idle()
+
+        self.angle_ax.clear()
+        for column in ('desired_pan', 'desired_tilt', 'encoder_pan', 'encoder_tilt'):
+            self.angle_ax.plot(time_s, df[column].to_numpy(), label=column)
+        self.angle_ax.legend(loc="upper right", fontsize="small")
+        self.angle_ax.set_facecolor("#09090b")
+        self.angle_canvas.draw_idle()
+
+        details = [f"{session['duration_s']:.1f} s" if session['duration_s'] else None,
+                   f"{session['fps']:.1f} FPS" if session['fps'] else None,
+                   f"{session['samples']} samples" if session['samples'] else None,
+                   f"sync {session['mean_sync_error_ms']:.2f} ms" if session['mean_sync_error_ms'] is not None else None]
+        self.session_info.configure(text=", ".join(d for d in details if d))
 
     def cleanup(self):
         """Cleanup matplotlib resources"""
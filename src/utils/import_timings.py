@@ -0,0 +1,128 @@
+"""
+Start-up import budget check based on ``python -X importtime``.
+
+Each entry point is imported in a fresh interpreter and the cumulative import
+time of every top-level module is parsed from stderr. The run fails if an
+entry point exceeds its time budget or pulls in a module it should defer.
+
+Usage (from the repository root):
+    python src/utils/import_timings.py [--repeat 3] [--top 10]
+"""
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+
+# Modules that must stay out of each entry point until the feature needing
+# them is used
+GUI_ONLY = ["customtkinter", "tkinter", "CTkMessagebox", "CTkMenuBar", "PIL"]
+DEFERRED = ["matplotlib", "pandas", "pyarrow", "vidgear", "qtm", "PySpin", "EasyPySpin"]
+
+# Entry point -> (cumulative budget in ms, modules that must not be imported)
+BUDGETS: Dict[str, Tuple[float, List[str]]] = {
+    # Tracking process: control path only
+    "tracking.dart_track": (400.0, GUI_ONLY + DEFERRED + ["cv2"]),
+    # GUI process up to the first window
+    "app": (1500.0, DEFERRED),
+}
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_imports(module: str) -> Dict[str, int]:
+    """
+    Import a module in a fresh interpreter and parse ``-X importtime`` output.
+
+    Args:
+        module: Dotted module name, importable with ``src`` on the path
+
+    Returns:
+        Mapping of top-level imported module -> cumulative import time in us
+    """
+    code = f"import sys; sys.path.insert(0, {str(SRC_DIR)!r}); import {module}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=SRC_DIR.parent,
+    )
+    if result.returncode != 0:
+        last_line = result.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        raise RuntimeError(f"Importing {module} failed: {last_line[0]}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        # Nested imports are indented by two spaces per level
+        if len(indent) <= 1:
+            timings[name] = int(cumulative)
+    return timings
+
+
+def check_entry_point(module: str, budget_ms: float, forbidden: List[str],
+                      repeat: int = 3, top: int = 10) -> bool:
+    """Report import cost for one entry point and check it against its budget."""
+    runs = [measure_imports(module) for _ in range(repeat)]
+    # Best of N removes most of the disk cache / scheduler noise
+    best = min(runs, key=lambda timings: timings.get(module, 0))
+    total_ms = best.get(module, 0) / 1000
+
+    # Every module imported at any depth, to catch forbidden transitive imports
+    loaded = _loaded_modules(module)
+    violations = sorted(name for name in forbidden if name in loaded)
+
+    print(f"\n{module}: {total_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+    heaviest = sorted(best.items(), key=lambda item: item[1], reverse=True)
+    heaviest = [item for item in heaviest if item[0] != module]
+    for name, cumulative in heaviest[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    ok = True
+    if total_ms > budget_ms:
+        print(f"  FAIL: over budget by {total_ms - budget_ms:.1f} ms")
+        ok = False
+    if violations:
+        print(f"  FAIL: eagerly imports {', '.join(violations)}")
+        ok = False
+    return ok
+
+
+def _loaded_modules(module: str) -> set:
+    """Return the top-level names of all modules loaded by importing module."""
+    code = (
+        f"import sys; sys.path.insert(0, {str(SRC_DIR)!r}); import {module}; "
+        "print('\\n'.join(sorted({m.split('.')[0] for m in sys.modules})))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                            text=True, cwd=SRC_DIR.parent)
+    return set(result.stdout.split())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check DART start-up import budgets")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per entry point (best is kept)")
+    parser.add_argument("--top", type=int, default=10, help="number of heaviest imports to list")
+    parser.add_argument("modules", nargs="*", help="entry points to check (default: all)")
+    args = parser.parse_args()
+
+    modules = args.modules or list(BUDGETS)
+    ok = True
+    for module in modules:
+        budget_ms, forbidden = BUDGETS.get(module, (float("inf"), []))
+        try:
+            ok &= check_entry_point(module, budget_ms, forbidden, args.repeat, args.top)
+        except RuntimeError as e:
+            print(f"\n{module}: {e}")
+            ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
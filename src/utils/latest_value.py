@@ -0,0 +1,54 @@
+import threading
+from typing import Any, Optional, Tuple
+
+
+class LatestValue:
+    """
+    Single-slot buffer holding only the most recent value.
+
+    Producers never block: `put` overwrites whatever has not been consumed yet
+    (counted in `overwritten`). Consumers wait for a value newer than the last
+    one they took, so a slow stage always works on the freshest data instead
+    of a backlog.
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._value = None
+        self._version = 0
+        self._taken = 0
+        self._closed = False
+        self.overwritten = 0
+
+    def put(self, value: Any) -> None:
+        with self._cond:
+            if self._version > self._taken:
+                self.overwritten += 1
+            self._value = value
+            self._version += 1
+            self._cond.notify_all()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[int, Any]]:
+        """
+        Wait for a value that has not been taken yet.
+
+        Returns:
+            (version, value), or None on timeout or after close()
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._version > self._taken or self._closed, timeout):
+                return None
+            if self._closed and self._version <= self._taken:
+                return None
+            self._taken = self._version
+            return self._version, self._value
+
+    def peek(self) -> Tuple[int, Any]:
+        """Return the current (version, value) without consuming it."""
+        with self._cond:
+            return self._version, self._value
+
+    def close(self) -> None:
+        """Wake up all waiting consumers."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
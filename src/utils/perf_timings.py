@@ -1,7 +1,60 @@
+"""
+High-resolution performance counter and sleeper.
+
+PerfSleeper sleeps towards an absolute perf_counter_ns() deadline and keeps
+overshoot statistics, so fixed-rate loops can hold their period:
+    sleeper = PerfSleeper()
+    deadline = perf_counter_ns()
+    while running:
+        step()
+        deadline += period_ns
+        sleeper.sleep_until_ns(deadline)
+
+Microbenchmark of the achieved loop period (from the repository root):
+    python src/utils/perf_timings.py --hz 500 1000 --seconds 5
+"""
 import sys
+from collections import deque
 from time import sleep
 
+# Overshoot samples kept for the statistics
+_HISTORY = 10000
+
+
+class _OvershootStats:
+    """Overshoot bookkeeping shared by the platform sleepers"""
+    def _init_stats(self):
+        self.overshoots_ns = deque(maxlen=_HISTORY)
+        self.late = 0  # Deadlines already past when the sleep was requested
+
+    def stats(self):
+        """
+        Overshoot of the recent sleeps past their deadline, in microseconds.
+
+        :return: dict with count, late, mean_us, p50_us, p99_us and max_us.
+        """
+        samples = sorted(self.overshoots_ns)
+        if not samples:
+            return {"count": 0, "late": self.late}
+        count = len(samples)
+        return {
+            "count": count,
+            "late": self.late,
+            "mean_us": sum(samples) / count / 1000,
+            "p50_us": samples[count // 2] / 1000,
+            "p99_us": samples[min(count - 1, int(count * 0.99))] / 1000,
+            "max_us": samples[-1] / 1000,
+        }
+
+    def reset_stats(self):
+        self.overshoots_ns.clear()
+        self.late = 0
+
+
 if sys.platform != 'win32':
+    import ctypes
+    import ctypes.util
+    import errno
     from time import perf_counter
     try:
         from time import perf_counter_ns
@@ -11,18 +64,77 @@ if sys.platform != 'win32':
             Performance counter for benchmarking as nanoseconds.
             """
             return int(perf_counter() * 10**9)
-            
-    # Add a basic sleep implementation for non-Windows platforms
-    class PerfSleeper:
+
+    # Linux: perf_counter() reads CLOCK_MONOTONIC, so its values can be used
+    # directly as absolute clock_nanosleep() deadlines
+    CLOCK_MONOTONIC = 1
+    TIMER_ABSTIME = 1
+    PR_SET_TIMERSLACK = 29
+
+    class _Timespec(ctypes.Structure):
+        _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+    try:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        _clock_nanosleep = _libc.clock_nanosleep
+        _clock_nanosleep.argtypes = [ctypes.c_int, ctypes.c_int,
+                                     ctypes.POINTER(_Timespec), ctypes.POINTER(_Timespec)]
+    except (OSError, AttributeError):
+        # macOS has no clock_nanosleep: fall back to relative sleeps
+        _libc = None
+        _clock_nanosleep = None
+
+    class PerfSleeper(_OvershootStats):
+        """
+        Spin-then-sleep sleeper for Linux (relative sleeps elsewhere).
+
+        The thread sleeps with clock_nanosleep(TIMER_ABSTIME) until `spin_us`
+        before the deadline and busy-waits the rest, which absorbs the
+        scheduler wake-up latency. The timer slack of the calling thread is
+        reduced to 1 ns, so create the sleeper on the thread that uses it.
+
+        :param spin_us: Busy-wait window before each deadline in microseconds.
+        """
+        def __init__(self, spin_us=200):
+            self.spin_ns = int(spin_us * 1000)
+            self._deadline = _Timespec()
+            self._init_stats()
+            if sys.platform.startswith('linux') and _libc is not None:
+                # Default slack (50 us) lets the kernel coalesce our wake-ups
+                _libc.prctl(PR_SET_TIMERSLACK, ctypes.c_ulong(1), 0, 0, 0)
+
         def sleep_ms(self, ms_time):
-            sleep(ms_time / 1000.0)
-            
+            self.sleep_until_ns(perf_counter_ns() + int(ms_time * 1e6))
+
+        def sleep_until_ns(self, deadline_ns):
+            """Sleep until perf_counter_ns() reaches deadline_ns."""
+            now = perf_counter_ns()
+            if now >= deadline_ns:
+                self.late += 1
+                return
+
+            wake_ns = deadline_ns - self.spin_ns
+            if wake_ns > now:
+                if _clock_nanosleep is not None:
+                    self._deadline.tv_sec, self._deadline.tv_nsec = divmod(wake_ns, 10**9)
+                    # Absolute deadline: retrying after a signal does not drift
+                    while _clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME,
+                                           ctypes.byref(self._deadline), None) == errno.EINTR:
+                        pass
+                else:
+                    sleep((wake_ns - now) / 1e9)
+
+            now = perf_counter_ns()
+            while now < deadline_ns:
+                now = perf_counter_ns()
+            self.overshoots_ns.append(now - deadline_ns)
+
 else:
     import ctypes
     from ctypes.wintypes import LARGE_INTEGER
-    
+
     kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
-    
+
     # Constants
     INFINITE = 0xFFFFFFFF
     WAIT_FAILED = 0xFFFFFFFF
@@ -46,11 +158,12 @@ else:
             raise ctypes.WinError(ctypes.get_last_error())
         return count.value / _qpc_frequency
 
-    class PerfSleeper:
+    class PerfSleeper(_OvershootStats):
         def __init__(self):
             self.handle = kernel32.CreateWaitableTimerExW(
                 None, None, CREATE_WAITABLE_TIMER_HIGH_RESOLUTION, 0x1F0003
             )
+            self._init_stats()
 
         def sleep_ms(self, ms_time):
             _ = kernel32.SetWaitableTimer(
@@ -64,8 +177,78 @@ else:
             _ = kernel32.WaitForSingleObject(self.handle, INFINITE)
             kernel32.CancelWaitableTimer(self.handle)
 
+        def sleep_until_ns(self, deadline_ns):
+            """Sleep until perf_counter_ns() reaches deadline_ns."""
+            remaining_ns = deadline_ns - perf_counter_ns()
+            if remaining_ns <= 0:
+                self.late += 1
+                return
+            self.sleep_ms(remaining_ns / 1e6)
+            self.overshoots_ns.append(max(0, perf_counter_ns() - deadline_ns))
+
     # Initialize QPC frequency
     _qpc_frequency = LARGE_INTEGER()
     if not kernel32.QueryPerformanceFrequency(ctypes.byref(_qpc_frequency)):
         raise ctypes.WinError(ctypes.get_last_error())
-    _qpc_frequency = _qpc_frequency.value
\ No newline at end of file
+    _qpc_frequency = _qpc_frequency.value
+
+
+def benchmark(hz, seconds, sleeper=None):
+    """
+    Run an empty fixed-rate loop and measure how well it holds its period.
+
+    :param sleeper: PerfSleeper to use, or None for plain time.sleep().
+    :return: dict with the achieved rate, period jitter and overshoot in microseconds.
+    """
+    period_ns = int(1e9 / hz)
+    iterations = int(hz * seconds)
+    periods = []
+    overshoots = []
+
+    start = last = deadline = perf_counter_ns()
+    for _ in range(iterations):
+        deadline += period_ns
+        if sleeper is not None:
+            sleeper.sleep_until_ns(deadline)
+        else:
+            remaining = deadline - perf_counter_ns()
+            if remaining > 0:
+                sleep(remaining / 1e9)
+        now = perf_counter_ns()
+        periods.append(now - last)
+        overshoots.append(now - deadline)
+        last = now
+
+    periods.sort()
+    overshoots.sort()
+    return {
+        "rate_hz": iterations / ((last - start) / 1e9),
+        "period_p50_us": periods[len(periods) // 2] / 1000,
+        "period_p99_us": periods[int(len(periods) * 0.99)] / 1000,
+        "overshoot_mean_us": sum(overshoots) / len(overshoots) / 1000,
+        "overshoot_p99_us": overshoots[int(len(overshoots) * 0.99)] / 1000,
+        "overshoot_max_us": overshoots[-1] / 1000,
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fixed-rate loop benchmark of PerfSleeper vs time.sleep")
+    parser.add_argument("--hz", type=float, nargs="+", default=[500, 1000])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"{'loop':>18} {'rate Hz':>9} {'p50 us':>8} {'p99 us':>8} "
+          f"{'over mean':>10} {'over p99':>9} {'over max':>9}")
+    for hz in args.hz:
+        for name, sleeper in (("time.sleep", None), ("PerfSleeper", PerfSleeper())):
+            result = benchmark(hz, args.seconds, sleeper)
+            print(f"{name + f' @{hz:g}':>18} {result['rate_hz']:9.1f} {result['period_p50_us']:8.1f} "
+                  f"{result['period_p99_us']:8.1f} {result['overshoot_mean_us']:10.1f} "
+                  f"{result['overshoot_p99_us']:9.1f} {result['overshoot_max_us']:9.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Opt-in timeline tracer for the tracking, mocap, camera and data threads.
+
+Tracing is enabled by setting DART_TRACE before starting DART, either to an
+output directory or to 1 (static/traces). The tracking process inherits the
+variable, so every process writes its own trace on exit:
+    DART_TRACE=static/traces python src/app.py
+
+Spans are kept as int64 fields in a flat array (no per-event objects) and
+exported as Chrome trace JSON. Timestamps are perf_counter_ns(), a system-wide
+monotonic clock, so traces of different processes line up when merged:
+    python src/utils/tracer.py static/traces -o session_trace.json
+
+Open the result in https://ui.perfetto.dev or chrome://tracing.
+
+When DART_TRACE is unset, `traced` returns the function unchanged and
+begin() / end() return after a single attribute check.
+"""
+import argparse
+import atexit
+import json
+import os
+import sys
+import threading
+from array import array
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Dict, List, Optional
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.perf_timings import perf_counter_ns
+
+DEFAULT_DIR = "static/traces"
+# Fields per span in the buffer: name id, thread id, start ns, duration ns
+_FIELDS = 4
+
+
+class Tracer:
+    """
+    Per-process span recorder.
+
+    Args:
+        output_dir: Directory the trace is exported to, or None when disabled
+        max_spans: Spans kept before recording stops (32 bytes each)
+    """
+    def __init__(self, output_dir: Optional[str] = None, max_spans: int = 2_000_000):
+        self.enabled = output_dir is not None
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.max_spans = max_spans
+        self.dropped = 0
+
+        self._spans = array('q')
+        self._names: Dict[str, int] = {}
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        """Discard all recorded spans"""
+        self._spans = array('q')
+        self._names = {}
+        self._threads = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def begin(self) -> int:
+        """Start time of a span, to be passed to end()"""
+        return perf_counter_ns() if self.enabled else 0
+
+    def end(self, name: str, start_ns: int) -> None:
+        """Record a span from start_ns until now"""
+        if not self.enabled:
+            return
+        self._record(name, start_ns, perf_counter_ns() - start_ns)
+
+    def instant(self, name: str) -> None:
+        """Record a zero-length event"""
+        if self.enabled:
+            self._record(name, perf_counter_ns(), 0)
+
+    def _record(self, name: str, start_ns: int, duration_ns: int) -> None:
+        if len(self._spans) >= self.max_spans * _FIELDS:
+            self.dropped += 1
+            return
+        # A single extend() call keeps concurrent writers from interleaving fields
+        self._spans.extend((self._name_id(name), self._thread_id(), start_ns, duration_ns))
+
+    @contextmanager
+    def span(self, name: str):
+        start = self.begin()
+        try:
+            yield
+        finally:
+            self.end(name, start)
+
+    def traced(self, name: Optional[str] = None):
+        """Decorator recording every call of the function as a span"""
+        def decorator(func):
+            if not self.enabled:
+                return func
+            span_name = name or func.__qualname__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.end(span_name, start)
+            return wrapper
+        return decorator
+
+    def _name_id(self, name: str) -> int:
+        name_id = self._names.get(name)
+        if name_id is None:
+            with self._lock:
+                name_id = self._names.setdefault(name, len(self._names))
+        return name_id
+
+    def _thread_id(self) -> int:
+        tid = threading.get_native_id()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        return tid
+
+    def events(self) -> List[Dict]:
+        """Recorded spans as Chrome trace events (timestamps in microseconds)"""
+        import multiprocessing
+
+        pid = os.getpid()
+        names = {name_id: name for name, name_id in self._names.items()}
+        events = [
+            {"ph": "M", "name": "process_name", "pid": pid, "tid": 0,
+             "args": {"name": multiprocessing.current_process().name}}
+        ]
+        events.extend(
+            {"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": thread_name}}
+            for tid, thread_name in list(self._threads.items())
+        )
+
+        spans = self._spans
+        for i in range(0, len(spans) - len(spans) % _FIELDS, _FIELDS):
+            name_id, tid, start_ns, duration_ns = spans[i:i + _FIELDS]
+            events.append({
+                "ph": "X", "name": names[name_id], "pid": pid, "tid": tid,
+                "ts": start_ns / 1000, "dur": duration_ns / 1000,
+            })
+        return events
+
+    def export(self, path: Optional[str] = None) -> Optional[Path]:
+        """
+        Write the spans recorded so far as Chrome trace JSON.
+
+        Defaults to trace_<process>_<pid>.json in the output directory.
+        """
+        if not self.enabled or not len(self._spans):
+            return None
+        if path is None:
+            import multiprocessing
+
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            process = multiprocessing.current_process().name
+            path = self.output_dir / f"trace_{process}_{os.getpid()}.json"
+
+        trace = {"traceEvents": self.events(), "displayTimeUnit": "ns",
+                 "otherData": {"dropped_spans": self.dropped}}
+        with open(path, 'w') as f:
+            json.dump(trace, f)
+        return Path(path)
+
+
+def merge_traces(paths: List[Path], output: Path) -> int:
+    """Combine per-process traces into one file; returns the number of events"""
+    events = []
+    for path in paths:
+        with open(path) as f:
+            events.extend(json.load(f)["traceEvents"])
+    with open(output, 'w') as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ns"}, f)
+    return len(events)
+
+
+def _output_dir() -> Optional[str]:
+    setting = os.environ.get("DART_TRACE", "")
+    if setting in ("", "0"):
+        return None
+    return DEFAULT_DIR if setting == "1" else setting
+
+
+# Process-wide tracer, configured from the environment at import
+tracer = Tracer(_output_dir())
+if tracer.enabled:
+    # Forked processes skip atexit, so they also call tracer.export() themselves
+    atexit.register(tracer.export)
+    if hasattr(os, 'register_at_fork'):
+        # A forked child starts with a copy of the parent's spans; they belong to the parent's trace
+        os.register_at_fork(after_in_child=tracer.reset)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Merge per-process DART traces into one Chrome trace")
+    parser.add_argument("inputs", nargs="+", help="trace files or directories of trace_*.json")
+    parser.add_argument("-o", "--output", default="trace.json")
+    args = parser.parse_args()
+
+    paths = []
+    for name in args.inputs:
+        path = Path(name)
+        paths.extend(sorted(path.glob("trace_*.json")) if path.is_dir() else [path])
+    if not paths:
+        print("No trace files found")
+        return 1
+    count = merge_traces(paths, Path(args.output))
+    print(f"Merged {len(paths)} traces ({count} events) into {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Modules are imported the way the application runs them: with src/ on the path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from tracking.calibrate import Calibrator, ransac_intersection, ray_directions, ray_distances
+
+PAN_ORIGIN = np.array([100.0, 200.0, 300.0])
+TILT_ORIGIN = PAN_ORIGIN + np.array([0.0, 0.0, 50.0])
+
+
+class FakeConfig:
+    """ConfigManager stand-in holding an uncalibrated config"""
+    def __init__(self):
+        self.config = {"calibration": {"is_calibrated": False}}
+        self.updates = []
+
+    def get_calibration_data(self):
+        return None, None, None
+
+    def get_calibration_age(self):
+        return None
+
+    def update_calibration(self, *args, **kwargs):
+        self.updates.append((args, kwargs))
+
+
+def sweep(origin, angles, plane):
+    """Marker pairs at 500 and 800 mm along rays rotating in the xy (pan) or xz (tilt) plane"""
+    rad = np.radians(angles)
+    if plane == "xy":
+        dirs = np.column_stack([np.cos(rad), np.sin(rad), np.zeros_like(rad)])
+    else:
+        dirs = np.column_stack([np.cos(rad), np.zeros_like(rad), np.sin(rad)])
+    return origin + dirs * 500, origin + dirs * 800
+
+
+@pytest.fixture
+def rays():
+    angles = np.linspace(-40, 40, 30)
+    return (*sweep(PAN_ORIGIN, angles, "xy"), *sweep(TILT_ORIGIN, angles, "xz"))
+
+
+def test_ransac_ignores_outlier_rays():
+    rng = np.random.default_rng(1)
+    p1, p2 = sweep(PAN_ORIGIN, np.linspace(-60, 60, 20), "xy")
+    p1 = p1 + rng.normal(0, 0.5, p1.shape)
+    # Five rays that miss the origin by 100 mm or more
+    p1[::4] += np.array([0.0, 0.0, 100.0]) + rng.uniform(0, 50, (5, 3))
+    directions = ray_directions(p1, p2)
+
+    point, mask = ransac_intersection(p1, directions, threshold=10.0, rng=np.random.default_rng(2))
+    np.testing.assert_allclose(point, PAN_ORIGIN, atol=2.0)
+    assert not mask[::4].any()
+    assert mask.sum() == 15
+    assert np.all(ray_distances(point, p1[mask], directions[mask]) < 10.0)
+
+
+def test_ransac_raises_when_no_rays_intersect():
+    rng = np.random.default_rng(3)
+    origins = rng.uniform(-1000, 1000, (6, 3))
+    directions = ray_directions(origins, origins + rng.normal(size=(6, 3)))
+    with pytest.raises(ValueError, match="RANSAC threshold"):
+        ransac_intersection(origins, directions, threshold=1e-6, rng=rng)
+
+
+def test_calibrate_rays_recovers_origins_and_axes(rays):
+    config = FakeConfig()
+    calibrator = Calibrator(config)
+    residuals = calibrator.calibrate_rays(*rays)
+
+    np.testing.assert_allclose(calibrator.pan_origin, PAN_ORIGIN, atol=1e-6)
+    np.testing.assert_allclose(calibrator.tilt_origin, TILT_ORIGIN, atol=1e-6)
+    rotation = calibrator.rotation_matrix
+    np.testing.assert_allclose(rotation.T @ rotation, np.eye(3), atol=1e-9)
+    # z is the pan axis, x the first (home) pan ray
+    np.testing.assert_allclose(rotation[:, 2], [0, 0, 1], atol=1e-9)
+    reference = np.radians(-40)
+    np.testing.assert_allclose(rotation[:, 0], [np.cos(reference), np.sin(reference), 0], atol=1e-9)
+
+    assert residuals["pan_rms"] < 1e-6 and residuals["tilt_rms"] < 1e-6
+    assert residuals["pan_inliers"] == residuals["pan_rays"] == 30
+    assert residuals["axis_offset"] == pytest.approx(50.0)
+    assert calibrator.calibrated and len(config.updates) == 1
+
+
+def test_axes_do_not_depend_on_marker_order(rays):
+    pan_p1, pan_p2, tilt_p1, tilt_p2 = rays
+    expected = Calibrator(FakeConfig())
+    expected.calibrate_rays(*rays)
+
+    rng = np.random.default_rng(4)
+    for _ in range(10):
+        # Swap p1 / p2 of a random subset of rays, keeping the first ray fixed
+        swap = rng.random(len(pan_p1)) < 0.5
+        swap[0] = False
+        p1 = np.where(swap[:, None], pan_p2, pan_p1)
+        p2 = np.where(swap[:, None], pan_p1, pan_p2)
+
+        calibrator = Calibrator(FakeConfig())
+        calibrator.calibrate_rays(p1, p2, tilt_p1, tilt_p2)
+        np.testing.assert_allclose(calibrator.rotation_matrix, expected.rotation_matrix, atol=1e-9)
+        np.testing.assert_allclose(calibrator.pan_origin, expected.pan_origin, atol=1e-6)
+
+
+def test_too_few_rays_raise(rays):
+    pan_p1, pan_p2, tilt_p1, tilt_p2 = rays
+    calibrator = Calibrator(FakeConfig())
+    with pytest.raises(ValueError, match="at least 3"):
+        calibrator.calibrate_rays(pan_p1[:2], pan_p2[:2], tilt_p1, tilt_p2)
+    assert not calibrator.calibrated
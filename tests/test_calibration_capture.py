@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from tracking.calibration_capture import PAN, TILT, CalibrationCapture
+
+ORIGIN = np.array([100.0, 200.0, 300.0])
+
+
+def pointer(angle_deg, plane="xy"):
+    """Pointer markers at 500 and 800 mm along a ray from ORIGIN"""
+    rad = np.radians(angle_deg)
+    if plane == "xy":
+        direction = np.array([np.cos(rad), np.sin(rad), 0.0])
+    else:
+        direction = np.array([np.cos(rad), 0.0, np.sin(rad)])
+    return ORIGIN + direction * 500, ORIGIN + direction * 800
+
+
+def capture(**config):
+    return CalibrationCapture(mocap=None, calibrator=None, capture_config=config)
+
+
+def feed(capture, angles, plane="xy", dt=0.1, swap=None):
+    """Add one sample per angle; returns the acceptance flags"""
+    accepted = []
+    for i, angle in enumerate(angles):
+        p1, p2 = pointer(angle, plane)
+        if swap is not None and swap[i]:
+            p1, p2 = p2, p1
+        accepted.append(capture.add_sample(p1, p2, i * dt))
+    return accepted
+
+
+def test_missing_marker_is_rejected():
+    cap = capture()
+    p1, p2 = pointer(0)
+    assert not cap.add_sample(p1, None, 0.0, num_markers=1)
+    assert not cap.add_sample(p1, p2, 0.0, num_markers=1)
+    assert not cap.add_sample(p1, [np.nan, 0.0, 0.0], 0.0)
+    assert cap.rejected["missing"] == 3
+    assert cap.count() == 0
+
+
+def test_samples_are_recorded_after_the_separation_warm_up():
+    cap = capture()
+    accepted = feed(cap, np.arange(10))
+    # The median pointer length needs five samples
+    assert accepted == [False] * 4 + [True] * 6
+    assert cap.count(PAN) == 6 and cap.count(TILT) == 0
+
+
+def test_repeated_frames_are_skipped():
+    cap = capture()
+    feed(cap, np.arange(6))
+    p1, p2 = pointer(5)
+    assert not cap.add_sample(p1, p2, 1.0)
+    assert cap.count() == 2
+    assert cap.rejected == {"missing": 0, "separation": 0, "motion": 0}
+
+
+def test_wrong_separation_is_rejected():
+    cap = capture(separation_tolerance=5.0)
+    feed(cap, np.arange(6))
+    p1, p2 = pointer(6)
+    assert not cap.add_sample(p1, p2 + 20 * (p2 - p1) / 300, 0.6)
+    assert cap.rejected["separation"] == 1
+
+
+def test_fast_motion_is_rejected():
+    cap = capture(max_speed=500.0)
+    feed(cap, np.arange(6))
+    # 10 degrees in 10 ms moves the tip ~14 m/s
+    p1, p2 = pointer(15)
+    assert not cap.add_sample(p1, p2, 0.51)
+    assert cap.rejected["motion"] == 1
+
+
+def test_ray_orientation_follows_a_sweep_past_90_degrees():
+    cap = capture()
+    angles = np.arange(0, 160, 1.0)
+    swap = np.random.default_rng(5).random(len(angles)) < 0.5
+    swap[:5] = False
+    assert all(feed(cap, angles, swap=swap)[4:])
+
+    rays = np.array(cap.rays[PAN])
+    # Every recorded ray points away from the origin like the first one
+    outward = np.linalg.norm(rays[:, 1] - ORIGIN, axis=1) > np.linalg.norm(rays[:, 0] - ORIGIN, axis=1)
+    assert outward.all()
+
+
+def test_running_solution_and_phases():
+    cap = capture()
+    feed(cap, np.linspace(-40, 40, 20), dt=0.2)
+    cap.update_running_solution()
+    np.testing.assert_allclose(cap.running_origin, ORIGIN, atol=1e-6)
+    assert cap.running_rms == pytest.approx(0.0, abs=1e-6)
+
+    cap.next_phase()
+    assert cap.running_origin is None
+    feed(cap, np.linspace(-40, 40, 20), plane="xz", dt=0.2)
+    assert cap.count(PAN) == 16 and cap.count(TILT) == 20
@@ -0,0 +1,42 @@
+import pytest
+
+from hardware.camera.clock_sync import CameraClockMapper
+
+
+def test_not_ready_before_first_pair():
+    mapper = CameraClockMapper()
+    assert not mapper.is_ready
+    assert mapper.to_host_ns(1_000) is None
+
+
+def test_single_pair_assumes_equal_rates():
+    mapper = CameraClockMapper()
+    mapper.add_pair(5_000_000, 90_000_000)
+
+    assert mapper.to_host_ns(6_000_000) == 91_000_000
+
+
+def test_fit_recovers_offset_and_drift():
+    mapper = CameraClockMapper(window=10)
+    # Camera clock runs 50 ppm fast and starts at an unrelated epoch
+    for i in range(10):
+        camera_ns = 10**15 + i * 100_000_000
+        host_ns = 3 * 10**12 + int(i * 100_000_000 / (1 + 50e-6))
+        mapper.add_pair(camera_ns, host_ns)
+
+    camera_ns = 10**15 + 2_000_000_000
+    expected = 3 * 10**12 + 2_000_000_000 / (1 + 50e-6)
+    assert mapper.to_host_ns(camera_ns) == pytest.approx(expected, abs=2)
+    assert mapper.residual_ns < 1.0
+
+
+def test_window_forgets_old_pairs():
+    mapper = CameraClockMapper(window=3)
+    for i in range(3):
+        mapper.add_pair(i * 1_000, 10_000 + i * 1_000)
+    # The clock relation changes (e.g. a camera reset); old pairs age out
+    for i in range(3, 6):
+        mapper.add_pair(i * 1_000, 10_000 + i * 2_000)
+
+    assert len(mapper.pairs) == 3
+    assert mapper.slope == pytest.approx(2.0)
@@ -0,0 +1,121 @@
+import json
+import threading
+
+import pytest
+
+from core.config_manager import ConfigManager
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    return tmp_path / "config" / "app_config.json"
+
+
+def read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_missing_file_loads_defaults(config_path):
+    config = ConfigManager(str(config_path))
+    assert config.config == config.get_default_config()
+    assert not config.dirty
+    assert not config_path.exists()
+
+
+def test_updates_are_debounced_into_one_write(config_path, monkeypatch):
+    config = ConfigManager(str(config_path), flush_delay=0.2)
+    writes = []
+    write_atomic = config._write_atomic
+    monkeypatch.setattr(config, "_write_atomic", lambda data: (writes.append(data), write_atomic(data)))
+
+    for port in ("COM1", "COM2", "COM3"):
+        config.update_device_config({"dynamixel_port": port})
+    # Nothing is written until the timer fires
+    assert config.dirty
+    assert not config_path.exists()
+
+    # The timer of the last update does the write
+    timer = config._flush_timer
+    timer.join(timeout=5)
+    assert not timer.is_alive()
+    assert not config.dirty
+    assert len(writes) == 1
+    assert read_json(config_path)["devices"]["dynamixel_port"] == "COM3"
+
+
+def test_flush_writes_immediately_and_cancels_the_timer(config_path):
+    config = ConfigManager(str(config_path), flush_delay=60)
+    config.update_device_config({"theia_port": "COM7"})
+    config.flush()
+
+    assert not config.dirty
+    assert config._flush_timer is None
+    assert read_json(config_path)["devices"]["theia_port"] == "COM7"
+    # A clean flush does not rewrite the file
+    mtime = config_path.stat().st_mtime_ns
+    config.flush()
+    assert config_path.stat().st_mtime_ns == mtime
+
+
+def test_write_is_atomic_and_leaves_no_temporary_file(config_path):
+    config = ConfigManager(str(config_path), flush_delay=60)
+    config.update_device_config({"dynamixel_port": "COM1"})
+    config.flush()
+
+    assert [p.name for p in config_path.parent.iterdir()] == [config_path.name]
+
+
+def test_failed_write_keeps_the_old_file_and_stays_dirty(config_path, monkeypatch):
+    config = ConfigManager(str(config_path), flush_delay=60)
+    config.update_device_config({"dynamixel_port": "COM1"})
+    config.flush()
+
+    def fail(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr("core.config_manager.os.replace", fail)
+    config.update_device_config({"dynamixel_port": "COM2"})
+    config.flush()
+
+    assert config.dirty
+    assert read_json(config_path)["devices"]["dynamixel_port"] == "COM1"
+
+
+def test_concurrent_updates_and_flushes_keep_the_latest_values(config_path):
+    config = ConfigManager(str(config_path), flush_delay=0.001)
+    start = threading.Barrier(4)
+
+    def update(axis):
+        start.wait()
+        for i in range(200):
+            config.update_theia_position(**{axis: i})
+            if i % 20 == 0:
+                config.flush()
+
+    threads = [threading.Thread(target=update, args=(axis,)) for axis in ("zoom", "focus", "iris")]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    for thread in threads:
+        thread.join()
+    config.flush()
+
+    state = read_json(config_path)["devices"]["theia_state"]
+    assert (state["zoom_position"], state["focus_position"], state["iris_position"]) == (199, 199, 150)
+    assert list(config_path.parent.glob("*.tmp")) == []
+
+
+def test_reload_writes_pending_changes_first(config_path):
+    config = ConfigManager(str(config_path), flush_delay=60)
+    config.update_device_config({"dynamixel_port": "COM4"})
+    config.reload_config()
+
+    assert not config.dirty
+    assert config.config["devices"]["dynamixel_port"] == "COM4"
+
+    # Changes written by another process are picked up
+    other = ConfigManager(str(config_path), flush_delay=60)
+    other.update_device_config({"dynamixel_port": "COM5"})
+    other.flush()
+    config.reload_config()
+    assert config.config["devices"]["dynamixel_port"] == "COM5"
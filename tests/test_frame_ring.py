@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from hardware.camera.frame_ring import FrameRing
+
+
+def fill(ring, value, timestamp=0.0):
+    seq, buffer = ring.claim()
+    buffer[:] = value
+    ring.commit(seq, timestamp)
+    return seq
+
+
+def test_frames_are_addressed_by_sequence_number():
+    ring = FrameRing(4, (2, 3))
+    seqs = [fill(ring, i, timestamp=i * 5.0) for i in range(3)]
+
+    assert seqs == [0, 1, 2]
+    assert ring.latest_seq == 2
+    assert ring.next_seq == 3
+    assert np.all(ring.get(1) == 1)
+    assert ring.timestamp(2) == 10.0
+
+
+def test_slot_is_recycled_after_capacity_frames():
+    ring = FrameRing(3, (2,))
+    first = fill(ring, 7)
+    for i in range(3):
+        fill(ring, i)
+
+    assert ring.get(first) is None
+    assert not ring.is_valid(first)
+    assert ring.timestamp(first) is None
+    assert np.all(ring.get(3) == 2)
+
+
+def test_claimed_slot_is_invalid_until_committed():
+    ring = FrameRing(2, (1,))
+    fill(ring, 1)
+    fill(ring, 2)
+    # Claiming seq 2 reuses the slot of seq 0
+    seq, _ = ring.claim()
+
+    assert seq == 2
+    assert ring.get(0) is None
+    assert ring.get(2) is None
+    assert ring.is_valid(1)
+
+
+def test_view_can_be_checked_after_overwrite():
+    ring = FrameRing(2, (1,))
+    seq = fill(ring, 1)
+    view = ring.get(seq)
+    fill(ring, 2)
+    fill(ring, 3)
+
+    assert view[0] == 3
+    assert not ring.is_valid(seq)
+
+
+@pytest.mark.parametrize("seq", [-1, 5])
+def test_unknown_sequence_numbers(seq):
+    ring = FrameRing(4, (1,))
+    fill(ring, 0)
+    assert ring.get(seq) is None
+    assert ring.latest()[0] == 0
@@ -0,0 +1,49 @@
+import threading
+
+from utils.latest_value import LatestValue
+
+
+def test_get_returns_newest_value_and_counts_overwrites():
+    slot = LatestValue()
+    slot.put("a")
+    slot.put("b")
+    slot.put("c")
+
+    version, value = slot.get(timeout=0)
+    assert value == "c"
+    assert version == 3
+    assert slot.overwritten == 2
+
+
+def test_value_is_taken_only_once():
+    slot = LatestValue()
+    slot.put(1)
+    assert slot.get(timeout=0)[1] == 1
+    assert slot.get(timeout=0) is None
+
+
+def test_get_waits_for_producer():
+    slot = LatestValue()
+    timer = threading.Timer(0.05, slot.put, args=("late",))
+    timer.start()
+    try:
+        assert slot.get(timeout=2.0)[1] == "late"
+    finally:
+        timer.cancel()
+
+
+def test_close_wakes_waiting_consumer():
+    slot = LatestValue()
+    timer = threading.Timer(0.05, slot.close)
+    timer.start()
+    try:
+        assert slot.get(timeout=2.0) is None
+    finally:
+        timer.cancel()
+
+
+def test_peek_does_not_consume():
+    slot = LatestValue()
+    slot.put(5)
+    assert slot.peek() == (1, 5)
+    assert slot.get(timeout=0) == (1, 5)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from tracking.intrinsics import PixelAngleMapper, build_angle_lut, default_camera_matrix
+
+
+def mapper_with_tables(pan_lut, tilt_lut):
+    """PixelAngleMapper over synthetic lookup tables"""
+    mapper = PixelAngleMapper.__new__(PixelAngleMapper)
+    mapper.height, mapper.width = pan_lut.shape
+    mapper.pan_lut = pan_lut
+    mapper.tilt_lut = tilt_lut
+    return mapper
+
+
+@pytest.fixture
+def linear_mapper():
+    # Linear tables: bilinear interpolation must reproduce them exactly
+    ys, xs = np.mgrid[0:4, 0:5].astype(np.float32)
+    return mapper_with_tables(2 * xs + ys, 3 * ys - xs)
+
+
+@pytest.mark.parametrize("cx, cy", [(1.3, 2.6), (0.0, 0.0), (3.99, 2.5), (4.0, 3.0), (2.5, 0.25)])
+def test_sub_pixel_centroids_are_interpolated(linear_mapper, cx, cy):
+    pan, tilt = linear_mapper.angles(cx, cy)
+    assert pan == pytest.approx(2 * cx + cy, abs=1e-5)
+    assert tilt == pytest.approx(3 * cy - cx, abs=1e-5)
+
+
+def test_points_outside_the_image_are_clamped(linear_mapper):
+    assert linear_mapper.angles(-2.0, 9.0) == pytest.approx(linear_mapper.angles(0.0, 3.0))
+    assert linear_mapper.angles(10.0, -1.0) == pytest.approx(linear_mapper.angles(4.0, 0.0))
+
+
+def test_pinhole_table_matches_focal_length():
+    width, height = 64, 48
+    camera_matrix = default_camera_matrix(width, height)
+    pan_lut, tilt_lut = build_angle_lut(camera_matrix, None, width, height)
+    mapper = mapper_with_tables(pan_lut, tilt_lut)
+
+    fx, cx, cy = camera_matrix[0, 0], camera_matrix[0, 2], camera_matrix[1, 2]
+    assert mapper.angles(cx, cy) == pytest.approx((0.0, 0.0), abs=1e-4)
+    # Right of centre is positive pan, above centre positive tilt
+    pan, tilt = mapper.angles(cx + 10.5, cy - 7.25)
+    assert pan == pytest.approx(np.degrees(np.arctan(10.5 / fx)), abs=1e-3)
+    assert tilt == pytest.approx(np.degrees(np.arctan(7.25 / fx)), abs=1e-3)
@@ -0,0 +1,63 @@
+import logging
+from queue import Queue
+
+import pytest
+
+pytest.importorskip("cv2")
+
+from hardware.camera.camera_manager import BLOCK, DROP_NEWEST, DROP_OLDEST, CameraManager
+
+
+def recorder(policy, size=2):
+    """CameraManager with only the recording queue state (no camera)"""
+    camera = CameraManager.__new__(CameraManager)
+    camera.logger = logging.getLogger("test")
+    camera.overflow_policy = policy
+    camera.frame_queue = Queue(maxsize=size)
+    camera.dropped_frames = []
+    return camera
+
+
+def drain(camera):
+    items = []
+    while not camera.frame_queue.empty():
+        items.append(camera.frame_queue.get_nowait())
+    return items
+
+
+def test_drop_oldest_keeps_newest_frames():
+    camera = recorder(DROP_OLDEST)
+    for n in range(1, 5):
+        camera._enqueue_frame((n, n * 5.0, n))
+
+    assert [item[2] for item in drain(camera)] == [3, 4]
+    # Dropped frames are recorded as 0-based capture indices
+    assert camera.dropped_frames == [0, 1]
+
+
+def test_drop_newest_keeps_queued_frames():
+    camera = recorder(DROP_NEWEST)
+    for n in range(1, 5):
+        camera._enqueue_frame((n, n * 5.0, n))
+
+    assert [item[2] for item in drain(camera)] == [1, 2]
+    assert camera.dropped_frames == [2, 3]
+
+
+def test_block_policy_never_drops():
+    camera = recorder(BLOCK, size=4)
+    for n in range(1, 5):
+        camera._enqueue_frame((n, n * 5.0, n))
+
+    assert len(drain(camera)) == 4
+    assert camera.dropped_frames == []
+
+
+def test_drop_oldest_keeps_stop_signal():
+    camera = recorder(DROP_OLDEST)
+    camera.frame_queue.put_nowait(None)
+    camera._enqueue_frame((1, 5.0, 1))
+    camera._enqueue_frame((2, 10.0, 2))
+
+    assert None in drain(camera)
+    assert camera.dropped_frames == [1]
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from data.session_catalog import SessionCatalog, session_start
+
+
+@pytest.fixture
+def recordings(tmp_path):
+    """Two recordings with a video and recording sidecar, and an unrelated file"""
+    for session, frames in (("1612T143225", 400), ("0301T090000", 100)):
+        (tmp_path / f"video_{session}_FPS200.0_START123.mp4").write_bytes(b"")
+        with open(tmp_path / f"video_{session}_FPS200.0_START123.json", "w") as f:
+            json.dump({"fps": 200.0, "frames_written": frames, "dropped_frames": [3, 7]}, f)
+    (tmp_path / "notes.txt").write_text("not a recording")
+    return tmp_path
+
+
+def test_session_start_parses_the_key():
+    assert session_start("1612T143225", year=2024) == "2024-12-16T14:32:25"
+    assert session_start("not-a-session") is None
+
+
+def test_rebuild_indexes_sidecar_metadata(recordings):
+    catalog = SessionCatalog(str(recordings))
+    assert catalog.list_sessions() == []
+    assert catalog.rebuild() == 2
+
+    session = catalog.get_session("1612T143225")
+    assert session["video"] == recordings / "video_1612T143225_FPS200.0_START123.mp4"
+    assert session["metadata"] == recordings / "video_1612T143225_FPS200.0_START123.json"
+    assert session["data"] is None
+    assert session["fps"] == 200.0
+    assert session["frame_count"] == 400
+    assert session["dropped_frames"] == 2
+    assert session["duration_s"] == pytest.approx(2.0)
+
+
+def test_rebuild_skips_known_sessions(recordings):
+    catalog = SessionCatalog(str(recordings))
+    catalog.rebuild()
+    assert catalog.rebuild() == 0
+
+    (recordings / "video_0402T101010_FPS100.0_START0.json").write_text(
+        json.dumps({"fps": 100.0, "frames_written": 50}))
+    assert catalog.rebuild() == 1
+    assert catalog.get_session("0402T101010")["dropped_frames"] == 0
+
+
+def test_add_session_upserts_and_stores_relative_paths(recordings):
+    catalog = SessionCatalog(str(recordings))
+    catalog.rebuild()
+    data = recordings / "data_1612T143225.parquet"
+    catalog.add_session("1612T143225", data=str(data), samples=1234)
+
+    session = catalog.get_session("1612T143225")
+    assert session["data"] == data
+    assert session["samples"] == 1234
+    # Untouched fields are kept
+    assert session["frame_count"] == 400
+
+    with pytest.raises(ValueError):
+        catalog.add_session("1612T143225", unknown=1)
+
+
+def test_list_sessions_filters_and_orders(recordings):
+    catalog = SessionCatalog(str(recordings))
+    catalog.rebuild()
+    catalog.add_session("0301T090000", data="data_0301T090000.parquet")
+    catalog.add_session("1612T143225", started_at="2024-12-16T14:32:25")
+    catalog.add_session("0301T090000", started_at="2025-01-03T09:00:00")
+
+    assert [s["session"] for s in catalog.list_sessions()] == ["0301T090000", "1612T143225"]
+    assert [s["session"] for s in catalog.list_sessions(require_data=True)] == ["0301T090000"]
+    assert len(catalog.list_sessions(limit=1)) == 1
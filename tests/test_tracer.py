@@ -0,0 +1,103 @@
+import json
+import os
+import threading
+
+from utils.tracer import Tracer, merge_traces
+
+
+def spans(events):
+    return [event for event in events if event["ph"] == "X"]
+
+
+def test_disabled_tracer_records_nothing(tmp_path):
+    tracer = Tracer()
+
+    def step():
+        return 42
+
+    assert tracer.traced()(step) is step
+    assert tracer.begin() == 0
+    with tracer.span("idle"):
+        pass
+    tracer.instant("tick")
+    assert spans(tracer.events()) == []
+    assert tracer.export(str(tmp_path / "trace.json")) is None
+
+
+def test_spans_are_exported_as_chrome_trace(tmp_path):
+    tracer = Tracer(str(tmp_path))
+
+    @tracer.traced("step")
+    def step(x):
+        return x * 2
+
+    assert step(21) == 42
+    with tracer.span("block"):
+        pass
+    start = tracer.begin()
+    tracer.end("manual", start)
+    tracer.instant("tick")
+
+    path = tracer.export()
+    assert path == tmp_path / f"trace_MainProcess_{os.getpid()}.json"
+    with open(path) as f:
+        trace = json.load(f)
+
+    events = trace["traceEvents"]
+    recorded = spans(events)
+    assert [event["name"] for event in recorded] == ["step", "block", "manual", "tick"]
+    assert all(event["pid"] == os.getpid() and event["dur"] >= 0 for event in recorded)
+    assert recorded[-1]["dur"] == 0
+    assert [event["ts"] for event in recorded] == sorted(event["ts"] for event in recorded)
+    thread_names = {event["tid"]: event["args"]["name"] for event in events if event["name"] == "thread_name"}
+    assert thread_names == {threading.get_native_id(): threading.current_thread().name}
+    assert trace["otherData"]["dropped_spans"] == 0
+
+
+def test_spans_from_threads_keep_their_thread(tmp_path):
+    tracer = Tracer(str(tmp_path))
+
+    def work():
+        for _ in range(100):
+            with tracer.span("work"):
+                pass
+
+    threads = [threading.Thread(target=work, name=f"worker-{i}") for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    events = tracer.events()
+    recorded = spans(events)
+    assert len(recorded) == 400
+    names = {event["tid"]: event["args"]["name"] for event in events if event["name"] == "thread_name"}
+    assert sorted(names.values()) == [f"worker-{i}" for i in range(4)]
+    assert {event["tid"] for event in recorded} == set(names)
+
+
+def test_max_spans_drops_and_counts(tmp_path):
+    tracer = Tracer(str(tmp_path), max_spans=3)
+    for _ in range(5):
+        tracer.instant("tick")
+    assert len(spans(tracer.events())) == 3
+    assert tracer.dropped == 2
+
+    tracer.reset()
+    assert spans(tracer.events()) == [] and tracer.dropped == 0
+    assert tracer.export() is None
+
+
+def test_merge_traces_combines_processes(tmp_path):
+    paths = []
+    for i in range(2):
+        tracer = Tracer(str(tmp_path))
+        tracer.instant(f"event-{i}")
+        paths.append(tracer.export(str(tmp_path / f"trace_{i}.json")))
+
+    output = tmp_path / "merged.json"
+    count = merge_traces(paths, output)
+    with open(output) as f:
+        merged = json.load(f)["traceEvents"]
+    assert count == len(merged)
+    assert [event["name"] for event in spans(merged)] == ["event-0", "event-1"]